@@ -1,26 +1,59 @@
-from utils.Logger import Logger
+from typing import Optional
 
-logger = Logger()
+from .Record import AssetRecord
+from utils.Audio import AudioJob
+from utils.Scanner import get_stream_source
 
 
-class AudioClip:
-    """ A wrapper around the Unity AudioClip resource type """
+class AudioClip(AssetRecord):
+    """ A wrapper around the Unity AudioClip resource type, its samples are only decoded when they are used """
+    __slots__ = ("name", "path_id", "file_extension", "channels", "frequency", "size")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.name = asset.name
+            self.path_id = asset.path_id
             self.file_extension = asset.extension
-            self.samples = asset.samples
+            # the format of clips older than Unity 5 is not stored in the AudioClip
+            self.channels = getattr(asset, "m_Channels", 0)
+            self.frequency = getattr(asset, "m_Frequency", 0)
+            self.size = asset.m_Size
         except Exception as e:
-            self.data = None
-            self.name = None
-            logger.warn(f"Failed parsing BuildSettings: {e}")
+            self.name, self.path_id, self.file_extension = None, None, None
+            self.channels, self.frequency, self.size = 0, 0, 0
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
 
     def __str__(self) -> str:
-        if self.data is None:
+        if self.name is None:
             return ""
         ret = f"Name: {self.name}\nFile extension: {self.file_extension}\n"
-        ret += f"Sample Count: {len(self.samples)}\nSamples: {self.samples}"
+        ret += f"Channels: {self.channels}\nFrequency: {self.frequency}\nSize: {self.size}\n"
         return ret
+
+    @property
+    def audio_data(self) -> bytes:
+        """ Return the raw audio data (an FMOD sound bank or an Ogg, WAV or M4A file) without decoding it """
+        return self.data.m_AudioData if self.data is not None else b""
+
+    @property
+    def samples(self) -> dict:
+        """ Return the decoded samples by file name, FMOD sound banks are decoded on every access """
+        return self.data.samples if self.data is not None else {}
+
+    @property
+    def stream_source(self) -> Optional[tuple]:
+        """ Return the (path, offset, size) of the streamed audio data in its .resource file or None """
+        if self.data is None:
+            return None
+        return get_stream_source(self.data, self.data.m_Source, getattr(self.data, "m_Offset", 0), self.data.m_Size)
+
+    def export_job(self, folder: str, name: str = None) -> AudioJob:
+        """
+        Return a job that decodes the clip to .wav files in a worker process.
+        :param folder: The folder the files are saved to.
+        :param name: The file name of the first subsound without extension (default: the clip name).
+        """
+        return AudioJob(name or self.name, folder, self.audio_data, self.channels, self.frequency,
+                        self.stream_source)
@@ -1,26 +1,29 @@
+from .Record import AssetRecord
 from utils.Logger import Logger
 
 logger = Logger()
 
 
-class BuildSettings:
+class BuildSettings(AssetRecord):
     """ A wrapper around the Unity BuildSettings resource type """
+    __slots__ = ("levels", "has_render_texture", "has_pro_version", "has_publishing_rights", "has_shadows")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
-            self.levels = asset.levels
+            self.levels = list(asset.levels)
             self.has_render_texture = asset.has_render_texture
             self.has_pro_version = asset.has_pro_version
             self.has_publishing_rights = asset.has_publishing_rights
             self.has_shadows = asset.has_shadows
         except Exception as e:
-            self.data = None
-            logger.warn(f"Failed parsing BuildSettings: {e}")
+            self.levels = None
+            self.has_render_texture = self.has_pro_version = self.has_publishing_rights = self.has_shadows = None
+            self.parse_failed(e)
             logger.debug(f"{vars(asset)}\n")
 
     def __str__(self) -> str:
-        if self.data is None:
+        if self.levels is None:
             return ""
         ret = f"Levels: {self.levels}\nHas Render Texture: {self.has_render_texture}\n"
         ret += f"Pro Version: {self.has_pro_version}\nHas Publishing Rights: {self.has_publishing_rights}\n"
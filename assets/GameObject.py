@@ -1,19 +1,24 @@
-from utils.Logger import Logger
+from .Record import AssetRecord
 
-logger = Logger()
 
-
-class GameObject:
+class GameObject(AssetRecord):
     """ A wrapper around the Unity GameObject resource type """
+    __slots__ = ("name", "path_id", "component_ids", "layer")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.name = asset.name
-            self.components = asset.m_Components
+            self.path_id = asset.path_id
+            # the (file_id, path_id) of every component, the PPtr objects would keep the asset file alive
+            self.component_ids = tuple((component.file_id, component.path_id) for component in asset.m_Components)
             self.layer = asset.m_Layer
         except Exception as e:
-            self.name = "Unknown"
-            self.namespace = "Unknown"
-            logger.warn(f"Failed parsing GameObject: {e}")
+            self.name, self.path_id, self.component_ids, self.layer = "Unknown", None, (), None
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
+
+    @property
+    def components(self) -> list:
+        """ Return the component PPtrs of the UnityPy GameObject, reading it again if needed """
+        return self.data.m_Components if self.data is not None else []
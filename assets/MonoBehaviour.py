@@ -1,20 +1,28 @@
-from utils.Logger import Logger
+from .Record import AssetRecord
 
-logger = Logger()
 
-
-class MonoBehaviour:
+class MonoBehaviour(AssetRecord):
     """ A wrapper around the Unity MonoBehaviour resource type """
+    __slots__ = ("name", "path_id", "script_id")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.name = asset.name
-            self.script = asset.m_Script
-            self.bytes = asset.raw_data
+            self.path_id = asset.path_id
+            # the (file_id, path_id) of the MonoScript, the PPtr object would keep the asset file alive
+            self.script_id = (asset.m_Script.file_id, asset.m_Script.path_id)
         except Exception as e:
-            self.object_type = None
-            self.name = "Unknown"
-            self.namespace = "Unknown"
-            logger.warn(f"Failed parsing MonoBehaviour: {e}")
+            self.name, self.path_id, self.script_id = "Unknown", None, None
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
+
+    @property
+    def script(self):
+        """ Return the MonoScript PPtr of the UnityPy MonoBehaviour, reading it again if needed """
+        return self.data.m_Script if self.data is not None else None
+
+    @property
+    def bytes(self) -> bytes:
+        """ Return the serialized fields of the MonoBehaviour, they are only read when they are used """
+        return self.data.raw_data if self.data is not None else b""
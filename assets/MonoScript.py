@@ -1,33 +1,15 @@
 from .Enums import PacketTypes, AppEngineTypes, OtherTypes
-from utils.Logger import Logger
+from .Namespaces import CLASSIFIER
+from .Record import AssetRecord
 
-logger = Logger()
 
-# namespaces used in monoscript assets we need to parse
-NAMESPACES = {
-    "Packets": {
-        "Incoming": "DecaGames.RotMG.Net.SocketServer.Messages.Incoming",
-        "Outgoing": "DecaGames.RotMG.Net.SocketServer.Messages.Outgoing",
-        "DataObject": "DecaGames.RotMG.Net.SocketServer.Messages.Data"
-    },
-    "AppEngine": {
-        "Commands": "DecaGames.RotMG.Net.AppEngine.Commands",
-        "Messages": "DecaGames.RotMG.Net.AppEngine.Messages",
-        "Outgoing": "DecaGames.RotMG.Net.AppEngine.Outgoing",
-        "XML": "DecaGames.RotMG.Net.AppEngine.XML.Serialization"
-    },
-    "Effects": "DecaGames.RotMG.Objects.Effects",
-    "Particles": "DecaGames.RotMG.Objects.Particles",
-    "MapObjects": "DecaGames.RotMG.Objects.Map"
-}
-
-
-class MonoScript:
+class MonoScript(AssetRecord):
     """ A wrapper around the Unity MonoScript resource type """
+    __slots__ = ("namespace", "name", "path_id", "unity_version", "object_type")
 
-    def __init__(self, asset) -> None:
+    def __init__(self, asset, entry=None, read=None) -> None:
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.namespace = asset.get("m_Namespace").strip()
             self.name = asset.get("m_ClassName")
             self.path_id = asset.get("path_id")
@@ -37,37 +19,31 @@ class MonoScript:
             self.object_type = None
             self.name = "Unknown"
             self.namespace = "Unknown"
-            logger.warn(f"Failed parsing MonoScript: {e}")
+            self.path_id, self.unity_version = None, None
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
 
+    @classmethod
+    def from_summary(cls, entry, read) -> "MonoScript":
+        """
+        Create a MonoScript from the indexed class and namespace names without reading the Unity object.
+        :param entry: The ObjectSummary of the MonoScript object.
+        :param read: A callable that returns the UnityPy object of the summary when `data` is first accessed.
+        """
+        script = cls.__new__(cls)
+        AssetRecord.__init__(script, None, entry, read)
+        script.namespace = entry.extra["namespace"].strip()
+        script.name = entry.extra["class_name"]
+        script.path_id = entry.path_id
+        script.unity_version = None
+        script.object_type = script.parse_namespace()
+        return script
+
     def parse_namespace(self, namespace: str = None):
         """ determine the type of object by parsing the namespace """
         if namespace is None:
             namespace = self.namespace
-        # _packets
-        if NAMESPACES["Packets"]["Incoming"] in namespace:
-            return PacketTypes.INCOMING
-        elif NAMESPACES["Packets"]["Outgoing"] in namespace:
-            return PacketTypes.OUTGOING
-        elif namespace == NAMESPACES["Packets"]["DataObject"]:
-            return PacketTypes.DATA
-        # appengine data
-        elif NAMESPACES["AppEngine"]["Commands"] in namespace:
-            return AppEngineTypes.COMMANDS
-        elif namespace == NAMESPACES["AppEngine"]["Messages"]:
-            return AppEngineTypes.MESSAGES
-        elif namespace == NAMESPACES["AppEngine"]["Outgoing"]:
-            return AppEngineTypes.OUTGOING
-        elif namespace == NAMESPACES["AppEngine"]["XML"]:
-            return AppEngineTypes.XML
-        # _particles / _effects
-        elif namespace == NAMESPACES["Effects"]:
-            return OtherTypes.EFFECT
-        elif namespace == NAMESPACES["Particles"]:
-            return OtherTypes.PARTICLE
-        elif namespace == NAMESPACES["MapObjects"]:
-            return OtherTypes.MAP_OBJECT
-        return None
+        return CLASSIFIER.classify(namespace)
 
     @property
     def packet_incoming(self) -> bool:
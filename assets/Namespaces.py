@@ -0,0 +1,97 @@
+from typing import Optional
+
+from .Enums import PacketTypes, AppEngineTypes, OtherTypes
+
+# namespaces used in monoscript assets we need to parse
+NAMESPACES = {
+    "Packets": {
+        "Incoming": "DecaGames.RotMG.Net.SocketServer.Messages.Incoming",
+        "Outgoing": "DecaGames.RotMG.Net.SocketServer.Messages.Outgoing",
+        "DataObject": "DecaGames.RotMG.Net.SocketServer.Messages.Data"
+    },
+    "AppEngine": {
+        "Commands": "DecaGames.RotMG.Net.AppEngine.Commands",
+        "Messages": "DecaGames.RotMG.Net.AppEngine.Messages",
+        "Outgoing": "DecaGames.RotMG.Net.AppEngine.Outgoing",
+        "XML": "DecaGames.RotMG.Net.AppEngine.XML.Serialization"
+    },
+    "Effects": "DecaGames.RotMG.Objects.Effects",
+    "Particles": "DecaGames.RotMG.Objects.Particles",
+    "MapObjects": "DecaGames.RotMG.Objects.Map"
+}
+
+# the namespace rules as (namespace, category, match nested namespaces as well)
+DEFAULT_RULES = [
+    (NAMESPACES["Packets"]["Incoming"], PacketTypes.INCOMING, True),
+    (NAMESPACES["Packets"]["Outgoing"], PacketTypes.OUTGOING, True),
+    (NAMESPACES["Packets"]["DataObject"], PacketTypes.DATA, False),
+    (NAMESPACES["AppEngine"]["Commands"], AppEngineTypes.COMMANDS, True),
+    (NAMESPACES["AppEngine"]["Messages"], AppEngineTypes.MESSAGES, False),
+    (NAMESPACES["AppEngine"]["Outgoing"], AppEngineTypes.OUTGOING, False),
+    (NAMESPACES["AppEngine"]["XML"], AppEngineTypes.XML, False),
+    (NAMESPACES["Effects"], OtherTypes.EFFECT, False),
+    (NAMESPACES["Particles"], OtherTypes.PARTICLE, False),
+    (NAMESPACES["MapObjects"], OtherTypes.MAP_OBJECT, False)
+]
+
+# the trie key that stores the category of a prefix rule
+_CATEGORY = None
+
+
+class NamespaceClassifier:
+    """ Classifies MonoScript namespaces with an exact-match table and a prefix trie of namespace segments """
+
+    def __init__(self, rules: list = None):
+        self._exact = {}
+        self._trie = {}
+        # every distinct namespace is only classified once, builds repeat the same few hundred namespaces
+        self._cache = {}
+        for namespace, category, prefix in DEFAULT_RULES if rules is None else rules:
+            self.register(namespace, category, prefix)
+
+    def register(self, namespace: str, category, prefix: bool = False) -> None:
+        """
+        Add a namespace rule, replacing any rule for the same namespace.
+        :param namespace: The full namespace, e.g. 'DecaGames.RotMG.Objects.Effects'.
+        :param category: The value returned for matching namespaces, usually an Enum member.
+        :param prefix: Also match every namespace nested below this one.
+        """
+        if prefix:
+            node = self._trie
+            for segment in namespace.split("."):
+                node = node.setdefault(segment, {})
+            node[_CATEGORY] = category
+        else:
+            self._exact[namespace] = category
+        self._cache.clear()
+
+    def classify(self, namespace: str):
+        """ Return the category of a namespace or None if no rule matches """
+        try:
+            return self._cache[namespace]
+        except KeyError:
+            pass
+        category = self._exact.get(namespace)
+        if category is None:
+            category = self._match_prefix(namespace)
+        self._cache[namespace] = category
+        return category
+
+    def _match_prefix(self, namespace: str) -> Optional[object]:
+        """ Return the category of the longest registered prefix of a namespace """
+        category, node = None, self._trie
+        for segment in namespace.split("."):
+            node = node.get(segment)
+            if node is None:
+                break
+            category = node.get(_CATEGORY, category)
+        return category
+
+
+# the classifier shared by all MonoScripts
+CLASSIFIER = NamespaceClassifier()
+
+
+def register_namespace(namespace: str, category, prefix: bool = False) -> None:
+    """ Register an additional namespace category with the shared classifier """
+    CLASSIFIER.register(namespace, category, prefix)
@@ -0,0 +1,51 @@
+from collections import Counter
+
+from utils.Logger import Logger
+
+logger = Logger()
+
+# the number of objects of each asset type that could not be parsed since they were last reported
+PARSE_FAILURES = Counter()
+
+
+def report_parse_failures() -> None:
+    """ Log one warning per asset type with objects that could not be parsed, instead of one per object """
+    for asset_type, count in sorted(PARSE_FAILURES.items()):
+        logger.warning(f"Failed parsing {count} {asset_type} assets, see the log file for the errors")
+    PARSE_FAILURES.clear()
+
+
+class AssetRecord:
+    """
+    The base of the asset wrappers. A wrapper copies the few fields the extractors use into slots and keeps the
+    object summary (file and path_id) of its UnityPy object instead of the object, which is read again on demand.
+    """
+    __slots__ = ("_data", "_entry", "_read")
+
+    def __init__(self, asset=None, entry=None, read=None):
+        """
+        :param asset: The UnityPy object the fields are copied from, it is only kept if it cannot be read again.
+        :param entry: The ObjectSummary of the object.
+        :param read: A callable that returns the UnityPy object of an object summary (see Resources.read_asset).
+        """
+        if entry is not None and read is not None:
+            self._data, self._entry, self._read = None, entry, read
+        else:
+            self._data, self._entry, self._read = asset, None, None
+
+    @property
+    def data(self):
+        """ Return the UnityPy object, reading it again by its object summary if it is not held """
+        if self._data is None and self._read is not None:
+            self._data = self._read(self._entry)
+        return self._data
+
+    def release_data(self) -> None:
+        """ Drop the reference to the UnityPy object so its asset file can be freed """
+        self._data = None
+
+    def parse_failed(self, error: Exception) -> None:
+        """ Drop the UnityPy object of a wrapper that could not be parsed and count the failure """
+        self._data, self._entry, self._read = None, None, None
+        PARSE_FAILURES[type(self).__name__] += 1
+        logger.debug(f"Failed parsing {type(self).__name__}: {error}")
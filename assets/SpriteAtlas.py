@@ -1,26 +1,33 @@
-from utils.Logger import Logger
+from .Record import AssetRecord
 
-logger = Logger()
 
-
-class SpriteAtlas:
+class SpriteAtlas(AssetRecord):
     """ A wrapper around the Unity SpriteAtlas resource type """
+    __slots__ = ("name", "path_id", "packed_sprite_names")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.name = asset.name
-            self.packed_sprites = asset.m_PackedSprites  # list of Sprite assets
-            self.packed_sprite_names = asset.m_PackedSpriteNamesToIndex
-            self.render_data_map = asset.m_RenderDataMap  # list of SpriteAtlasData objects
+            self.path_id = asset.path_id
+            self.packed_sprite_names = list(asset.m_PackedSpriteNamesToIndex)
         except Exception as e:
-            self.data = None
-            self.name = None
-            logger.warn(f"Failed parsing SpriteAtlas: {e}")
+            self.name, self.path_id, self.packed_sprite_names = None, None, []
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
 
+    @property
+    def packed_sprites(self) -> list:
+        """ Return the PPtrs of the packed Sprite assets, reading the UnityPy SpriteAtlas again if needed """
+        return self.data.m_PackedSprites if self.data is not None else []
+
+    @property
+    def render_data_map(self) -> dict:
+        """ Return the SpriteAtlasData of every packed sprite, reading the UnityPy SpriteAtlas again if needed """
+        return self.data.m_RenderDataMap if self.data is not None else {}
+
     def __str__(self) -> str:
-        if self.data is None:
+        if self.name is None:
             return ""
         ret = f"Packed Sprites: {self.packed_sprites}\n\n"
         ret += f"Packed Sprite Names: {self.packed_sprite_names}\n\n"
@@ -1,6 +1,4 @@
-from utils.Logger import Logger
-
-logger = Logger()
+from .Record import AssetRecord
 
 # list of all filenames that do not contain XML content
 NON_XML_FILES = [
@@ -10,18 +8,20 @@ NON_XML_FILES = [
 ]
 
 
-class TextAsset:
+class TextAsset(AssetRecord):
     """ A wrapper around the Unity TextAsset resource type """
+    __slots__ = ("name", "path_id", "file_data")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.name = asset.get("name")
             self.path_id = asset.get("path_id")
+            # a memoryview of the mapped asset file (see load_unity_file), the script is not copied
             self.file_data = asset.script
         except Exception as e:
-            self.data, self.name = None, None
-            logger.error(f"Error loading TextAsset: {e}")
+            self.name, self.path_id, self.file_data = None, None, None
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
 
     def create_actionscript(self, file_type: str = "xml", package_name: str = "kabam.rotmg.assets") -> str:
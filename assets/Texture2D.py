@@ -1,6 +1,8 @@
-from utils.Logger import Logger
+from typing import Optional
 
-logger = Logger()
+from .Record import AssetRecord
+from utils.Scanner import get_digest, get_stream_source
+from utils.Textures import TextureJob
 
 SPRITESHEET_NAMES = ["characters", "characters_masks", "groundTiles", "mapObjects"]
 
@@ -13,31 +15,60 @@ GUILD_ICONS = ["icon_guild_0", "icon_guild_10" "icon_guild_20", "icon_guild_30",
 ICONS = ["clock_icon", "gold_icon", "fame_icon", "icon_lock", "icon_arrow", "icon_filter_consumables"]
 
 
-class Texture2D:
+class Texture2D(AssetRecord):
     """ A wrapper around the Unity Texture2D resource type """
+    __slots__ = ("name", "path_id", "width", "height", "format", "size", "image_count", "has_image", "_image",
+                 "_image_digest")
 
-    def __init__(self, asset):
+    def __init__(self, asset, entry=None, read=None):
+        super().__init__(asset, entry, read)
         try:
-            self.data = asset
             self.name = asset.name
-            self.image = asset.image
-            self.image_data = asset.image_data
+            self.path_id = asset.path_id
             self.width = asset.m_Width
             self.height = asset.m_Height
+            self.format = asset.m_TextureFormat
             self.size = asset.m_CompleteImageSize
             self.image_count = asset.m_ImageCount
             self.has_image = self.image_count > 0
         except Exception as e:
-            self.data = None
-            self.name = None
-            logger.warn(f"Failed parsing Texture2D: {e}")
+            self.name, self.path_id, self.format = None, None, None
+            self.width = self.height = self.size = self.image_count = 0
+            self.has_image = False
+            self.parse_failed(e)
             # print(f"{vars(asset)}\n")
+        # the decoded image is only created when it is first used
+        self._image = None
+        self._image_digest = None
+
+    @classmethod
+    def from_summary(cls, entry, read) -> "Texture2D":
+        """
+        Create a Texture2D from the indexed header metadata without reading the Unity object.
+        :param entry: The ObjectSummary of the Texture2D object.
+        :param read: A callable that returns the UnityPy object of the summary when `data` is first accessed.
+        """
+        from UnityPy.enums import TextureFormat
+        texture = cls.__new__(cls)
+        AssetRecord.__init__(texture, None, entry, read)
+        texture._image = None
+        # hashed by the scanner, so unchanged textures are compared without reading their pixel data
+        texture._image_digest = entry.extra.get("image_digest")
+        texture.name = entry.name
+        texture.path_id = entry.path_id
+        texture.width = entry.extra["width"]
+        texture.height = entry.extra["height"]
+        texture.format = TextureFormat(entry.extra["format"])
+        texture.size = entry.extra["size"]
+        texture.image_count = entry.extra["image_count"]
+        texture.has_image = texture.image_count > 0
+        return texture
 
     def __str__(self) -> str:
-        if self.data is None:
+        if self.name is None:
             return ""
         ret = f"Name: {self.name}\nw: {self.width}px, h: {self.height}px\n"
-        ret += f"Image Size: {self.size}\n"
+        ret += f"Image Size: {self.size}\nFormat: {self.format.name}\n"
         ret += f"Has Image: {self.has_image}\nImage Count: {self.image_count}\n"
         return ret
 
@@ -52,6 +83,50 @@ class Texture2D:
         ret += "\t\t}}\n\t}}\n}}"
         return ret
 
+    @property
+    def image(self):
+        """ Return the decoded PIL image, decoding the pixel data on first access """
+        if self._image is None and self.data is not None:
+            self._image = self.data.image
+        return self._image
+
+    @property
+    def image_data(self) -> bytes:
+        """ Return the raw (possibly compressed) pixel data of the texture """
+        return self.data.image_data if self.data is not None else b""
+
+    @property
+    def image_digest(self) -> str:
+        """ Return the digest of the raw pixel data, from the asset index or by hashing the pixel data once """
+        if self._image_digest is None:
+            self._image_digest = get_digest(self.image_data)
+        return self._image_digest
+
+    def release_image(self) -> None:
+        """ Drop the decoded image and the UnityPy object (or its streamed pixel data) so the memory can be freed """
+        self._image = None
+        if self._read is not None:
+            self.release_data()
+            return
+        # streamed pixel data is read again from the .resS file if it is needed later
+        asset = self._data
+        if asset is not None and asset.m_StreamData is not None and asset.m_StreamData.path:
+            asset._image_data = b""
+
+    @property
+    def stream_source(self) -> Optional[tuple]:
+        """ Return the (path, offset, size) of the streamed pixel data in its .resS file or None if it is not streamed """
+        stream = self.data.m_StreamData if self.data is not None else None
+        if stream is None:
+            return None
+        return get_stream_source(self.data, stream.path, stream.offset, stream.size)
+
+    def export_job(self, path: str) -> TextureJob:
+        """ Return a job that decodes and saves the texture as a .png file in a worker process """
+        return TextureJob(self.name, path, self.image_data, self.width, self.height, self.format,
+                          self.data.version, self.data.platform, getattr(self.data, "m_PlatformBlob", None),
+                          self.stream_source)
+
     @property
     def spritesheet(self) -> bool:
         """ Return True if the asset is used as a spritesheet file """
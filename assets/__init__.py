@@ -1,8 +1,15 @@
-from .AudioClip import AudioClip
-from .BuildSettings import BuildSettings
-from .GameObject import GameObject
-from .MonoBehaviour import MonoBehaviour
-from .MonoScript import MonoScript
-from .SpriteAtlas import SpriteAtlas
-from .TextAsset import TextAsset
-from .Texture2D import Texture2D
+from utils.Lazy import export_lazily
+
+# the module of every exported name, a module is only imported when one of its names is first used
+export_lazily(__name__, {
+    "AudioClip": ".AudioClip",
+    "BuildSettings": ".BuildSettings",
+    "GameObject": ".GameObject",
+    "MonoBehaviour": ".MonoBehaviour",
+    "MonoScript": ".MonoScript",
+    "NamespaceClassifier": ".Namespaces", "register_namespace": ".Namespaces",
+    "AssetRecord": ".Record",
+    "SpriteAtlas": ".SpriteAtlas",
+    "TextAsset": ".TextAsset",
+    "Texture2D": ".Texture2D"
+})
@@ -0,0 +1,86 @@
+""" Micro-benchmark of the MonoScript namespace classifier against the former chain of namespace checks """
+import argparse
+import random
+import sys
+from os.path import dirname, abspath
+from timeit import timeit
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from assets.Enums import PacketTypes, AppEngineTypes, OtherTypes  # noqa: E402
+from assets.Namespaces import NAMESPACES, NamespaceClassifier  # noqa: E402
+
+# namespaces that do not belong to any category, like most scripts of a build
+OTHER_NAMESPACES = [
+    "", "UnityEngine.UI", "TMPro", "DecaGames.RotMG.UI", "DecaGames.RotMG.Objects", "DecaGames.RotMG.Net",
+    "DecaGames.RotMG.Net.SocketServer", "DecaGames.RotMG.Managers.Audio", "Cinemachine", "Spine.Unity"
+]
+
+
+def parse_namespace_chain(namespace: str):
+    """ The namespace checks that ran for every MonoScript before the classifier existed """
+    if NAMESPACES["Packets"]["Incoming"] in namespace:
+        return PacketTypes.INCOMING
+    elif NAMESPACES["Packets"]["Outgoing"] in namespace:
+        return PacketTypes.OUTGOING
+    elif namespace == NAMESPACES["Packets"]["DataObject"]:
+        return PacketTypes.DATA
+    elif NAMESPACES["AppEngine"]["Commands"] in namespace:
+        return AppEngineTypes.COMMANDS
+    elif namespace == NAMESPACES["AppEngine"]["Messages"]:
+        return AppEngineTypes.MESSAGES
+    elif namespace == NAMESPACES["AppEngine"]["Outgoing"]:
+        return AppEngineTypes.OUTGOING
+    elif namespace == NAMESPACES["AppEngine"]["XML"]:
+        return AppEngineTypes.XML
+    elif namespace == NAMESPACES["Effects"]:
+        return OtherTypes.EFFECT
+    elif namespace == NAMESPACES["Particles"]:
+        return OtherTypes.PARTICLE
+    elif namespace == NAMESPACES["MapObjects"]:
+        return OtherTypes.MAP_OBJECT
+    return None
+
+
+def get_namespaces(count: int, seed: int = 0) -> list:
+    """ Return a synthetic list of MonoScript namespaces with a realistic share of classified namespaces """
+    rng = random.Random(seed)
+    known = [NAMESPACES["Packets"]["Incoming"], NAMESPACES["Packets"]["Outgoing"], NAMESPACES["Packets"]["DataObject"],
+             NAMESPACES["AppEngine"]["Commands"], NAMESPACES["AppEngine"]["Messages"], NAMESPACES["Effects"],
+             NAMESPACES["Particles"], NAMESPACES["MapObjects"]]
+    namespaces = []
+    for i in range(count):
+        if rng.random() < 0.2:
+            namespaces.append(rng.choice(known))
+        elif rng.random() < 0.5:
+            namespaces.append(f"{rng.choice(OTHER_NAMESPACES)}.Generated{i % 500}".lstrip("."))
+        else:
+            namespaces.append(rng.choice(OTHER_NAMESPACES))
+    return namespaces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MonoScript namespace classifier.")
+    parser.add_argument("-n", "--count", type=int, default=50000, help="The number of synthetic namespaces.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="The number of timed passes.")
+    args = parser.parse_args()
+
+    namespaces = get_namespaces(args.count)
+    classifier = NamespaceClassifier()
+    mismatches = [ns for ns in set(namespaces) if classifier.classify(ns) != parse_namespace_chain(ns)]
+    if mismatches:
+        print(f"The classifier disagrees with the former checks for: {mismatches}")
+
+    chain = timeit(lambda: [parse_namespace_chain(ns) for ns in namespaces], number=args.repeat) / args.repeat
+    # a new classifier per pass includes building the cache of distinct namespaces
+    cold = timeit(lambda: [c.classify(ns) for c in [NamespaceClassifier()] for ns in namespaces],
+                  number=args.repeat) / args.repeat
+    warm = timeit(lambda: [classifier.classify(ns) for ns in namespaces], number=args.repeat) / args.repeat
+    print(f"{args.count} namespaces ({len(set(namespaces))} distinct), mean of {args.repeat} passes:")
+    print(f"  chain of checks:      {chain * 1000:8.2f} ms")
+    print(f"  classifier (cold):    {cold * 1000:8.2f} ms ({chain / cold:.1f}x)")
+    print(f"  classifier (cached):  {warm * 1000:8.2f} ms ({chain / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
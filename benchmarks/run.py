@@ -0,0 +1,193 @@
+""" Time every phase of an extraction over a synthetic install and record the results to a JSON file """
+import argparse
+import datetime
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from operator import methodcaller
+from os.path import dirname, abspath, join
+from tempfile import TemporaryDirectory
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import UnityPy  # noqa: E402
+
+from utils import Resources, UnityExtractor  # noqa: E402
+from assets import AudioClip, GameObject, MonoBehaviour, MonoScript, TextAsset, Texture2D  # noqa: E402
+from benchmarks.synthetic import ATLAS_IDS, TEXTURE_FORMATS, generate, get_file_name, get_spritesheet  # noqa: E402
+from utils.Files import get_memory_usage, get_peak_memory  # noqa: E402
+from utils.Resources import ASSET_TYPES, DEFAULT_ASSET_TYPES  # noqa: E402
+from utils.Scanner import read_class_ids, scan_files  # noqa: E402
+from utils.Spritesheets import JSON_BACKENDS, load_spritesheet  # noqa: E402
+
+# the wrapper classes that are constructed in the 'wrappers' phase
+WRAPPERS = {"AudioClip": AudioClip, "GameObject": GameObject, "MonoBehaviour": MonoBehaviour,
+            "MonoScript": MonoScript, "TextAsset": TextAsset, "Texture2D": Texture2D}
+# the extraction stages that are timed, in the order extractor.py runs them
+STAGES = ["packets", "xml", "spritesheets", "manifests", "texture2d", "sprites", "gamedata", "audio"]
+
+
+def get_commit() -> str:
+    """ Return the current git commit of the repository or an empty string """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class PhaseTimer:
+    """ Records the wall time and memory of named benchmark phases """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.phases = {}
+
+    def run(self, name: str, func, *args, **kwargs):
+        """ Run a phase and keep its best wall time and highest memory over all repetitions """
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        phase = {"seconds": seconds, "rss_mb": get_memory_usage() / 2 ** 20,
+                 "peak_rss_mb": get_peak_memory() / 2 ** 20}
+        if self.trace_memory:
+            phase["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        previous = self.phases.get(name)
+        if previous is not None:
+            phase = {key: min(value, previous[key]) if key == "seconds" else max(value, previous[key])
+                     for key, value in phase.items()}
+        self.phases[name] = phase
+        return result
+
+
+def load_files(paths: list) -> int:
+    """ Load every asset file with UnityPy and return the number of objects """
+    return sum(len(UnityPy.load(path).objects) for path in paths)
+
+
+def prescan_files(paths: list) -> int:
+    """ Read the type table of every asset file without loading it and return the number of types """
+    return sum(len(read_class_ids(path) or []) for path in paths)
+
+
+def build_wrappers(paths: list) -> int:
+    """
+    Read every object and construct its asset wrapper like Resources does, return the number of wrappers.
+    The wrappers are held until the phase ends, so its memory includes what they keep alive.
+    """
+    wrappers = []
+    for path in paths:
+        for obj in UnityPy.load(path).objects:
+            wrapper = WRAPPERS.get(obj.type.name)
+            if wrapper is not None:
+                # the object reader takes the place of the object summary to read the object again
+                wrappers.append(wrapper(obj.read(), obj, methodcaller("read")))
+    return len(wrappers)
+
+
+def parse_spritesheet(sheet_data: bytes, backend: str) -> int:
+    """ Parse 'spritesheet.json' with a JSON library and return the number of sprites """
+    sheet = load_spritesheet(sheet_data, backend)
+    return len(sheet["sprites"]) + len(sheet["animatedSprites"])
+
+
+def run_benchmark(args: argparse.Namespace, resource_path: str, output_root: str, timer: PhaseTimer,
+                  sheet_data: bytes) -> None:
+    """ Run every phase once over the synthetic install """
+    paths = [join(resource_path, get_file_name(i)) for i in range(args.files)]
+    # the spritesheet is parsed from a memoryview, like the mapped asset file it is read from
+    for backend in JSON_BACKENDS:
+        timer.run(f"parse.{backend}", parse_spritesheet, memoryview(sheet_data), backend)
+    timer.run("load", load_files, paths)
+    timer.run("prescan", prescan_files, paths)
+    timer.run("scan", scan_files, paths, set(ASSET_TYPES), args.jobs)
+    timer.run("wrappers", build_wrappers, paths)
+    resources = timer.run("resources", Resources, resource_path, set(DEFAULT_ASSET_TYPES), args.jobs)
+    # a fresh output folder without a manifest, so every output is written
+    with TemporaryDirectory(dir=output_root) as output_path:
+        extractor = UnityExtractor(resources, output_path, args.jobs)
+        for stage in STAGES:
+            timer.run(stage, getattr(extractor, f"extract_{stage}"))
+        timer.run("finish", extractor.finish)
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    """ Print the wall time change of every phase against an older results file """
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)
+    print(f"\nCompared with {baseline.get('commit') or baseline_path}:")
+    for name, phase in results["phases"].items():
+        old = baseline["phases"].get(name)
+        if old is None:
+            print(f"  {name:<13} {phase['seconds']:8.3f} s  (new phase)")
+            continue
+        change = (phase["seconds"] - old["seconds"]) / old["seconds"] * 100 if old["seconds"] else 0.0
+        print(f"  {name:<13} {phase['seconds']:8.3f} s  (was {old['seconds']:.3f} s, {change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extractor on a synthetic Unity install.")
+    parser.add_argument("--monoscripts", type=int, default=2000, help="The number of MonoScripts.")
+    parser.add_argument("--textassets", type=int, default=50, help="The number of XML sheets.")
+    parser.add_argument("--textures", type=int, default=20, help="The number of Texture2Ds.")
+    parser.add_argument("--texture-size", type=int, default=256, help="The width and height of every texture.")
+    parser.add_argument("--texture-format", choices=TEXTURE_FORMATS, default="DXT5", help="The texture format.")
+    parser.add_argument("--audioclips", type=int, default=20, help="The number of AudioClips.")
+    parser.add_argument("--gameobjects", type=int, default=2000,
+                        help="The number of GameObjects, each with a MonoBehaviour.")
+    parser.add_argument("--files", type=int, default=2, help="The number of asset files.")
+    parser.add_argument("--spritesheet-size", type=int, default=1024,
+                        help="The atlas size the 'spritesheet.json' parsed by every JSON library covers.")
+    parser.add_argument("--inline-textures", action="store_true", help="Store pixel data inline, not in .resS files.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="The number of worker processes.")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="Run every phase N times and keep the best time.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also record the peak Python allocations of each phase (slows every phase down).")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="The JSON results file.")
+    parser.add_argument("-c", "--compare", metavar="RESULTS", help="An older results file to compare against.")
+    args = parser.parse_args()
+
+    timer = PhaseTimer(args.trace_memory)
+    with TemporaryDirectory() as root:
+        resource_path = join(root, "resources")
+        start = time.perf_counter()
+        config = generate(resource_path, args.monoscripts, args.textassets, args.textures, args.texture_size,
+                          args.texture_format, args.files, not args.inline_textures, audioclips=args.audioclips,
+                          gameobjects=args.gameobjects)
+        sheet_data = get_spritesheet(list(ATLAS_IDS), args.spritesheet_size)
+        generate_seconds = time.perf_counter() - start
+        for _ in range(args.repeat):
+            run_benchmark(args, resource_path, root, timer, sheet_data)
+
+    results = {
+        "commit": get_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": dict(config, jobs=args.jobs, repeat=args.repeat),
+        "generate_seconds": generate_seconds,
+        "phases": timer.phases,
+        "total_seconds": sum(phase["seconds"] for phase in timer.phases.values())
+    }
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    print(f"\n{'phase':<13} {'seconds':>8} {'rss MB':>8} {'peak MB':>8}")
+    for name, phase in timer.phases.items():
+        print(f"{name:<13} {phase['seconds']:8.3f} {phase['rss_mb']:8.1f} {phase['peak_rss_mb']:8.1f}")
+    print(f"Saved the results to '{args.output}'")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+""" Time the startup of the extractor in fresh processes and fail if it regressed or loads heavy dependencies early """
+import argparse
+import subprocess
+import sys
+import time
+from os.path import dirname, abspath, join
+from tempfile import TemporaryDirectory
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate  # noqa: E402
+
+EXTRACTOR = join(ROOT, "extractor.py")
+# the modules that must only be imported by the stages that need them
+HEAVY_MODULES = ["UnityPy", "numpy", "PIL", "fsspec", "texture2ddecoder"]
+# runs Python code in a fresh interpreter and prints the heavy modules it imported to stderr when it exits
+LOADED_MODULES = "import atexit, sys; sys.path.insert(0, {root!r}); atexit.register(lambda: print(' '.join(" \
+                 "name for name in {modules!r} if name in sys.modules), file=sys.stderr)); {code}"
+
+
+def get_command(code: str) -> list:
+    """ Return the command that runs Python code and reports the heavy modules it imported """
+    return [sys.executable, "-c", LOADED_MODULES.format(root=ROOT, modules=HEAVY_MODULES, code=code)]
+
+
+def get_extractor_command(*arguments: str) -> list:
+    """ Return the command that runs extractor.py with arguments and reports the heavy modules it imported """
+    argv = [EXTRACTOR, *arguments]
+    return get_command(f"import runpy; sys.argv = {argv!r}; runpy.run_path({EXTRACTOR!r}, run_name='__main__')")
+
+
+def time_command(command: list, cwd: str, repeat: int) -> tuple:
+    """ Run a command a number of times and return the (best milliseconds, output of the last run) """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"'{' '.join(command)}' failed:\n{result.stderr}")
+    return best, result
+
+
+def check_startup(name: str, command: list, cwd: str, repeat: int, max_ms: float, modules: list,
+                  allowed: tuple = ()) -> bool:
+    """ Time a startup command and print whether it stayed under the threshold without importing heavy modules """
+    milliseconds, result = time_command(command, cwd, repeat)
+    loaded = (result.stderr.splitlines() or [""])[-1].split()
+    unexpected = [module for module in loaded if module in modules and module not in allowed]
+    passed = milliseconds <= max_ms and not unexpected
+    imported = f"  (imported {', '.join(unexpected)})" if unexpected else ""
+    print(f"{name:<22} {milliseconds:8.1f} ms  {'ok' if passed else 'FAILED'}{imported}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the extractor starts fast and imports dependencies lazily.")
+    parser.add_argument("--max-ms", type=float, default=300,
+                        help="The slowest accepted startup in milliseconds (default: 300).")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Run every command N times and keep the best time.")
+    parser.add_argument("--no-run", action="store_true",
+                        help="Skip the packets run over a synthetic install, only time the imports and --help.")
+    args = parser.parse_args()
+
+    passed = True
+    with TemporaryDirectory() as root:
+        passed &= check_startup("import utils, assets", get_command("import utils, assets"), root, args.repeat,
+                                args.max_ms, HEAVY_MODULES)
+        passed &= check_startup("extractor.py --help", get_extractor_command("--help"), root, args.repeat,
+                                args.max_ms, HEAVY_MODULES)
+        if not args.no_run:
+            resource_path, output_path = join(root, "resources"), join(root, "output")
+            generate(resource_path, monoscripts=200, textassets=5, textures=2, texture_size=16)
+            command = get_extractor_command("packets", "-i", resource_path, "-o", output_path, "--non-interactive",
+                                            "-q", "-j", "1")
+            # the first run parses the files and writes the asset index, the timed runs only read the index
+            time_command(command, root, 1)
+            # the packet catalogue is built with numpy, but no Unity file is loaded for unchanged files
+            passed &= check_startup("extractor.py packets", command, root, args.repeat, args.max_ms * 2,
+                                    HEAVY_MODULES, allowed=("numpy",))
+    if not passed:
+        print("The startup regressed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
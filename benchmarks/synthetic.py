@@ -0,0 +1,332 @@
+""" Generate synthetic Unity asset files that look like a small Exalt install, without needing the game """
+import json
+import random
+import struct
+from os import makedirs
+from os.path import join, splitext
+
+# the Unity version and serialized file format the synthetic files are written as
+UNITY_VERSION = "2021.3.16f1"
+FORMAT_VERSION = 22
+TARGET_PLATFORM = 19  # StandaloneWindows64
+
+CLASS_IDS = {"GameObject": 1, "Texture2D": 28, "TextAsset": 49, "AudioClip": 83, "MonoBehaviour": 114,
+             "MonoScript": 115}
+
+# the texture formats that can be generated as (TextureFormat value, bits per pixel)
+TEXTURE_FORMATS = {"RGBA32": (4, 32), "DXT1": (10, 4), "DXT5": (12, 8), "ETC2_RGBA8": (47, 8)}
+
+# the namespaces of the generated MonoScripts, most scripts of a build are not classified
+SCRIPT_NAMESPACES = [
+    "DecaGames.RotMG.Net.SocketServer.Messages.Incoming",
+    "DecaGames.RotMG.Net.SocketServer.Messages.Outgoing",
+    "DecaGames.RotMG.Net.SocketServer.Messages.Data",
+    "DecaGames.RotMG.Objects.Effects",
+    "DecaGames.RotMG.Objects.Particles",
+    "DecaGames.RotMG.Objects.Map",
+    "DecaGames.RotMG.UI.Components",
+    "DecaGames.RotMG.Managers",
+    "UnityEngine.UI",
+    ""
+]
+
+# textures with these names are extracted as spritesheets
+SPRITESHEET_NAMES = ["characters", "characters_masks", "groundTiles", "mapObjects"]
+# the atlasId of each spritesheet texture in 'spritesheet.json'
+ATLAS_IDS = {"groundTiles": 1, "characters": 2, "mapObjects": 4}
+
+
+def get_file_name(file_index: int) -> str:
+    """ Return the name of a generated .assets file, the first one is named like the file every install has """
+    return "resources.assets" if file_index == 0 else f"sharedassets{file_index - 1}.assets"
+
+
+class Buffer:
+    """ A minimal little-endian writer mirroring the reads UnityPy performs """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def align(self, alignment: int = 4) -> None:
+        self.data += b"\0" * ((alignment - len(self.data) % alignment) % alignment)
+
+    def pack(self, fmt: str, *values) -> None:
+        self.data += struct.pack("<" + fmt, *values)
+
+    def string(self, value: str) -> None:
+        raw = value.encode("utf8")
+        self.pack("i", len(raw))
+        self.data += raw
+        self.align()
+
+    def array(self, value: bytes) -> None:
+        self.pack("i", len(value))
+        self.data += value
+
+
+def monoscript(name: str, namespace: str) -> bytes:
+    """ Return the serialized data of a MonoScript object """
+    buf = Buffer()
+    buf.string(name)
+    buf.pack("i", 0)  # m_ExecutionOrder
+    buf.data += bytes(16)  # m_PropertiesHash
+    buf.string(name)  # m_ClassName
+    buf.string(namespace)
+    buf.string("Assembly-CSharp.dll")
+    return bytes(buf.data)
+
+
+def textasset(name: str, script: bytes) -> bytes:
+    """ Return the serialized data of a TextAsset object """
+    buf = Buffer()
+    buf.string(name)
+    buf.array(script)
+    buf.align()
+    return bytes(buf.data)
+
+
+def texture2d(name: str, width: int, height: int, texture_format: int, image_data: bytes = b"",
+              stream: tuple = None) -> bytes:
+    """
+    Return the serialized data of a Texture2D object.
+    :param stream: The (offset, size, path) of pixel data stored in a .resS file instead of `image_data`.
+    """
+    buf = Buffer()
+    buf.string(name)
+    buf.pack("i??", -1, False, False)  # m_ForcedFallbackFormat, m_DownscaleFallback, m_IsAlphaChannelOptional
+    buf.align()
+    size = len(image_data) if stream is None else stream[1]
+    buf.pack("iiiiii", width, height, size, 0, texture_format, 1)  # ..., m_MipsStripped, m_TextureFormat, m_MipCount
+    buf.pack("????", False, False, False, False)  # readable, preprocessed, ignore limit, streaming mips
+    buf.align()
+    buf.pack("iii", 0, 1, 2)  # m_StreamingMipmapsPriority, m_ImageCount, m_TextureDimension
+    buf.pack("iifiii", 1, 1, 0.0, 1, 1, 1)  # GLTextureSettings
+    buf.pack("ii", 0, 1)  # m_LightmapFormat, m_ColorSpace
+    buf.array(b"")  # m_PlatformBlob
+    buf.align()
+    buf.array(image_data)
+    buf.align()
+    offset, length, path = stream if stream is not None else (0, 0, "")
+    buf.pack("QI", offset, length)
+    buf.string(path)
+    return bytes(buf.data)
+
+
+def audioclip(name: str, stream: tuple, channels: int = 2, frequency: int = 44100) -> bytes:
+    """
+    Return the serialized data of an AudioClip object.
+    :param stream: The (offset, size, path) of the audio data in a .resource file.
+    """
+    buf = Buffer()
+    buf.string(name)
+    buf.pack("iiiif?", 1, channels, frequency, 16, 1.0, False)  # m_LoadType, ..., m_Length, m_IsTrackerFormat
+    buf.align()
+    buf.pack("i???", 0, True, False, False)  # m_SubsoundIndex, m_PreloadAudioData, m_LoadInBackground, m_Legacy3D
+    buf.align()
+    offset, size, path = stream
+    buf.string(path)
+    buf.pack("Qqi", offset, size, 1)  # m_Offset, m_Size, m_CompressionFormat (Vorbis)
+    return bytes(buf.data)
+
+
+def gameobject(name: str, components: list, layer: int = 0) -> bytes:
+    """
+    Return the serialized data of a GameObject object.
+    :param components: The path ids of its components in the same file.
+    """
+    buf = Buffer()
+    buf.pack("i", len(components))
+    for path_id in components:
+        buf.pack("iq", 0, path_id)
+    buf.pack("i", layer)
+    buf.string(name)
+    buf.pack("H?", 0, True)  # m_Tag, m_IsActive
+    return bytes(buf.data)
+
+
+def monobehaviour(name: str, game_object: int, script: int, fields: bytes) -> bytes:
+    """
+    Return the serialized data of a MonoBehaviour object.
+    :param game_object: The path id of its GameObject in the same file.
+    :param script: The path id of its MonoScript.
+    :param fields: The serialized fields of the script, read as the raw data of the MonoBehaviour.
+    """
+    buf = Buffer()
+    buf.pack("iq", 0, game_object)
+    buf.pack("B", 1)  # m_Enabled
+    buf.align()
+    buf.pack("iq", 0, script)
+    buf.string(name)
+    buf.data += fields
+    return bytes(buf.data)
+
+
+def fsb5(samples: bytes, channels: int = 2) -> bytes:
+    """ Return an FMOD sound bank (FSB5) holding a single 44100 Hz PCM16 sound """
+    # frequency index 8 (44100 Hz), the channel flag, a data offset of 0 and the number of samples per channel
+    sample_header = struct.pack("<Q", 8 << 1 | (channels - 1) << 5 | (len(samples) // (2 * channels)) << 34)
+    header = struct.pack("<4sIIIIII", b"FSB5", 1, 1, len(sample_header), 0, len(samples), 2)  # 2 = PCM16
+    return header + bytes(32) + sample_header + samples
+
+
+def get_audio_data(rng: random.Random, index: int, size: int) -> bytes:
+    """ Return random audio data, alternating between an FMOD sound bank and an Ogg file by their magic bytes """
+    if index % 2 == 0:
+        return fsb5(rng.randbytes(size - len(fsb5(b""))))
+    return b"OggS" + rng.randbytes(size - 4)
+
+
+def write_serialized_file(path: str, objects: list) -> None:
+    """ Write a list of (class name, path_id, data) tuples as an uncompressed Unity serialized file """
+    class_names = sorted({obj[0] for obj in objects}, key=lambda name: CLASS_IDS[name])
+    type_index = {name: i for i, name in enumerate(class_names)}
+
+    meta = Buffer()
+    meta.data += UNITY_VERSION.encode() + b"\0"
+    meta.pack("i?i", TARGET_PLATFORM, False, len(class_names))
+    for name in class_names:
+        meta.pack("i?h", CLASS_IDS[name], False, -1)
+        if name == "MonoBehaviour":
+            meta.data += bytes(16)  # script id
+        meta.data += bytes(16)  # old type hash
+    meta.pack("i", len(objects))
+    header_size = 48
+    offsets, cursor = [], 0
+    for _, _, data in objects:
+        offsets.append(cursor)
+        cursor += (len(data) + 7) & ~7
+    for (name, path_id, data), offset in zip(objects, offsets):
+        # the object table is aligned relative to the absolute file position
+        meta.data += b"\0" * ((4 - (header_size + len(meta.data)) % 4) % 4)
+        meta.pack("qqIi", path_id, offset, len(data), type_index[name])
+    meta.pack("iii", 0, 0, 0)  # script types, externals, ref types
+    meta.data += b"\0"  # user information
+
+    data_offset = (header_size + len(meta.data) + 15) & ~15
+    with open(path, "wb") as file:
+        file.write(struct.pack(">IIII", 0, 0, FORMAT_VERSION, 0))
+        file.write(struct.pack(">B3x", 0))
+        file.write(struct.pack(">Iqqq", len(meta.data), data_offset + cursor, data_offset, 0))
+        file.write(meta.data)
+        file.write(b"\0" * (data_offset - header_size - len(meta.data)))
+        for _, _, data in objects:
+            file.write(data)
+            file.write(b"\0" * (((len(data) + 7) & ~7) - len(data)))
+
+
+def get_xml_sheet(rng: random.Random, index: int, entries: int = 200) -> bytes:
+    """ Return a synthetic XML sheet shaped like the Exalt object sheets """
+    lines = ["<Objects>"]
+    for i in range(entries):
+        lines.append(f'\t<Object type="0x{index * entries + i:04x}" id="Object {index}-{i}">'
+                     f'<Class>{rng.choice(["Equipment", "Character", "GameObject", "Wall"])}</Class>'
+                     f'<Size>{rng.randint(50, 150)}</Size></Object>')
+    lines.append("</Objects>")
+    return "\n".join(lines).encode("utf8")
+
+
+def get_spritesheet(atlases: list, texture_size: int, sprite_size: int = 8) -> bytes:
+    """
+    Return a 'spritesheet.json' that covers every atlas with a grid of sprites.
+    Half of the 'characters' atlas is used for animated sprites with 6 frames per object.
+    """
+    sprites, animated = [], []
+    per_row = texture_size // sprite_size
+    for atlas in atlases:
+        atlas_id = ATLAS_IDS[atlas]
+        elements = []
+        for i in range(per_row * per_row):
+            position = {"x": (i % per_row) * sprite_size, "y": (i // per_row) * sprite_size,
+                        "w": sprite_size, "h": sprite_size}
+            element = {"padding": 0, "index": i, "atlasId": atlas_id, "position": position,
+                       "maskPosition": position if atlas == "characters" else {"x": 0, "y": 0, "w": 0, "h": 0}}
+            if atlas == "characters" and i % 2:
+                frame = i // 2
+                animated.append({"index": frame // 6, "spriteSheetName": "players", "direction": frame % 2,
+                                 "action": frame % 6 // 2, "set": 0, "spriteData": element})
+            else:
+                elements.append(element)
+        sprites.append({"spriteSheetName": f"{atlas}{sprite_size}x{sprite_size}", "atlasId": atlas_id,
+                        "elements": elements})
+    return json.dumps({"sprites": sprites, "animatedSprites": animated}).encode("utf8")
+
+
+def generate(path: str, monoscripts: int = 2000, textassets: int = 50, textures: int = 20, texture_size: int = 256,
+             texture_format: str = "DXT5", files: int = 1, stream_textures: bool = True, seed: int = 0,
+             audioclips: int = 0, audio_size: int = 1 << 16, gameobjects: int = 0, fields_size: int = 256) -> dict:
+    """
+    Generate a synthetic resource directory and return a summary of its content.
+    :param path: The resource directory to create.
+    :param monoscripts: The number of MonoScripts, spread over all packet and name categories.
+    :param textassets: The number of XML sheets, the spritesheet and manifest TextAssets are added to these.
+    :param textures: The number of Texture2Ds, the first ones are named like the Exalt spritesheets.
+    :param texture_size: The width and height of every texture.
+    :param texture_format: A key of TEXTURE_FORMATS.
+    :param files: The number of .assets files the objects are spread over.
+    :param stream_textures: Store the pixel data in .resS files like the game does instead of inline.
+    :param seed: The random seed, the same arguments always generate the same files.
+    :param audioclips: The number of AudioClips, their data is stored in .resource files like the game does.
+    :param audio_size: The size of the audio data of every AudioClip in bytes.
+    :param gameobjects: The number of GameObjects, each has a MonoBehaviour of one of the MonoScripts.
+    :param fields_size: The size of the serialized fields of every MonoBehaviour in bytes.
+    """
+    rng = random.Random(seed)
+    makedirs(path, exist_ok=True)
+    format_id, bits = TEXTURE_FORMATS[texture_format]
+    image_size = texture_size * texture_size * bits // 8
+    objects = [[] for _ in range(files)]
+    path_id = 1
+
+    def add(class_name: str, data: bytes, file_index: int) -> None:
+        nonlocal path_id
+        objects[file_index].append((class_name, path_id, data))
+        path_id += 1
+
+    for i in range(monoscripts):
+        add("MonoScript", monoscript(f"Script{i}", SCRIPT_NAMESPACES[i % len(SCRIPT_NAMESPACES)]), i % files)
+    for i in range(textassets):
+        add("TextAsset", textasset(f"sheet{i}", get_xml_sheet(rng, i)), i % files)
+    atlases = [name for name in SPRITESHEET_NAMES[:textures] if name in ATLAS_IDS]
+    add("TextAsset", textasset("spritesheet", get_spritesheet(atlases, texture_size)), 0)
+    add("TextAsset", textasset("manifest", b'{"assets":[]}'), 0)
+    add("TextAsset", textasset("assets_manifest", b"<Manifest/>"), 0)
+
+    streams = [bytearray() for _ in range(files)]
+    for i in range(textures):
+        name = SPRITESHEET_NAMES[i] if i < len(SPRITESHEET_NAMES) else f"texture{i}"
+        image_data = rng.randbytes(image_size)
+        file_index = i % files
+        if stream_textures:
+            stream = (len(streams[file_index]), image_size, f"{get_file_name(file_index)}.resS")
+            streams[file_index] += image_data
+            add("Texture2D", texture2d(name, texture_size, texture_size, format_id, stream=stream), file_index)
+        else:
+            add("Texture2D", texture2d(name, texture_size, texture_size, format_id, image_data), file_index)
+
+    audio_streams = [bytearray() for _ in range(files)]
+    for i in range(audioclips):
+        file_index = i % files
+        resource_name = f"{splitext(get_file_name(file_index))[0]}.resource"
+        stream = (len(audio_streams[file_index]), audio_size, resource_name)
+        audio_streams[file_index] += get_audio_data(rng, i, audio_size)
+        add("AudioClip", audioclip(f"sound{i}", stream), file_index)
+
+    for i in range(gameobjects):
+        # the MonoScripts have the first path ids, a GameObject is followed by its MonoBehaviour
+        script = i % monoscripts + 1 if monoscripts else 0
+        add("GameObject", gameobject(f"Object{i}", [path_id + 1]), i % files)
+        add("MonoBehaviour", monobehaviour(f"Object{i}", path_id - 1, script, rng.randbytes(fields_size)), i % files)
+
+    for file_index in range(files):
+        file_name = get_file_name(file_index)
+        write_serialized_file(join(path, file_name), objects[file_index])
+        if streams[file_index]:
+            with open(join(path, f"{file_name}.resS"), "wb") as file:
+                file.write(streams[file_index])
+        if audio_streams[file_index]:
+            with open(join(path, f"{splitext(file_name)[0]}.resource"), "wb") as file:
+                file.write(audio_streams[file_index])
+    return {"monoscripts": monoscripts, "textassets": textassets + 3, "textures": textures,
+            "texture_size": texture_size, "texture_format": texture_format, "files": files,
+            "stream_textures": stream_textures, "seed": seed, "audioclips": audioclips, "audio_size": audio_size,
+            "gameobjects": gameobjects, "fields_size": fields_size}
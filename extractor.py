@@ -1,39 +1,101 @@
 import os
 import time
 from sys import argv, exit as exit_program
-from argparse import ArgumentParser, Namespace
-from utils import Logger, Resources, UnityExtractor
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+# only the light modules are imported at startup, the stages import UnityPy, numpy and PIL when they run
+from utils import CAPTURE_MODES, Logger, Profiler, line_break, set_interactive, set_verbosity
 
 logger = Logger()
+profiler = Profiler()
 
+# all extraction stages that can be selected on the command line
+STAGES = ["packets", "xml", "spritesheets", "manifests", "texture2d", "sprites", "gamedata", "audio"]
+# the extraction stages that run when no stage is selected on the command line
+DEFAULT_STAGES = ["packets", "xml", "spritesheets", "manifests"]
+# the stage of every command word (e.g. `extractor.py packets textures`), the same as the stage flags
+COMMANDS = {**{stage: stage for stage in STAGES}, "textures": "texture2d"}
 
+
+@profiler.profile("total")
 def main(args: Namespace):
     """ The entry point of the program """
     start_time = time.time()
     # logger.info(f"Arguments: {vars(args)}\n")
+    from utils import Resources, UnityExtractor, check_output_path, diff_sources, get_asset_types, \
+        get_default_index_path, get_resource_path, resolve_resource_path
+
+    # find the resource path before anything is written, a wrong path fails right away instead of prompting
+    input_path = resolve_resource_path(args.input) if args.input is not None else get_resource_path()
 
     # check for a custom output path or fallback to the default
     output_path = args.output
     assert_path_exists(output_path)
     logger.info(f"Using output folder: '{output_path}'")
 
-    # check for a custom input path
-    if args.input is not None:
-        resources = Resources(args.input)
-    else:
-        resources = Resources()
+    index_path = None if args.no_index else (args.index or get_default_index_path(output_path))
+    # compare two installs instead of extracting any assets
+    if args.diff is not None:
+        logger.info(f"Comparing the assets of '{args.diff}' with the current install...")
+        diff = diff_sources(resolve_resource_path(args.diff, allow_files=True), input_path, args.jobs, index_path)
+        diff.save(output_path)
+        line_break()
+        logger.success(f"Finished in {round((time.time() - start_time), 2)} seconds\n")
+        return
+
+    # the output folder is replaced by a staging folder next to it, check that it can be before anything is read
+    try:
+        output_path = check_output_path(output_path)
+    except ValueError as e:
+        logger.critical(f"{e}\n")
+        exit_program(1)
 
-    extractor = UnityExtractor(resources, output_path)
+    # only run the stages selected by command words or flags or fall back to the default stages
+    stages = [stage for stage in STAGES if stage in args.stages or getattr(args, stage)] or DEFAULT_STAGES
+    # only read the asset types the selected stages need, everything else is read on demand
+    # reuse the asset index of the last run so unchanged files are not parsed again
+    streaming = args.streaming or args.max_memory is not None
+    asset_types = set() if streaming else get_asset_types(stages)
+    # files that can not contain any asset type of the selected stages are never opened
+    resources = Resources(input_path, asset_types, args.jobs, index_path, get_asset_types(stages))
 
-    extractor.extract_packets()  # extract all packet names
-    extractor.extract_xml(True)  # save all XML sheet files
-    extractor.extract_spritesheets(True)  # save all spritesheet .png files and spritesheet.json
-    extractor.extract_manifests()  # save both the manifest_json json and xml files
+    extractor = UnityExtractor(resources, output_path, args.jobs, args.incremental)
 
-    print()  # line break
+    if streaming:
+        # read and extract the assets file by file to keep memory usage bounded
+        max_memory = args.max_memory * 1024 * 1024 if args.max_memory is not None else None
+        extractor.extract_streaming(stages, max_memory, args.sprite_strips, args.normalize_xml, args.raw_audio)
+    else:
+        if "packets" in stages:
+            extractor.extract_packets()  # extract all packet names
+        if "xml" in stages:
+            extractor.extract_xml(True, args.normalize_xml)  # save all XML sheet files
+        if "spritesheets" in stages:
+            extractor.extract_spritesheets(True)  # save all spritesheet .png files and spritesheet.json
+        if "manifests" in stages:
+            extractor.extract_manifests()  # save both the manifest_json json and xml files
+        if "texture2d" in stages:
+            extractor.extract_texture2d()  # save every Texture2D image
+        if "sprites" in stages:
+            extractor.extract_sprites(args.sprite_strips)  # cut every sprite out of the spritesheets
+        if "gamedata" in stages:
+            extractor.extract_gamedata()  # consolidate the XML sheets into indexed lookup files
+        if "audio" in stages:
+            extractor.extract_audio(args.raw_audio)  # save every AudioClip as a .wav, .ogg or raw .fsb file
+    # remove stale outputs, save the output manifest and replace the output folder with the staged outputs
+    if not extractor.finish():
+        exit_program(1)
+
+    line_break()
     logger.success(f"Finished in {round((time.time() - start_time), 2)} seconds\n")
 
 
+def get_stage(command: str) -> str:
+    """ Return the stage of a command word, used as the argparse type of the stage commands """
+    if command not in COMMANDS:
+        raise ArgumentTypeError(f"invalid stage '{command}' (choose from {', '.join(COMMANDS)})")
+    return COMMANDS[command]
+
+
 def assert_path_exists(path: str):
     """ Attempt to create a path if it doesn't exist and exit if it fails """
     if not os.path.exists(path):
@@ -47,16 +109,71 @@ def assert_path_exists(path: str):
 if __name__ == '__main__':
     desc = "Extract game data from the RotMG Exalt Unity resource files."
     desc += " If no arguments are passed, it will try to extract all possible assets."
-    usage = f"python3 {argv[0]} [optional arguments]"
+    desc += " Stages are selected with commands (e.g. 'packets xml') or the equivalent flags."
+    usage = f"python3 {argv[0]} [STAGE ...] [optional arguments]"
 
     parser = ArgumentParser(description=desc, usage=usage)
+    parser.add_argument('stages', nargs='*', type=get_stage, metavar='STAGE',
+                        help=f'the stages to run: {", ".join(COMMANDS)} (default: {" ".join(DEFAULT_STAGES)})')
     parser.add_argument('-o', '--output', type=str, default="output",
                         help='the output directory for extracted data (default: "output")')
     parser.add_argument('-i', '--input', type=str,
-                        help='use a custom Exalt resources directory')
-    # parser.add_argument('-p', '--packets', action='store_true', help='extract all packet names.')
+                        help='use a custom Exalt resources directory, game folder, Wine prefix or extracted client archive')
+    parser.add_argument('--non-interactive', action='store_true',
+                        help='never ask for input, exit if the resource path is not found (default in CI or without a terminal)')
+    parser.add_argument('-p', '--packets', action='store_true', help='extract all packet names')
+    parser.add_argument('-x', '--xml', action='store_true', help='extract all XML sheets')
+    parser.add_argument('-s', '--spritesheets', action='store_true', help='extract all spritesheets')
+    parser.add_argument('-m', '--manifests', action='store_true', help='extract the asset manifest files')
+    parser.add_argument('--normalize-xml', action='store_true',
+                        help='save the XML sheets with canonical whitespace and attribute order for stable diffs')
+    parser.add_argument('-t', '--texture2d', action='store_true', help='extract all Texture2D images')
+    parser.add_argument('-S', '--sprites', action='store_true',
+                        help='cut every sprite and animation frame out of the spritesheets')
+    parser.add_argument('--sprite-strips', action='store_true',
+                        help='save all frames of an animated object as one strip instead of one file per frame')
+    parser.add_argument('-g', '--gamedata', action='store_true',
+                        help='consolidate the objects, grounds and equipment of the XML sheets into indexed files')
+    parser.add_argument('-a', '--audio', action='store_true',
+                        help='extract all AudioClips, FMOD sound banks are decoded to .wav files (needs pyfmodex)')
+    parser.add_argument('--raw-audio', action='store_true',
+                        help='save the AudioClip sound banks as raw .fsb files without decoding them')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='the number of processes used to scan files and decode textures and audio (default: one per CPU core)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='read and extract assets file by file to keep memory usage low')
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help='the target memory usage in megabytes, above it the queued outputs are written and '
+                             'textures and audio are decoded one at a time before the next file is read '
+                             '(implies --streaming)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only write outputs whose source assets changed since the last run')
+    parser.add_argument('--diff', type=str, metavar='OLD',
+                        help='compare an older resources directory or asset index file with the current install')
+    parser.add_argument('--index', type=str,
+                        help='the asset index file used to skip unchanged files (default: next to the output folder)')
+    parser.add_argument('--no-index', action='store_true', help='always parse every file and do not write an index')
+    parser.add_argument('--profile-report', type=str, metavar='PATH',
+                        help='save the time, memory and object counts of every phase to a JSON file')
+    parser.add_argument('--profile-phase', type=str, metavar='PHASE',
+                        help='capture a single phase of the report in detail (e.g. "extract.texture2d")')
+    parser.add_argument('--profile-capture', choices=CAPTURE_MODES, default='cprofile',
+                        help='capture the phase with cProfile or tracemalloc (default: cprofile)')
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('-v', '--verbose', action='store_true',
+                           help='also print debug messages, e.g. every asset that could not be parsed')
+    verbosity.add_argument('-q', '--quiet', action='store_true',
+                           help='only print warnings and errors (the log file still gets every message)')
     # parser.add_argument('-b', '--binary', type=str, help='override the local GameAssembly.dll path.')
     # parser.add_argument('-m', '--metadata', type=str, help='override the local global-metadata.dll path.')
     # parse CLI arguments and run the program
-    arguments = parser.parse_args()
+    # stage commands may be mixed with the optional arguments (e.g. `packets -o out xml`)
+    arguments = parser.parse_intermixed_args()
+    set_verbosity(1 if arguments.verbose else -1 if arguments.quiet else 0)
+    if arguments.non_interactive:
+        set_interactive(False)
+    if arguments.profile_phase is not None:
+        profiler.set_capture(arguments.profile_phase, arguments.profile_capture)
     main(arguments)
+    if arguments.profile_report is not None:
+        profiler.save(arguments.profile_report)
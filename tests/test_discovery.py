@@ -0,0 +1,35 @@
+import pytest
+
+from utils.Discovery import RESOURCE_FILE, find_resource_path, resolve_resource_path
+
+
+@pytest.fixture
+def game(tmp_path):
+    """ An extracted client archive with the resource files in 'RotMG Exalt_Data' """
+    resources = tmp_path / "client" / "RotMG Exalt_Data"
+    resources.mkdir(parents=True)
+    (resources / RESOURCE_FILE).write_bytes(b"")
+    return tmp_path / "client"
+
+
+def test_find_resource_path(game, tmp_path):
+    resources = str(game / "RotMG Exalt_Data")
+    assert find_resource_path(str(game)) == resources
+    assert find_resource_path(resources) == resources
+    assert find_resource_path(str(tmp_path)) == resources
+    assert find_resource_path(str(tmp_path / "missing")) is None
+
+
+def test_files_resolve_to_their_folder(game):
+    resource_file = str(game / "RotMG Exalt_Data" / RESOURCE_FILE)
+    assert resolve_resource_path(resource_file) == str(game / "RotMG Exalt_Data")
+    assert resolve_resource_path(resource_file, allow_files=True) == resource_file
+
+
+def test_paths_without_resources_exit(tmp_path):
+    index_file = tmp_path / "output.index.json"
+    index_file.write_text("{}")
+    with pytest.raises(SystemExit):
+        resolve_resource_path(str(index_file))
+    with pytest.raises(SystemExit):
+        resolve_resource_path(str(tmp_path / "missing"))
@@ -0,0 +1,18 @@
+import utils.Extractor
+from utils.Extractor import UnityExtractor
+
+
+def test_limit_memory_writes_the_queue_and_limits_the_jobs(tmp_path, monkeypatch):
+    extractor = UnityExtractor(None, str(tmp_path / "output"), 2)
+    memory = {"usage": 200}
+    monkeypatch.setattr(utils.Extractor, "get_memory_usage", lambda: memory["usage"])
+    try:
+        extractor.writer.write("xml/a.xml", "queued")
+        extractor.limit_memory(100)
+        assert extractor.max_pending == 1
+        assert extractor.writer.queue.unfinished_tasks == 0
+        memory["usage"] = 50
+        extractor.limit_memory(100)
+        assert extractor.max_pending is None
+    finally:
+        extractor.writer.discard()
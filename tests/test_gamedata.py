@@ -0,0 +1,70 @@
+import sqlite3
+
+from utils.GameData import GameData, GameEntry, merge_entries, parse_sheet, save_database
+
+SHEET = b"""<Objects>
+    <Object type="0x0010" id="Sword"><Class>Equipment</Class></Object>
+    <Object type="0x0200" id="Pirate"><Class>Character</Class></Object>
+    <Object type="0x0010" id="Duplicate Sword"><Class>Equipment</Class></Object>
+    <Object type="zz" id="Invalid Type"/>
+    <Object id="No Type"/>
+    <Ground type="0x0010" id="Grass"/>
+</Objects>"""
+
+
+def get_entries() -> list:
+    more = parse_sheet("more", b'<Objects><Object type="0x1" id="Bag"/></Objects>')
+    return merge_entries(parse_sheet("objects", SHEET) + more)
+
+
+def test_parse_sheet():
+    entries = parse_sheet("objects", SHEET)
+    assert [(entry.kind, entry.type, entry.id) for entry in entries] == [
+        ("Object", 0x10, "Sword"), ("Object", 0x200, "Pirate"), ("Object", 0x10, "Duplicate Sword"),
+        ("Ground", 0x10, "Grass")]
+    assert entries[0].class_name == "Equipment"
+    assert entries[0].xml.startswith('<Object type="0x0010" id="Sword">')
+    assert parse_sheet("broken", b"<Objects>") == []
+
+
+def test_merge_keeps_the_first_entry_of_a_type():
+    assert [entry.id for entry in get_entries()] == ["Sword", "Pirate", "Grass", "Bag"]
+
+
+def test_lookups():
+    data = GameData.from_entries(get_entries())
+    assert len(data) == 4
+    assert data.by_type(0x10).id == "Sword"
+    assert data.by_type(0x10, "Ground").id == "Grass"
+    assert data.by_type(0x200).class_name == "Character"
+    assert data.by_type(0x300) is None
+    assert data.by_type(-1) is None
+    assert data.by_id("Bag") == GameEntry("Object", 1, "Bag", None, "more", '<Object type="0x1" id="Bag" />')
+    assert data.by_id("Missing") is None
+
+
+def test_save_and_load(tmp_path):
+    entries = get_entries()
+    path = tmp_path / "gamedata.index"
+    GameData.from_entries(entries).save(str(path))
+    data = GameData.load(str(path))
+    try:
+        for entry in entries:
+            assert data.by_type(entry.type, entry.kind) == entry
+            assert data.by_id(entry.id) == entry
+    finally:
+        data.close()
+
+
+def test_database(tmp_path):
+    path = tmp_path / "gamedata.db"
+    save_database(str(path), parse_sheet("objects", SHEET))
+    # an existing database is replaced
+    save_database(str(path), get_entries())
+    connection = sqlite3.connect(str(path))
+    try:
+        rows = connection.execute("SELECT kind, type, id FROM entries ORDER BY kind, type").fetchall()
+    finally:
+        connection.close()
+    assert rows == [("Ground", 0x10, "Grass"), ("Object", 1, "Bag"), ("Object", 0x10, "Sword"),
+                    ("Object", 0x200, "Pirate")]
@@ -0,0 +1,128 @@
+import json
+import os
+
+import pytest
+
+from utils.Index import INDEX_VERSION, AssetIndex
+from utils.Scanner import FileSummary, ObjectSummary, get_file_digest
+
+TYPES = {"MonoScript", "TextAsset"}
+
+
+@pytest.fixture
+def resources(tmp_path):
+    folder = tmp_path / "resources"
+    folder.mkdir()
+    (folder / "resources.assets").write_bytes(b"asset file content")
+    return folder
+
+
+def get_summary(path: str, types=TYPES, complete: bool = True) -> FileSummary:
+    objects = [ObjectSummary(path, asset_type, i + 1, f"{asset_type}{i}", i * 16, 16, None, f"digest{i}")
+               for i, asset_type in enumerate(sorted(types))]
+    file_stat = os.stat(path)
+    return FileSummary(path, objects, file_stat.st_size, file_stat.st_mtime, get_file_digest(path), complete)
+
+
+def get_index(tmp_path, resources) -> AssetIndex:
+    return AssetIndex(str(tmp_path / "output.index.json"), str(resources))
+
+
+def test_unchanged_file_is_served_from_the_index(tmp_path, resources):
+    path = str(resources / "resources.assets")
+    index = get_index(tmp_path, resources)
+    summary = get_summary(path)
+    index.update(summary, TYPES)
+    index.save()
+    loaded = get_index(tmp_path, resources)
+    assert loaded.lookup(path, TYPES) == summary
+    assert loaded.lookup(path, {"TextAsset"}) == summary
+    assert loaded.lookup(path) == summary
+
+
+def test_changed_files_are_scanned_again(tmp_path, resources):
+    path = resources / "resources.assets"
+    index = get_index(tmp_path, resources)
+    index.update(get_summary(str(path)), TYPES)
+    # the same size and a new modification time, but another content
+    path.write_bytes(b"asset file CONTENT")
+    os.utime(path, (1, 1))
+    assert index.lookup(str(path)) is None
+    # another size
+    path.write_bytes(b"more asset file content")
+    assert index.lookup(str(path)) is None
+
+
+def test_touched_file_keeps_its_summary(tmp_path, resources):
+    path = resources / "resources.assets"
+    index = get_index(tmp_path, resources)
+    summary = get_summary(str(path))
+    index.update(summary, TYPES)
+    index.save()
+    os.utime(path, (1, 1))
+    found = index.lookup(str(path))
+    assert found.objects == summary.objects and found.mtime == 1
+    # the new modification time is stored, so the content is not hashed again
+    assert index.changed
+
+
+def test_files_scanned_for_fewer_types(tmp_path, resources):
+    path = str(resources / "resources.assets")
+    index = get_index(tmp_path, resources)
+    index.update(get_summary(path, {"MonoScript"}), {"MonoScript"})
+    assert index.lookup(path, {"MonoScript"}) is not None
+    assert index.lookup(path, TYPES) is None
+    # scanning the unchanged file for other types keeps the stored objects
+    index.update(get_summary(path, {"Texture2D"}), {"Texture2D"})
+    found = index.lookup(path, {"MonoScript", "Texture2D"})
+    assert sorted(obj.type for obj in found.objects) == ["MonoScript", "Texture2D"]
+
+
+def test_incomplete_summaries_are_not_stored(tmp_path, resources):
+    path = str(resources / "resources.assets")
+    index = get_index(tmp_path, resources)
+    index.update(get_summary(path), TYPES)
+    index.update(get_summary(path, complete=False), TYPES)
+    assert index.lookup(path) is None
+
+
+def test_prune_removes_deleted_files(tmp_path, resources):
+    path = str(resources / "resources.assets")
+    index = get_index(tmp_path, resources)
+    index.update(get_summary(path), TYPES)
+    index.update_class_ids(path, [49, 115])
+    index.prune([])
+    assert index.lookup(path) is None
+    assert index.lookup_class_ids(path) == (False, None)
+
+
+def test_class_ids(tmp_path, resources):
+    path = resources / "resources.assets"
+    index = get_index(tmp_path, resources)
+    index.update_class_ids(str(path), [49, 115])
+    assert index.lookup_class_ids(str(path)) == (True, [49, 115])
+    os.utime(path, (1, 1))
+    assert index.lookup_class_ids(str(path)) == (False, None)
+
+
+def test_other_versions_are_ignored(tmp_path, resources):
+    path = str(resources / "resources.assets")
+    index = get_index(tmp_path, resources)
+    index.update(get_summary(path), TYPES)
+    index.save()
+    with open(index.path, "r") as file:
+        data = json.load(file)
+    data["version"] = INDEX_VERSION - 1
+    with open(index.path, "w") as file:
+        json.dump(data, file)
+    assert get_index(tmp_path, resources).lookup(path) is None
+
+
+def test_scanned_types(tmp_path, resources):
+    other = resources / "level0"
+    other.write_bytes(b"other asset file")
+    index = get_index(tmp_path, resources)
+    assert index.scanned_types() == set()
+    index.update(get_summary(str(resources / "resources.assets")), TYPES)
+    index.update(get_summary(str(other), {"MonoScript"}), {"MonoScript"})
+    assert index.scanned_types() == {"MonoScript"}
@@ -0,0 +1,23 @@
+import logging
+
+from utils.Files import get_process_pool
+from utils.Logger import Logger, LogQueueHandler, get_console_level, set_verbosity
+
+
+def get_logging_setup() -> tuple:
+    """ Return the (console level, handler types, whether a listener thread runs) of this process """
+    handlers = [type(handler) for handler in logging.getLogger("crumbs").handlers]
+    return get_console_level(), handlers, Logger._listener is not None
+
+
+def test_worker_processes_log_directly():
+    set_verbosity(-1)
+    try:
+        with get_process_pool(1) as pool:
+            console_level, handlers, listening = pool.submit(get_logging_setup).result()
+    finally:
+        set_verbosity(0)
+    assert console_level == logging.WARNING
+    assert LogQueueHandler not in handlers
+    assert logging.StreamHandler in handlers
+    assert not listening
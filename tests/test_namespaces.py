@@ -0,0 +1,62 @@
+import pytest
+
+from assets.Enums import AppEngineTypes, OtherTypes, PacketTypes
+from assets.Namespaces import NAMESPACES, NamespaceClassifier
+
+INCOMING = NAMESPACES["Packets"]["Incoming"]
+COMMANDS = NAMESPACES["AppEngine"]["Commands"]
+
+
+@pytest.mark.parametrize("namespace, category", [
+    (INCOMING, PacketTypes.INCOMING),
+    (NAMESPACES["Packets"]["Outgoing"], PacketTypes.OUTGOING),
+    (NAMESPACES["Packets"]["DataObject"], PacketTypes.DATA),
+    (COMMANDS, AppEngineTypes.COMMANDS),
+    (NAMESPACES["AppEngine"]["Messages"], AppEngineTypes.MESSAGES),
+    (NAMESPACES["AppEngine"]["Outgoing"], AppEngineTypes.OUTGOING),
+    (NAMESPACES["AppEngine"]["XML"], AppEngineTypes.XML),
+    (NAMESPACES["Effects"], OtherTypes.EFFECT),
+    (NAMESPACES["Particles"], OtherTypes.PARTICLE),
+    (NAMESPACES["MapObjects"], OtherTypes.MAP_OBJECT),
+    # the incoming, outgoing and command rules match nested namespaces as well
+    (f"{INCOMING}.Arena", PacketTypes.INCOMING),
+    (f"{NAMESPACES['Packets']['Outgoing']}.Arena.Queue", PacketTypes.OUTGOING),
+    (f"{COMMANDS}.Account", AppEngineTypes.COMMANDS),
+])
+def test_known_namespaces(namespace, category):
+    assert NamespaceClassifier().classify(namespace) == category
+
+
+@pytest.mark.parametrize("namespace", [
+    # namespaces only match whole segments, unlike the substring matching of older versions
+    f"{INCOMING}Extra",
+    f"{COMMANDS}V2",
+    f"{NAMESPACES['Packets']['DataObject']}Objects",
+    f"{NAMESPACES['Effects']}Legacy",
+    f"Legacy.{INCOMING}",
+    # the other rules only match their exact namespace
+    f"{NAMESPACES['Packets']['DataObject']}.Nested",
+    f"{NAMESPACES['AppEngine']['Messages']}.Nested",
+    f"{NAMESPACES['Effects']}.Nested",
+    "DecaGames.RotMG.Net.SocketServer.Messages",
+    "",
+])
+def test_unknown_namespaces(namespace):
+    assert NamespaceClassifier().classify(namespace) is None
+
+
+def test_longest_prefix_wins():
+    classifier = NamespaceClassifier([("A.B", "outer", True), ("A.B.C", "inner", True)])
+    assert classifier.classify("A.B.X") == "outer"
+    assert classifier.classify("A.B.C.X") == "inner"
+    assert classifier.classify("A") is None
+
+
+def test_register_replaces_cached_results():
+    classifier = NamespaceClassifier()
+    namespace = f"{COMMANDS}V2"
+    assert classifier.classify(namespace) is None
+    classifier.register(namespace, AppEngineTypes.COMMANDS)
+    assert classifier.classify(namespace) == AppEngineTypes.COMMANDS
+    classifier.register(INCOMING, "custom", True)
+    assert classifier.classify(f"{INCOMING}.Arena") == "custom"
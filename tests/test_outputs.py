@@ -0,0 +1,65 @@
+from utils.Outputs import OutputManifest
+
+
+def write_output(folder, path: str, data: bytes = b"output") -> None:
+    (folder / path).parent.mkdir(parents=True, exist_ok=True)
+    (folder / path).write_bytes(data)
+
+
+def run(folder, outputs: dict, incremental: bool = False) -> tuple:
+    """ Record and write the outputs of a run, return the manifest and the outputs that were written """
+    manifest = OutputManifest(str(folder), incremental)
+    written = []
+    for path, (digest, stage) in outputs.items():
+        if manifest.record(path, digest, stage):
+            write_output(folder, path)
+            written.append(path)
+    manifest.save()
+    return manifest, written
+
+
+def test_added_changed_and_unchanged(tmp_path):
+    manifest, _ = run(tmp_path, {"xml/a.xml": ("1", "xml"), "xml/b.xml": ("2", "xml")})
+    assert manifest.added == ["xml/a.xml", "xml/b.xml"]
+    manifest, _ = run(tmp_path, {"xml/a.xml": ("1", "xml"), "xml/b.xml": ("3", "xml"), "xml/c.xml": ("4", "xml")})
+    assert manifest.added == ["xml/c.xml"]
+    assert manifest.changed == ["xml/b.xml"]
+    assert manifest.unchanged == ["xml/a.xml"]
+
+
+def test_stale_outputs_are_removed(tmp_path):
+    run(tmp_path, {"xml/a.xml": ("1", "xml"), "xml/b.xml": ("2", "xml")})
+    manifest, _ = run(tmp_path, {"xml/a.xml": ("1", "xml")})
+    assert not (tmp_path / "xml/b.xml").exists()
+    assert (tmp_path / "xml/a.xml").exists()
+    assert manifest.load() == {"xml/a.xml": ["1", "xml"]}
+
+
+def test_outputs_of_stages_that_did_not_run_are_kept(tmp_path):
+    run(tmp_path, {"xml/a.xml": ("1", "xml"), "packets/incoming.txt": ("2", "packets")})
+    manifest, _ = run(tmp_path, {"xml/a.xml": ("1", "xml")})
+    assert (tmp_path / "packets/incoming.txt").exists()
+    assert manifest.load() == {"xml/a.xml": ["1", "xml"], "packets/incoming.txt": ["2", "packets"]}
+
+
+def test_incremental_runs_skip_current_outputs(tmp_path):
+    outputs = {"xml/a.xml": ("1", "xml"), "xml/b.xml": ("2", "xml")}
+    _, written = run(tmp_path, outputs, incremental=True)
+    assert written == ["xml/a.xml", "xml/b.xml"]
+    _, written = run(tmp_path, outputs, incremental=True)
+    assert written == []
+    # a missing output is written again even though its source did not change
+    (tmp_path / "xml/a.xml").unlink()
+    _, written = run(tmp_path, {"xml/a.xml": ("1", "xml"), "xml/b.xml": ("3", "xml")}, incremental=True)
+    assert written == ["xml/a.xml", "xml/b.xml"]
+    # full runs write every output
+    _, written = run(tmp_path, outputs)
+    assert written == ["xml/a.xml", "xml/b.xml"]
+
+
+def test_keep_previous(tmp_path):
+    run(tmp_path, {"audio/clip-0.wav": ("1", "audio"), "audio/clip-1.wav": ("1", "audio")})
+    manifest = OutputManifest(str(tmp_path))
+    assert manifest.keep_previous("audio/clip", "1", "audio") == ["audio/clip-0.wav", "audio/clip-1.wav"]
+    assert manifest.keep_previous("audio/clip", "2", "audio") == []
+    assert manifest.unchanged == ["audio/clip-0.wav", "audio/clip-1.wav"]
@@ -0,0 +1,71 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from assets.Enums import AppEngineTypes, PacketTypes
+from utils.Packets import CATALOGUE_VERSION, PacketCatalogue, build_perfect_hash, get_catalogue_json, get_entries, \
+    get_name_hash, get_slot, get_packet_id
+
+
+def get_classified(count: int) -> dict:
+    """ Return classified MonoScripts, every tenth incoming packet name is an AppEngine message as well """
+    incoming = [SimpleNamespace(name=f"Packet{i}", namespace="Incoming", path_id=i) for i in range(count)]
+    outgoing = [SimpleNamespace(name=f"Request{i}", namespace="Outgoing", path_id=count + i) for i in range(count)]
+    messages = [SimpleNamespace(name=f"Packet{i}", namespace="Messages", path_id=2 * count + i)
+                for i in range(0, count, 10)]
+    return {PacketTypes.INCOMING: incoming, PacketTypes.OUTGOING: outgoing, AppEngineTypes.MESSAGES: messages}
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 200, 5000])
+def test_perfect_hash_places_every_name(count):
+    names = [f"Name{i}" for i in range(count)]
+    displacements, slots = build_perfect_hash(names)
+    assert sorted(i for i in slots if i >= 0) == list(range(count))
+    for i, name in enumerate(names):
+        hashes = get_name_hash(name)
+        assert slots[get_slot(hashes, displacements[hashes[0] % len(displacements)], len(slots))] == i
+
+
+def test_entries_are_ordered_by_name_and_category():
+    entries = get_entries(get_classified(20))
+    assert [entry.name for entry in entries] == sorted(entry.name for entry in entries)
+    assert [entry.category for entry in entries if entry.name == "Packet0"] == ["IncomingPacket", "AppEngineMessage"]
+    assert entries[0].id == get_packet_id("IncomingPacket", "Packet0")
+
+
+def test_save_load_and_lookup(tmp_path):
+    count = 3000
+    entries = get_entries(get_classified(count))
+    catalogue = PacketCatalogue.from_entries(entries)
+    path = str(tmp_path / "catalogue.bin")
+    catalogue.save(path)
+    loaded = PacketCatalogue.load(path)
+    assert len(loaded) == len(entries) == 2 * count + count // 10
+    for entry in entries:
+        assert loaded.get(entry.name, entry.category) == entry
+        assert entry in loaded.find(entry.name)
+    assert [entry.category for entry in loaded.find("Packet10")] == ["IncomingPacket", "AppEngineMessage"]
+    assert loaded.find("Packet11", "AppEngineMessage") == []
+    assert loaded.get("Request1", "IncomingPacket") is None
+    for name in ("Missing", "Packet", f"Packet{count}", ""):
+        assert loaded.find(name) == []
+    loaded.close()
+    loaded.close()
+    assert catalogue.find("Packet1")[0].path_id == 1
+
+
+def test_empty_catalogue(tmp_path):
+    path = str(tmp_path / "catalogue.bin")
+    PacketCatalogue.from_entries([]).save(path)
+    loaded = PacketCatalogue.load(path)
+    assert len(loaded) == 0
+    assert loaded.find("Packet0") == []
+    loaded.close()
+
+
+def test_catalogue_json():
+    catalogue = json.loads(get_catalogue_json(get_entries(get_classified(3))))
+    assert catalogue["version"] == CATALOGUE_VERSION
+    assert [entry["name"] for entry in catalogue["categories"]["IncomingPacket"]] == ["Packet0", "Packet1", "Packet2"]
+    assert catalogue["categories"]["AppEngineMessage"][0]["path_id"] == 6
@@ -0,0 +1,56 @@
+import struct
+from os.path import join
+
+import pytest
+
+import utils.Scanner
+from benchmarks.synthetic import generate, get_file_name
+from utils.Scanner import get_file_digest, read_class_ids, scan_file, scan_files
+
+
+@pytest.fixture(scope="module")
+def asset_file(tmp_path_factory):
+    folder = str(tmp_path_factory.mktemp("resources"))
+    generate(folder, monoscripts=20, textassets=2, textures=0)
+    return join(folder, get_file_name(0))
+
+
+def test_scan_file_summarizes_the_requested_types(asset_file):
+    summary = scan_file(asset_file, {"MonoScript"})
+    assert summary.complete
+    assert len(summary.objects) == 20
+    assert {entry.type for entry in summary.objects} == {"MonoScript"}
+    assert summary.digest == get_file_digest(asset_file)
+
+
+def test_files_are_only_hashed_for_the_index(asset_file, monkeypatch):
+    def hash_unexpectedly(path):
+        raise AssertionError(f"'{path}' was hashed")
+
+    monkeypatch.setattr(utils.Scanner, "get_file_digest", hash_unexpectedly)
+    [summary] = scan_files([asset_file], {"MonoScript", "TextAsset"}, 1, digest=False)
+    assert summary.digest == ""
+    assert summary.objects
+
+
+def get_serialized_file(version: int, class_ids: list) -> bytes:
+    """ Return a little endian serialized file header with a type tree blob of one node for every class id """
+    metadata = b"5.0.0f1\0" + struct.pack("<i", 5)
+    if version >= 13:
+        metadata += b"\1"
+    metadata += struct.pack("<i", len(class_ids))
+    for class_id in class_ids:
+        metadata += struct.pack("<i", class_id)
+        if version >= 13:
+            metadata += bytes(16)
+        metadata += struct.pack("<ii", 1, 0) + bytes(24)
+    file_size = 20 + len(metadata)
+    return struct.pack(">IIII", len(metadata), file_size, version, file_size) + bytes(4) + metadata
+
+
+@pytest.mark.parametrize("version, class_ids", [(9, None), (10, [28, 49]), (11, None), (12, [28, 49]),
+                                                (15, [28, 49])])
+def test_read_class_ids_of_old_formats(tmp_path, version, class_ids):
+    path = tmp_path / "sharedassets0.assets"
+    path.write_bytes(get_serialized_file(version, [49, 28]))
+    assert read_class_ids(str(path)) == class_ids
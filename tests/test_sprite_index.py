@@ -0,0 +1,68 @@
+import json
+
+from benchmarks.synthetic import get_spritesheet
+from utils.SpriteIndex import AnimationFrame, SpriteIndex
+
+
+def get_sheet(atlases=("characters", "groundTiles"), texture_size=64) -> bytes:
+    return get_spritesheet(list(atlases), texture_size)
+
+
+def test_sprites_match_the_json_file():
+    data = get_sheet()
+    index = SpriteIndex.from_json(data)
+    sheet = json.loads(data)
+    count = 0
+    for sprite in sheet["sprites"]:
+        for element in sprite["elements"]:
+            position = element["position"]
+            found = index.sprite(sprite["spriteSheetName"], element["index"])
+            assert found is not None
+            assert found.atlas_id == element["atlasId"]
+            assert found.rect == (position["x"], position["y"], position["w"], position["h"])
+            count += 1
+    assert len(index) == count
+
+
+def test_frames_of_an_animated_object():
+    index = SpriteIndex.from_json(get_sheet())
+    frames = index.frames("players", 0)
+    # every object has 2 directions and 3 actions
+    assert len(frames) == 6
+    assert all(isinstance(frame, AnimationFrame) and frame.index == 0 for frame in frames)
+    assert [(frame.direction, frame.action) for frame in index.frames("players", 0, direction=1)] == \
+           [(1, 0), (1, 1), (1, 2)]
+    assert len(index.frames("players", 0, direction=0, action=2)) == 1
+
+
+def test_missing_sprites():
+    index = SpriteIndex.from_json(get_sheet())
+    assert index.sprite("groundTiles8x8", -1) is None
+    assert index.sprite("groundTiles8x8", 10 ** 6) is None
+    assert index.sprite("unknown", 0) is None
+    assert index.frames("players", 10 ** 6) == []
+    assert index.frames("unknown", 0) == []
+
+
+def test_fractional_rects_are_rounded():
+    element = {"index": 3, "atlasId": 1, "padding": 0, "position": {"x": 1.4, "y": 2.6, "w": 8.0, "h": 7.5},
+               "maskPosition": {"x": 0, "y": 0, "w": 0, "h": 0}}
+    data = json.dumps({"sprites": [{"spriteSheetName": "sheet", "atlasId": 1, "elements": [element]}],
+                       "animatedSprites": []}).encode("utf8")
+    assert SpriteIndex.from_json(data).sprite("sheet", 3).rect == (1, 3, 8, 8)
+
+
+def test_save_and_load(tmp_path):
+    index = SpriteIndex.from_json(get_sheet())
+    path = tmp_path / "sprites.index"
+    index.save(str(path))
+    loaded = SpriteIndex.load(str(path))
+    try:
+        assert len(loaded) == len(index)
+        assert loaded.sheet_names == index.sheet_names
+        for sheet in index.sheet_names:
+            for i in range(0, 64, 7):
+                assert loaded.sprite(sheet, i) == index.sprite(sheet, i)
+                assert loaded.frames(sheet, i) == index.frames(sheet, i)
+    finally:
+        loaded.close()
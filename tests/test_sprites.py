@@ -0,0 +1,49 @@
+import io
+
+import numpy as np
+import pytest
+
+from utils.Sprites import SpriteFrame, encode_png, pack_strip, slice_atlas
+
+
+def get_atlas(height: int = 8, width: int = 16) -> np.ndarray:
+    atlas = np.zeros((height, width, 4), np.uint8)
+    atlas[..., 0] = np.arange(height, dtype=np.uint8)[:, None]
+    atlas[..., 1] = np.arange(width, dtype=np.uint8)[None, :]
+    return atlas
+
+
+def frame(x: int, y: int, width: int, height: int) -> SpriteFrame:
+    return SpriteFrame("sprite", "group", "atlas", x, y, width, height)
+
+
+def test_rects_are_flipped_to_the_top_down_atlas():
+    atlas = get_atlas()
+    view, = slice_atlas(atlas, [frame(2, 0, 3, 2)])
+    # y 0 is the bottom row of the atlas
+    assert view.shape == (2, 3, 4)
+    assert view[:, 0, 0].tolist() == [6, 7]
+    assert view[0, :, 1].tolist() == [2, 3, 4]
+    assert np.shares_memory(view, atlas)
+
+
+@pytest.mark.parametrize("x, y, width, height", [
+    (-1, 0, 2, 2), (0, -1, 2, 2), (15, 0, 2, 2), (0, 7, 2, 2), (0, 0, 0, 2), (0, 0, 2, 0)
+])
+def test_frames_outside_of_the_atlas(x, y, width, height):
+    assert slice_atlas(get_atlas(), [frame(x, y, width, height)]) == [None]
+
+
+def test_pack_strip():
+    atlas = get_atlas()
+    strip = pack_strip(slice_atlas(atlas, [frame(0, 0, 2, 2), frame(4, 0, 3, 4)]))
+    assert strip.shape == (4, 5, 4)
+    assert strip[2:, :2].sum() == 0
+
+
+def test_encode_png():
+    from PIL import Image
+    atlas = get_atlas()
+    with Image.open(io.BytesIO(encode_png(atlas))) as image:
+        assert image.mode == "RGBA"
+        assert np.array_equal(np.asarray(image), atlas)
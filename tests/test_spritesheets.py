@@ -0,0 +1,16 @@
+import pytest
+
+from benchmarks.synthetic import ATLAS_IDS, get_spritesheet
+from utils.Spritesheets import JSON_BACKENDS, SpriteElement, load_spritesheet
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_backends_parse_the_same_spritesheet(backend):
+    if backend not in JSON_BACKENDS:
+        pytest.skip(f"{backend} is not installed")
+    sheet_data = get_spritesheet(list(ATLAS_IDS), 64)
+    sheet = load_spritesheet(memoryview(sheet_data), backend)
+    assert sheet == load_spritesheet(sheet_data, "json")
+    element = sheet["sprites"][0]["elements"][1]
+    assert element == SpriteElement(1, ATLAS_IDS["groundTiles"], (8, 0, 8, 8), (0, 0, 0, 0))
+    assert isinstance(sheet["animatedSprites"][0]["spriteData"], SpriteElement)
@@ -0,0 +1,16 @@
+import subprocess
+
+import pytest
+
+from benchmarks.startup import get_command, get_extractor_command
+
+
+@pytest.mark.parametrize("command", [
+    get_command("import utils, assets"),
+    get_extractor_command("--help"),
+], ids=["import", "help"])
+def test_startup_does_not_import_heavy_modules(command, tmp_path):
+    result = subprocess.run(command, cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    # the last line lists the heavy modules that were imported
+    assert (result.stderr.splitlines() or [""])[-1].split() == []
@@ -0,0 +1,29 @@
+from assets.Texture2D import Texture2D
+from utils.Scanner import ObjectSummary
+
+
+def read_unexpectedly(entry):
+    raise AssertionError(f"'{entry.name}' was read")
+
+
+def test_summary_textures_use_the_indexed_image_digest():
+    extra = {"width": 4, "height": 2, "format": 4, "size": 32, "image_count": 1, "image_digest": "0f" * 16}
+    entry = ObjectSummary("sharedassets0.assets", "Texture2D", 1, "tile", 0, 100, extra)
+    texture = Texture2D.from_summary(entry, read_unexpectedly)
+    assert texture.image_digest == "0f" * 16
+    assert (texture.width, texture.height, texture.has_image) == (4, 2, True)
+
+
+def test_textures_without_an_indexed_digest_hash_their_pixel_data():
+    extra = {"width": 4, "height": 2, "format": 4, "size": 32, "image_count": 1}
+    entry = ObjectSummary("sharedassets0.assets", "Texture2D", 1, "tile", 0, 100, extra)
+    reads = []
+
+    def read(summary):
+        reads.append(summary)
+        return type("Asset", (), {"image_data": b"pixels"})()
+
+    texture = Texture2D.from_summary(entry, read)
+    assert texture.image_digest == Texture2D.from_summary(entry, read).image_digest
+    assert len(texture.image_digest) == 32
+    assert len(reads) == 2
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import utils.Writer
+from utils.Sprites import save_images
+from utils.Writer import OutputWriter, check_output_path
+
+
+def test_commit_replaces_the_output(tmp_path):
+    output = tmp_path / "output"
+    (output / "xml").mkdir(parents=True)
+    (output / "xml/old.xml").write_text("old")
+    writer = OutputWriter(str(output), workers=2)
+    writer.start()
+    writer.write("xml/new.xml", "new")
+    assert writer.commit()
+    assert (output / "xml/new.xml").read_text() == "new"
+    assert (output / "xml/old.xml").read_text() == "old"
+    assert not (tmp_path / "output.staging").exists()
+
+
+def test_failed_writes_keep_the_previous_output(tmp_path, monkeypatch):
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "a.txt").write_text("old")
+    write_file = utils.Writer.write_file
+
+    def fail_on_a(path, data):
+        if path.endswith("a.txt"):
+            raise ValueError("not writable")
+        write_file(path, data)
+
+    monkeypatch.setattr(utils.Writer, "write_file", fail_on_a)
+    writer = OutputWriter(str(output), workers=1)
+    writer.start()
+    writer.write("a.txt", "new")
+    # the thread keeps draining the queue after an error that is not an OSError
+    writer.write("b.txt", "new")
+    writer.close()
+    assert writer.errors == [writer.get_path("a.txt")]
+    assert (tmp_path / "output.staging/b.txt").exists()
+    assert not writer.commit()
+    assert (output / "a.txt").read_text() == "old"
+    assert not (output / "b.txt").exists()
+
+
+def test_failed_worker_outputs_keep_the_previous_output(tmp_path):
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "a.txt").write_text("old")
+    writer = OutputWriter(str(output), workers=1)
+    writer.start()
+    image = np.zeros((2, 2, 4), dtype=np.uint8)
+    saved_path, failed_path = writer.get_path("sprites/saved.png"), writer.get_path("missing/failed.png")
+    (tmp_path / "output.staging/missing").rmdir()
+    assert save_images([(saved_path, image), (failed_path, image)], 1, writer.errors) == 1
+    assert writer.errors == [failed_path]
+    assert not writer.commit()
+    assert not (output / "sprites").exists()
+
+
+def test_output_paths_are_absolute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert check_output_path("output/") == str(tmp_path / "output")
+    writer = OutputWriter("output")
+    assert writer.path == str(tmp_path / "output.staging")
+
+
+@pytest.mark.parametrize("output_path", [".", "..", "/"])
+def test_output_folders_that_can_not_be_replaced_are_rejected(tmp_path, monkeypatch, output_path):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        OutputWriter(output_path)
@@ -0,0 +1,53 @@
+import mmap
+import struct
+
+import numpy as np
+
+# magic, version, array count
+HEADER = struct.Struct("<4sII")
+# name, dtype, rows, columns, byte offset of every array
+ARRAY_HEADER = struct.Struct("<16s4sQIQ")
+ALIGNMENT = 16
+
+
+def pack_arrays(magic: bytes, version: int, arrays: dict, layout: list) -> bytes:
+    """
+    Return the binary file content of a set of named arrays.
+    :param magic: The 4 magic bytes at the start of the file.
+    :param version: The version of the file layout.
+    :param arrays: The arrays by name.
+    :param layout: The (name, dtype, columns) of every array in the order they are stored.
+    """
+    position = HEADER.size + len(layout) * ARRAY_HEADER.size
+    headers, data = [HEADER.pack(magic, version, len(layout))], []
+    for name, dtype, columns in layout:
+        if len(name.encode()) > 16:
+            raise ValueError(f"The array name '{name}' is longer than 16 bytes")
+        array = np.ascontiguousarray(arrays[name], np.dtype(dtype))
+        position += -position % ALIGNMENT
+        headers.append(ARRAY_HEADER.pack(name.encode(), dtype.encode(), len(array), columns, position))
+        data.append((position, array.tobytes()))
+        position += array.nbytes
+    content = bytearray(b"".join(headers))
+    for offset, raw in data:
+        content += bytes(offset - len(content)) + raw
+    return bytes(content)
+
+
+def map_arrays(path: str, magic: bytes, version: int) -> tuple:
+    """
+    Memory-map a file written by pack_arrays and return (arrays by name, memory map).
+    The arrays are read-only views of the memory map, which has to stay open as long as they are used.
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    file_magic, file_version, count = HEADER.unpack_from(buffer, 0)
+    if file_magic != magic or file_version != version:
+        buffer.close()
+        raise ValueError(f"'{path}' is not a {magic.decode()} file of version {version}")
+    arrays = {}
+    for i in range(count):
+        name, dtype, rows, columns, offset = ARRAY_HEADER.unpack_from(buffer, HEADER.size + i * ARRAY_HEADER.size)
+        array = np.frombuffer(buffer, np.dtype(dtype.rstrip(b"\0").decode()), rows * columns, offset)
+        arrays[name.rstrip(b"\0").decode()] = array.reshape(rows, columns) if columns > 1 else array
+    return arrays, buffer
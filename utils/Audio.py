@@ -0,0 +1,143 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from os import remove
+from os.path import exists, join
+from types import SimpleNamespace
+
+from utils.Files import get_process_pool, get_worker_count, map_file, write_file
+from utils.Logger import Logger
+
+logger = Logger()
+
+
+def get_audio_extension(data) -> str:
+    """ Return the file extension of raw AudioClip data by its magic bytes, FMOD sound banks are '.fsb' files """
+    magic = bytes(data[:8])
+    if magic[:4] == b"OggS":
+        return ".ogg"
+    if magic[:4] == b"RIFF":
+        return ".wav"
+    if magic[4:8] == b"ftyp":
+        return ".m4a"
+    if magic[:3] == b"FSB":
+        return ".fsb"
+    return ".audioclip"
+
+
+def has_fmod() -> bool:
+    """ Return True if FMOD sound banks can be decoded, which needs pyfmodex and the FMOD library UnityPy ships """
+    from UnityPy.export import AudioClipConverter
+    try:
+        AudioClipConverter.import_pyfmodex()
+    except (ImportError, OSError, NotImplementedError):
+        AudioClipConverter.pyfmodex = False
+    return bool(AudioClipConverter.pyfmodex)
+
+
+class AudioJob:
+    """ The raw FMOD sound bank and format metadata needed to decode an AudioClip in a worker process """
+
+    def __init__(self, name: str, folder: str, audio_data: bytes, channels: int, frequency: int,
+                 source: tuple = None):
+        """
+        :param folder: The folder the decoded .wav files are saved to, named after the clip and its subsounds.
+        :param audio_data: The sound bank as bytes or a memoryview of a memory-mapped file.
+        :param source: The (path, offset, size) of the sound bank in its .resource file, if it is streamed.
+        """
+        self.name = name
+        self.folder = folder
+        self.audio_data = audio_data
+        self.channels = channels
+        self.frequency = frequency
+        self.source = source
+        # the source digest of the clip, the subsounds that are saved are recorded with it
+        self.digest = ""
+
+    def __getstate__(self) -> dict:
+        """ Send a streamed sound bank to a worker process as its location, the worker maps the file itself """
+        state = self.__dict__.copy()
+        if self.source is not None:
+            state["audio_data"] = None
+        elif isinstance(self.audio_data, memoryview):
+            state["audio_data"] = bytes(self.audio_data)
+        return state
+
+    def get_audio_data(self):
+        """ Return the sound bank, streamed data that was not sent along is read from the mapped .resource file """
+        if self.audio_data is None:
+            path, offset, size = self.source
+            return map_file(path)[offset:offset + size]
+        return self.audio_data
+
+
+def export_audio(job: AudioJob) -> list:
+    """ Decode the sound bank of an audio job to .wav files and return the (file name, size) of every saved file """
+    from UnityPy.export.AudioClipConverter import dump_samples
+    data = job.get_audio_data()
+    # dump_samples only uses these attributes of the UnityPy AudioClip
+    clip = SimpleNamespace(name=job.name, m_AudioData=data, m_Size=len(data), m_Channels=job.channels,
+                           m_Frequency=job.frequency)
+    saved = []
+    for file_name, sample in dump_samples(clip).items():
+        path = join(job.folder, file_name)
+        # the file may be a hard link to the current output (see OutputWriter), so a new file is created
+        if exists(path):
+            remove(path)
+        saved.append((file_name, write_file(path, sample)))
+    return saved
+
+
+def export_audio_clips(jobs, workers: int = None, failed: list = None, max_pending: int = None):
+    """
+    Decode audio jobs in a process pool and yield (job, saved files) for each of them, FMOD decoding is CPU-bound.
+    Only a few jobs per worker are submitted at once, so the decoded samples are never all held in memory.
+    :param jobs: An iterable of AudioJob objects.
+    :param workers: The number of worker processes (default: one per CPU core).
+    :param failed: A list the output folders and names of the AudioClips that could not be decoded are added to.
+    :param max_pending: The number of jobs submitted at once (default: 2 per worker).
+    """
+    workers = get_worker_count(workers)
+    if workers == 1:
+        for job in jobs:
+            try:
+                yield job, export_audio(job)
+            except Exception as e:
+                logger.error(f"Failed decoding AudioClip '{job.name}': {e}")
+                if failed is not None:
+                    failed.append(join(job.folder, job.name))
+        return
+
+    pool = get_process_pool(workers)
+    try:
+        pending = {}
+        for job in jobs:
+            try:
+                future = pool.submit(export_audio, job)
+            except BrokenProcessPool:
+                # FMOD crashed a worker on a broken sound bank, the running jobs failed and the rest get a new pool
+                pool.shutdown()
+                pool = get_process_pool(workers)
+                future = pool.submit(export_audio, job)
+            pending[future] = job
+            if len(pending) >= (max_pending or workers * 2):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from collect_results(done, pending, failed)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from collect_results(done, pending, failed)
+    finally:
+        pool.shutdown()
+
+
+def collect_results(done: set, pending: dict, failed: list = None):
+    """ Yield (job, saved files) of all finished audio jobs, remove them from the pending jobs and add failed ones """
+    for future in done:
+        job = pending.pop(future)
+        try:
+            saved = future.result()
+        except Exception as e:
+            logger.error(f"Failed decoding AudioClip '{job.name}': {e}")
+            if failed is not None:
+                failed.append(join(job.folder, job.name))
+            continue
+        yield job, saved
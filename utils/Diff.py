@@ -0,0 +1,169 @@
+import json
+from os.path import isfile, join, relpath
+
+from assets import MonoScript
+from utils.Index import AssetIndex
+from utils.Logger import Logger
+from utils.Resources import ASSET_TYPES, Resources
+
+logger = Logger()
+
+
+def load_source(source: str, jobs: int = None, index_path: str = None) -> tuple[str, list, set]:
+    """
+    Return the root path, all object summaries and the asset types of an Exalt install or a stored asset index file.
+    :param source: An Exalt resource directory or an asset index file.
+    :param jobs: The number of worker processes used to scan changed files.
+    :param index_path: The asset index used to skip unchanged files of a resource directory.
+    """
+    if isfile(source):
+        # an index written by a run of only some stages holds only the asset types of these stages
+        index = AssetIndex(source, "")
+        return "", index.summaries(), index.scanned_types()
+    # an empty set of asset types only scans the files and does not read any objects
+    resources = Resources(source, set(), jobs, index_path)
+    return resources.path, resources.file_summaries, set(ASSET_TYPES)
+
+
+def get_object_table(root: str, summaries: list, asset_types: set) -> dict:
+    """ Return the object summaries of the given asset types keyed by their file, type, name and path_id """
+    table = {}
+    for summary in summaries:
+        for entry in summary.objects:
+            if entry.type not in asset_types:
+                continue
+            table[(relpath(entry.file, root) if root else entry.file, entry.type, entry.name, entry.path_id)] = entry
+    return table
+
+
+def get_content_digest(entry) -> str:
+    """ Return the digest of an object's content including streamed texture pixel data """
+    if entry.extra is not None and "image_digest" in entry.extra:
+        return entry.digest + entry.extra["image_digest"]
+    return entry.digest
+
+
+def describe(key: tuple, entry) -> dict:
+    """ Return the JSON description of a single object in the changelog """
+    ret = {"file": key[0], "type": entry.type, "name": entry.name, "path_id": entry.path_id}
+    if entry.type == "MonoScript" and entry.extra is not None:
+        ret["namespace"] = entry.extra["namespace"]
+    return ret
+
+
+class AssetDiff:
+    """ Compares the object tables of two Exalt installs and builds a structured changelog """
+
+    def __init__(self, old_table: dict, new_table: dict):
+        pairs = [(key, key) for key in new_table if key in old_table]
+        # objects whose path_id moved between versions are matched again by their file, type and name
+        unmatched = {}
+        for key in old_table:
+            if key not in new_table:
+                unmatched.setdefault(key[:3], []).append(key)
+        self.added = []
+        for key in new_table:
+            if key in old_table:
+                continue
+            candidates = unmatched.get(key[:3])
+            if candidates:
+                pairs.append((candidates.pop(0), key))
+            else:
+                self.added.append(key)
+        self.removed = [key for keys in unmatched.values() for key in keys]
+        # only the stored digests are compared, no object is read or decoded
+        self.changed = [(old_key, new_key) for old_key, new_key in pairs
+                        if get_content_digest(old_table[old_key]) != get_content_digest(new_table[new_key])]
+        self.unchanged = len(pairs) - len(self.changed)
+        self.old_table, self.new_table = old_table, new_table
+
+    def packets(self, keys: list, table: dict) -> list:
+        """ Return the name and category of every classified MonoScript in the given keys """
+        ret = []
+        for key in keys:
+            entry = table[key]
+            if entry.type != "MonoScript" or entry.extra is None:
+                continue
+            script = MonoScript.from_summary(entry, None)
+            if script.object_type is not None:
+                ret.append({"name": script.name, "category": script.object_type.value, "namespace": script.namespace})
+        return sorted(ret, key=lambda packet: (packet["category"], packet["name"]))
+
+    def textures(self) -> list:
+        """ Return all changed textures with their old and new dimensions """
+        ret = []
+        for old_key, key in self.changed:
+            old, new = self.old_table[old_key], self.new_table[key]
+            if old.type != "Texture2D" or old.extra is None or new.extra is None:
+                continue
+            ret.append({"name": new.name, "file": key[0],
+                        "old_size": [old.extra["width"], old.extra["height"]],
+                        "new_size": [new.extra["width"], new.extra["height"]]})
+        return ret
+
+    def changelog(self) -> dict:
+        """ Return the full structured changelog """
+        return {
+            "summary": {"added": len(self.added), "removed": len(self.removed),
+                        "changed": len(self.changed), "unchanged": self.unchanged},
+            "packets": {"added": self.packets(self.added, self.new_table),
+                        "removed": self.packets(self.removed, self.old_table)},
+            "text_assets": {"changed": sorted(key[2] for _, key in self.changed if key[1] == "TextAsset" and key[2])},
+            "textures": {"changed": self.textures()},
+            "added": [describe(key, self.new_table[key]) for key in self.added],
+            "removed": [describe(key, self.old_table[key]) for key in self.removed],
+            "changed": [describe(key, self.new_table[key]) for _, key in self.changed]
+        }
+
+    def report(self, changelog: dict) -> str:
+        """ Return a human readable report of a changelog """
+        summary = changelog["summary"]
+        lines = [f"Added: {summary['added']}, removed: {summary['removed']}, changed: {summary['changed']}, "
+                 f"unchanged: {summary['unchanged']}", ""]
+        lines.append("Packets and scripts:")
+        lines += [f"  + {p['category']}: {p['name']}" for p in changelog["packets"]["added"]]
+        lines += [f"  - {p['category']}: {p['name']}" for p in changelog["packets"]["removed"]]
+        lines.append("")
+        lines.append("Changed TextAssets:")
+        lines += [f"  ~ {name}" for name in changelog["text_assets"]["changed"]]
+        lines.append("")
+        lines.append("Changed textures:")
+        for texture in changelog["textures"]["changed"]:
+            old_size, new_size = "x".join(map(str, texture["old_size"])), "x".join(map(str, texture["new_size"]))
+            resized = f" (resized {old_size} -> {new_size})" if old_size != new_size else ""
+            lines.append(f"  ~ {texture['name']}{resized}")
+        lines.append("")
+        lines.append("All added, removed and changed objects:")
+        for sign, section in (("+", "added"), ("-", "removed"), ("~", "changed")):
+            lines += [f"  {sign} {obj['type']} {obj['name']} ({obj['file']}, path_id {obj['path_id']})"
+                      for obj in changelog[section]]
+        return "\n".join(lines) + "\n"
+
+    def save(self, output_path: str) -> None:
+        """ Write the changelog as 'diff.json' and a readable 'diff.txt' report to the output folder """
+        changelog = self.changelog()
+        with open(join(output_path, "diff.json"), "w") as file:
+            json.dump(changelog, file, indent=2)
+        with open(join(output_path, "diff.txt"), "w") as file:
+            file.write(self.report(changelog))
+        summary = changelog["summary"]
+        logger.success(f"Saved 'diff.json' and 'diff.txt' to the output folder ({summary['added']} added, "
+                       f"{summary['removed']} removed, {summary['changed']} changed).")
+
+
+def diff_sources(old_source: str, new_source: str, jobs: int = None, index_path: str = None) -> AssetDiff:
+    """
+    Compare two Exalt installs, or a stored asset index and an install, without extracting any assets.
+    :param old_source: The old resource directory or asset index file.
+    :param new_source: The new resource directory.
+    :param jobs: The number of worker processes used to scan changed files.
+    :param index_path: The asset index of the new resource directory.
+    """
+    old_root, old_summaries, old_types = load_source(old_source, jobs)
+    new_root, new_summaries, new_types = load_source(new_source, jobs, index_path)
+    asset_types = old_types & new_types
+    if asset_types != set(ASSET_TYPES):
+        logger.warning(f"Only comparing the {', '.join(sorted(asset_types)) or 'no'} assets, the asset index "
+                       f"'{old_source}' was written by a run of other stages")
+    return AssetDiff(get_object_table(old_root, old_summaries, asset_types),
+                     get_object_table(new_root, new_summaries, asset_types))
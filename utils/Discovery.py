@@ -0,0 +1,223 @@
+import json
+import os
+import pathlib
+import sys
+from glob import escape, glob
+from getpass import getuser
+from os.path import abspath, dirname, exists, expanduser, isdir, isfile, join
+from platform import system
+from sys import exit as exit_program
+from typing import Optional
+
+from utils.Logger import Logger, get_input, line_break
+
+logger = Logger()
+
+# the default path for the Exalt Unity resources on all default Windows installs
+PATH_WINDOWS = join("Documents", "RealmOfTheMadGod", "Production", "RotMG Exalt_Data")
+# the default path for the Exalt Unity resources on all default macOS installs
+PATH_MACOS = join("RealmOfTheMadGod", "Production", "RotMGExalt.app", "Contents", "Resources", "Data")
+# the file every Exalt resource directory contains, used to validate a directory without loading it
+RESOURCE_FILE = "resources.assets"
+
+# the environment variable that sets the resource path
+RESOURCE_PATH_ENV = "EXALT_RESOURCE_PATH"
+# the environment variable that sets the config file, see get_config_paths for the default locations
+CONFIG_PATH_ENV = "EXALT_EXTRACTOR_CONFIG"
+# setting this environment variable (or CI) disables every prompt
+NON_INTERACTIVE_ENV = "EXALT_NON_INTERACTIVE"
+# the Steam library folders that hold the Proton prefixes of every game
+PROTON_PATHS = [join("~", ".steam", "steam", "steamapps", "compatdata"),
+                join("~", ".local", "share", "Steam", "steamapps", "compatdata")]
+# the resource paths relative to an extracted client archive or a game folder
+ARCHIVE_PATHS = ["RotMG Exalt_Data", join("RotMGExalt.app", "Contents", "Resources", "Data"),
+                 join("Production", "RotMG Exalt_Data"), join("Contents", "Resources", "Data"), "Data"]
+# how many folders deep an extracted archive is searched for the resource directory
+ARCHIVE_DEPTH = 4
+
+# None until set_interactive is called, then the prompt is only used if it is True
+_interactive = None
+
+
+def set_interactive(interactive: bool) -> None:
+    """ Allow or forbid asking for the resource path on the console """
+    global _interactive
+    _interactive = interactive
+
+
+def is_interactive() -> bool:
+    """ Return True if the resource path may be asked for on the console, never in CI or without a terminal """
+    if _interactive is not None:
+        return _interactive
+    if os.environ.get(NON_INTERACTIVE_ENV) or os.environ.get("CI"):
+        return False
+    return sys.stdin is not None and sys.stdin.isatty()
+
+
+def is_resource_path(path) -> bool:
+    """ Return True if a directory contains the Exalt resource files, nothing is loaded """
+    return isfile(join(path, RESOURCE_FILE))
+
+
+def find_resource_path(path: str) -> Optional[str]:
+    """
+    Return the resource directory of a path or None if it contains none.
+    The path may be the resource directory itself, a game folder, a Wine prefix or an extracted client archive.
+    """
+    path = expanduser(str(path))
+    if not isdir(path):
+        return None
+    if is_resource_path(path):
+        return path
+    for candidate in [join(path, relative) for relative in ARCHIVE_PATHS] + get_prefix_paths(path):
+        if is_resource_path(candidate):
+            return candidate
+    if isdir(join(path, "drive_c")) or isdir(join(path, "pfx")):
+        # a Wine prefix is not searched any further, it holds thousands of folders
+        return None
+    # extracted archives may wrap the game folder in folders named after the build
+    for root, folders, files in os.walk(path):
+        if RESOURCE_FILE in files:
+            return root
+        if root[len(path):].count(os.sep) >= ARCHIVE_DEPTH:
+            folders.clear()
+    return None
+
+
+def get_prefix_paths(prefix: str) -> list:
+    """ Return the default resource paths of every user of a Wine or Proton prefix """
+    drive = join(prefix, "drive_c") if isdir(join(prefix, "drive_c")) else join(prefix, "pfx", "drive_c")
+    return sorted(glob(join(escape(drive), "users", "*", PATH_WINDOWS)))
+
+
+def get_config_paths() -> list:
+    """ Return the config files that are read, the first one that exists is used """
+    if os.environ.get(CONFIG_PATH_ENV):
+        return [os.environ[CONFIG_PATH_ENV]]
+    config_home = os.environ.get("XDG_CONFIG_HOME") or join(expanduser("~"), ".config")
+    return ["exalt-extractor.json", join(config_home, "exalt-extractor", "config.json")]
+
+
+def load_config() -> dict:
+    """
+    Return the settings of the first existing config file, a JSON object like:
+    {"resource_paths": ["/mnt/exalt"], "wine_prefixes": ["~/.wine"], "interactive": false}
+    """
+    for path in get_config_paths():
+        if not exists(path):
+            continue
+        try:
+            with open(path, "r") as file:
+                config = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.critical(f"Could not read the config file '{path}': {e}")
+            exit_program(1)
+        if not isinstance(config, dict):
+            logger.critical(f"The config file '{path}' does not contain a JSON object")
+            exit_program(1)
+        logger.info(f"Using config file '{path}'")
+        return config
+    return {}
+
+
+def get_candidates(config: dict) -> list:
+    """ Return every (source, path) that may contain the resource directory, in the order they are tried """
+    candidates = []
+    if os.environ.get(RESOURCE_PATH_ENV):
+        candidates.append((RESOURCE_PATH_ENV, os.environ[RESOURCE_PATH_ENV]))
+    candidates += [("config", path) for path in config.get("resource_paths", [])]
+    candidates += [("config Wine prefix", path) for path in config.get("wine_prefixes", [])]
+    operating_sys = system()
+    if operating_sys == "Windows":
+        candidates.append(("default Windows path", join(pathlib.Path.home(), PATH_WINDOWS)))
+    elif operating_sys == "Darwin":
+        candidates.append(("default macOS path", join(pathlib.Path.home(), PATH_MACOS)))
+    else:
+        # Exalt only runs through Wine or Proton on Linux
+        if os.environ.get("WINEPREFIX"):
+            candidates.append(("WINEPREFIX", os.environ["WINEPREFIX"]))
+        candidates.append(("default Wine prefix", join("~", ".wine")))
+        for proton_path in PROTON_PATHS:
+            candidates += [("Proton prefix", path)
+                           for path in sorted(glob(join(escape(expanduser(proton_path)), "*", "pfx")))]
+    return candidates
+
+
+def get_resource_path() -> str:
+    """
+    Find the Exalt resource path without any user input if possible.
+    The path is taken from the EXALT_RESOURCE_PATH environment variable, the config file, the default install
+    path of the OS and on Linux the Wine and Proton prefixes. Only if none of these contain the resources and
+    the console is interactive the user is asked for the path, otherwise the program exits right away.
+    """
+    config = load_config()
+    candidates = get_candidates(config)
+    for source, candidate in candidates:
+        path = find_resource_path(candidate)
+        if path is not None:
+            logger.success(f"Found Exalt resource path ({source}): {path}")
+            return path
+    # the command line overrides the config file
+    interactive = _interactive if _interactive is not None else config.get("interactive", True) and is_interactive()
+    if not interactive:
+        logger.critical("Could not find the Exalt resource path, searched:")
+        for source, candidate in candidates:
+            logger.critical(f"  {candidate} ({source})")
+        logger.critical(f"Pass --input or set {RESOURCE_PATH_ENV} to the folder containing '{RESOURCE_FILE}'")
+        exit_program(1)
+    # ask the user to input the Exalt path manually as a fallback
+    path = get_path_input()
+    logger.success("Found valid Exalt resource path\n")
+    return path
+
+
+def resolve_resource_path(path: str, allow_files: bool = False) -> str:
+    """
+    Return the resource directory of a path passed on the command line or exit if it contains none.
+    A file (e.g. 'resources.assets') is resolved to the resource directory of its folder.
+    :param allow_files: Return files unchanged instead, for sources that may be a file such as an asset index.
+    """
+    path = expanduser(path)
+    if isfile(path):
+        if allow_files:
+            return path
+        logger.info(f"Using the folder of the file '{path}'")
+        path = dirname(abspath(path))
+    resource_path = find_resource_path(path)
+    if resource_path is None:
+        logger.critical(f"Invalid path - no '{RESOURCE_FILE}' file in or below: {path}")
+        exit_program(1)
+    return resource_path
+
+
+def get_path_input() -> str:
+    """ Attempt to get a game resource path from console input or exit """
+    line_break()
+    logger.error("Could not find the Exalt resource path automatically... is Exalt installed?")
+
+    operating_sys = system()
+    if operating_sys == "Windows":
+        logger.error(f"The path is usually located here: C:\\Users\\{getuser()}\\{PATH_WINDOWS}\n")
+    elif operating_sys == "Darwin":
+        logger.error(f"The path is usually located here: /Users/{getuser()}/{PATH_MACOS}\n")
+    else:
+        logger.error(f"The path is usually located here: ~/.wine/drive_c/users/{getuser()}/{PATH_WINDOWS}\n")
+
+    # loop asking for a path input until the user exits
+    path = ""
+    while path == "":
+        input_path = get_input("Enter your resource path manually or press the Enter key to exit")
+        line_break()
+        if input_path == "":
+            logger.success("Exiting...")
+            exit_program(0)
+        if exists(input_path):
+            path = find_resource_path(input_path)
+            if path is None:
+                logger.error(f"Invalid path - no '{RESOURCE_FILE}' file in directory: {input_path}")
+                line_break()
+                path = ""
+        else:
+            logger.error(f"Invalid path - could not find directory: {input_path}")
+            line_break()
+    return path
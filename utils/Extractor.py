@@ -1,112 +1,211 @@
-from os import mkdir
-from os.path import exists, join
+import gc
+from os.path import dirname, getsize, join
 
-from utils.Logger import Logger
-from utils.Files import assert_path_exists
+from utils.Logger import Logger, Progress
+from utils.Audio import export_audio_clips, get_audio_extension, has_fmod
+from utils.Files import assert_path_exists, get_memory_usage
+from utils.GameData import GameData, merge_entries, parse_sheets, save_database
+from utils.Outputs import OutputManifest, get_digest
+from utils.Packets import PacketCatalogue, get_catalogue_json, get_entries
+from utils.Profiler import Profiler
+from utils.Sprites import SPRITE_ATLASES, get_frames, load_atlas, pack_strip, save_images, slice_atlas
+from utils.SpriteIndex import SpriteIndex
+from utils.Textures import export_textures
+from utils.Writer import OutputWriter
+from utils.XmlSheets import normalize_sheets
 from utils import Resources, ActionScriptExtractor
 
 logger = Logger()
+profiler = Profiler()
+
+# the asset types that each extraction stage reads from the parsed resources
+STAGE_ASSET_TYPES = {
+    "packets": {"MonoScript"},
+    "xml": {"TextAsset"},
+    "spritesheets": {"Texture2D", "TextAsset"},
+    "manifests": {"TextAsset"},
+    "texture2d": {"Texture2D"},
+    "sprites": {"Texture2D", "TextAsset"},
+    "gamedata": {"TextAsset"},
+    "audio": {"AudioClip"}
+}
+
+
+def get_asset_types(stages: list) -> set:
+    """ Return all asset types that need to be read for the given extraction stages """
+    asset_types = set()
+    for stage in stages:
+        asset_types |= STAGE_ASSET_TYPES[stage]
+    return asset_types
 
 
 class UnityExtractor:
     """ This class takes a Unity resource file and will extracts all interesting asset types """
 
-    def __init__(self, resources: Resources, output_path: str):
+    def __init__(self, resources: Resources, output_path: str, jobs: int = None, incremental: bool = False):
         self.resources = resources
         self.output_path = output_path
+        # the number of worker processes used to decode and save textures (default: one per CPU core)
+        self.jobs = jobs
+        # every output is written in the background to a staging folder that replaces the output folder on finish
+        self.writer = OutputWriter(output_path, jobs)
+        self.writer.start()
+        # the source digest of every output, used to skip unchanged outputs in incremental mode
+        self.outputs = OutputManifest(self.writer.path, incremental)
+        self._sprite_index = None
+        # None until the first FMOD sound bank is decoded, False if they are saved as raw .fsb files instead
+        self._decode_audio = None
+        # the texture and audio jobs submitted to the workers at once (default: 2 per worker), lowered by limit_memory
+        self.max_pending = None
+
+    @property
+    def sprite_index(self) -> SpriteIndex:
+        """ Return the sprite index of 'spritesheet.json', it is only built once for all stages """
+        if self._sprite_index is None:
+            self._sprite_index = SpriteIndex.from_json(self.resources.spritesheet)
+        return self._sprite_index
 
+    def write_output(self, path: str, data, stage: str, digest: str = None) -> bool:
+        """
+        Queue bytes or text to be written to the output folder unless its source did not change (incremental mode).
+        :param path: The output path relative to the output folder.
+        :param data: The bytes, memoryview or str to write.
+        :param stage: The extraction stage that creates the output.
+        :param digest: The digest of the source data (default: the digest of `data`).
+        :returns: True if the file is written.
+        """
+        if not self.outputs.record(path, digest or get_digest(data), stage):
+            return False
+        # views of memory-mapped asset files are written straight from the map without a copy
+        self.writer.write(path, data)
+        return True
+
+    @profiler.profile("finish")
+    def finish(self) -> bool:
+        """
+        Remove stale outputs, save the output manifest, log a summary of all changed outputs and
+        replace the output folder with the staged outputs once every file was written.
+        :returns: False if the output folder was kept because an output could not be written.
+        """
+        self.outputs.save()
+        return self.writer.commit()
+
+    @profiler.profile("extract.packets")
     def extract_packets(self) -> None:
         """ Extract all outgoing, incoming and data object packet names from MonoScript assets """
         final_path = join(self.output_path, "packets")
         # Ensure the 'packets' folder exists in the output directory
-        if not exists(final_path):
-            mkdir(final_path)
+        assert_path_exists(join(self.writer.path, "packets"))
         logger.info(f"Extracting packet names to '{final_path}'...")
-        out, inc, dat = [], [], []
-        # Iterate over all MonoScript assets and find those packet related
-        monoscript = self.resources.monoscripts
-        for script in monoscript:
-            if script.packet_outgoing:
-                out.append(script.name)
-            elif script.packet_incoming:
-                inc.append(script.name)
-            elif script.packet_data:
-                dat.append(script.name)
-        # Sort the acquired lists A-Z
-        out.sort(), inc.sort(), dat.sort()
+        # Use the packet MonoScripts that were already classified while parsing
+        packets = self.resources.packets
+        out = sorted(script.name for script in packets["outgoing"])
+        inc = sorted(script.name for script in packets["incoming"])
+        dat = sorted(script.name for script in packets["data"])
         total = len(out) + len(inc) + len(dat)
         logger.info(f"Found {len(out)} outgoing, {len(inc)} incoming and {len(dat)} data object names ({total} total)")
         # Write packet names to their respective files
-        with open(join(final_path, "outgoing.txt"), "w") as file:
-            for name in out:
-                file.write(f"{name}\n")
-            logger.success("Saved 'packets/outgoing.txt' to the output folder.")
-        with open(join(final_path, "incoming.txt"), "w") as file:
-            for name in inc:
-                file.write(f"{name}\n")
-            logger.success("Saved 'packets/incoming.txt' to the output folder.")
-        with open(join(final_path, "data.txt"), "w") as file:
-            for name in dat:
-                file.write(f"{name}\n")
-            logger.success("Saved 'packets/data.txt' to the output folder.")
-
-    def extract_xml(self, create_actionscript: bool = False) -> None:
-        """ Extract all XML sheets from Unity TextAsset assets """
+        for file_name, names in (("outgoing.txt", out), ("incoming.txt", inc), ("data.txt", dat)):
+            if self.write_output(f"packets/{file_name}", "".join(f"{name}\n" for name in names), "packets"):
+                logger.success(f"Saved 'packets/{file_name}' to the output folder.")
+        self.save_packet_catalogue()
+
+    def save_packet_catalogue(self) -> None:
+        """
+        Save every classified MonoScript with its category, namespace, path_id and stable id as a JSON catalogue
+        ('catalogue.json') and as a memory-mappable perfect hash table ('catalogue.bin', see PacketCatalogue).
+        """
+        # the MonoScripts were already classified while parsing, so no MonoScript is read again
+        entries = get_entries(self.resources.classified)
+        catalogue = get_catalogue_json(entries)
+        digest = get_digest(catalogue)
+        if self.write_output("packets/catalogue.json", catalogue, "packets", digest):
+            logger.success("Saved 'packets/catalogue.json' to the output folder.")
+        self.write_output("packets/catalogue.bin", PacketCatalogue.from_entries(entries).to_bytes(), "packets", digest)
+
+    @profiler.profile("extract.xml")
+    def extract_xml(self, create_actionscript: bool = False, normalize: bool = False) -> None:
+        """
+        Extract all XML sheets from Unity TextAsset assets
+        :param normalize: Save the sheets with canonical whitespace and attribute order for stable diffs.
+        """
         # todo: double check this function
         final_path = join(self.output_path, "xml")
         # Ensure the 'xml' folder exists in the output directory
-        if not exists(final_path):
-            mkdir(final_path)
+        assert_path_exists(join(self.writer.path, "xml"))
         logger.info(f"Extracting XML files to '{final_path}'...")
         # Iterate over every TextAsset and save those that are XML sheets
-        sheets = self.resources.textassets
+        sheet_count = self.save_xml_sheets(self.resources.textassets, create_actionscript, normalize)
+        logger.success(f"Saved {sheet_count} XML files to the output folder.")
+        if create_actionscript:
+            logger.success(f"Created {sheet_count} matching ActionScript files to import the XML files.")
+
+    def save_xml_sheets(self, sheets: list, create_actionscript: bool = False, normalize: bool = False) -> int:
+        """
+        Save all XML sheets of a list of TextAssets and return how many were found.
+        The files are written together in a thread pool, since saving many small sheets mostly waits on the disk.
+        :param normalize: Save the sheets with canonical whitespace and attribute order (see normalize_sheets).
+        """
+        final_path = join(self.output_path, "xml")
         sheet_count = 0
+        xml_files, writes = [], []
         for sheet in sheets:
             if not sheet.is_xml:
                 continue
-            with open(join(final_path, f"{sheet.name}.xml"), "wb") as file:
-                file.write(sheet.file_data)
-            # Optionally create an ActionScript class that imports the created .xml file
-            if create_actionscript:
-                with open(join(final_path, f"{sheet.name}.as"), "w") as file:
-                    code = ActionScriptExtractor(sheet, final_path)
-                    file.write(code.actionscript)
             sheet_count += 1
-        # todo: consolidate objects, tiles and equips
-        logger.success(f"Saved {sheet_count} XML files to the output folder.")
-        if create_actionscript:
-            logger.success(f"Created {sheet_count} matching ActionScript files to import the XML files.")
+            # normalized sheets get another digest, so toggling normalization rewrites the unchanged sheets
+            digest = get_digest(sheet.file_data, "normalized") if normalize else get_digest(sheet.file_data)
+            if self.outputs.record(f"xml/{sheet.name}.xml", digest, "xml"):
+                xml_files.append((sheet.name, sheet.file_data))
+            # Optionally create an ActionScript class that imports the created .xml file
+            if create_actionscript and self.outputs.record(f"xml/{sheet.name}.as", digest, "xml"):
+                code = ActionScriptExtractor(sheet, final_path)
+                writes.append((f"xml/{sheet.name}.as", code.actionscript))
+        if normalize and xml_files:
+            # canonicalizing is CPU-bound, so it runs in worker processes before the files are written
+            xml_files = list(normalize_sheets(xml_files, self.jobs).items())
+        writes += [(f"xml/{name}.xml", data) for name, data in xml_files]
+        for path, data in writes:
+            self.writer.write(path, data)
+        return sheet_count
 
+    @profiler.profile("extract.gamedata")
+    def extract_gamedata(self) -> None:
+        """ Consolidate the Objects, Grounds and Equipment of all XML sheets into indexed lookup files """
+        assert_path_exists(join(self.writer.path, "gamedata"))
+        logger.info(f"Consolidating the XML sheets to '{join(self.output_path, 'gamedata')}'...")
+        self.save_gamedata(parse_sheets(self.resources.textassets))
+
+    def save_gamedata(self, entries: list) -> None:
+        """
+        Save the entries of the XML sheets as an SQLite database indexed by type and id ('gamedata.db')
+        and as a memory-mappable table with constant time lookups by type ('gamedata.index', see GameData).
+        """
+        entries = merge_entries(entries)
+        digest = get_digest(*(part for entry in entries for part in (entry.sheet, entry.xml)))
+        if self.outputs.record("gamedata/gamedata.db", digest, "gamedata"):
+            database_path = self.writer.get_path("gamedata/gamedata.db")
+            save_database(database_path, entries)
+            profiler.count("files_written")
+            profiler.count("bytes_written", getsize(database_path))
+        self.write_output("gamedata/gamedata.index", GameData.from_entries(entries).to_bytes(), "gamedata", digest)
+        logger.success(f"Saved {len(entries)} game data entries to the output folder.")
+
+    @profiler.profile("extract.spritesheets")
     def extract_spritesheets(self, create_actionscript: bool = False) -> None:
         """ Extract 'spritesheet.json' from a Unity TextAsset asset and optionally create an ActionScript file """
         final_path = join(self.output_path, "spritesheets")
         # Ensure the 'spritesheets' folder exists in the output directory
-        if not exists(final_path):
-            mkdir(final_path)
+        assert_path_exists(join(self.writer.path, "spritesheets"))
         logger.info(f"Extracting spritesheets to '{final_path}'...")
-        actionscript = {}
-        # Iterate over all Texture2D assets and save them as a .png
-        sheets = self.resources.texture2ds
-        for sheet in sheets:
-            if not sheet.spritesheet:
-                continue
-            sheet.image.save(join(final_path, f"{sheet.name}.png"), "PNG")
-            logger.success(f"Saved 'spritesheets/{sheet.name}.png' to the output folder.")
-            # Create ActionScript code for each spritesheet
-            if create_actionscript:
-                code = ActionScriptExtractor(sheet, final_path)
-                actionscript[sheet.name] = code.actionscript
+        # Decode and save all spritesheet Texture2D assets as a .png in worker processes
+        count = self.save_spritesheet_images(self.resources.texture2ds, create_actionscript)
+        logger.success(f"Saved {count} spritesheet images to the output folder.")
         # Optionally create ActionScript class files that will import the .png files to a variable
         if create_actionscript:
-            for script in actionscript.keys():
-                with open(join(final_path, f"{script}.as"), "w") as file:
-                    file.write(actionscript.get(script))
-            logger.success(f"Created {len(actionscript)} ActionScript files to import the spritesheets.\n")
+            logger.success(f"Created {count} ActionScript files to import the spritesheets.\n")
         # Extract the 'spritesheet.json' file from its TextAsset
-        spritesheet = self.resources.spritesheet
-        with open(join(final_path, "spritesheet.json"), "wb") as file:
-            file.write(spritesheet)
-            logger.success("Saved 'spritesheets/spritesheet.json' to the output folder.")
+        self.save_spritesheet()
         # Optionally create an ActionScript class file that will import the spritesheet
         if create_actionscript:
             # with open(join(final_path, "spritesheet.as"), "w") as file:
@@ -114,30 +213,295 @@ class UnityExtractor:
             # todo: fix actionscript spritesheet creation
             pass
 
+    def save_spritesheet_images(self, textures: list, create_actionscript: bool = False,
+                                progress: Progress = None) -> int:
+        """
+        Save all spritesheet images of a list of Texture2Ds and return how many were found
+        :param progress: Counts the saved images, a new one is used if it is not given.
+        """
+        final_path = join(self.output_path, "spritesheets")
+        sheets = [sheet for sheet in textures if sheet.spritesheet]
+        progress = progress or Progress("Saved spritesheet images", len(sheets))
+        for _ in export_textures(self.texture_jobs(sheets, "spritesheets"), self.jobs, self.writer.errors,
+                                 self.max_pending):
+            progress.update()
+        # Create an ActionScript class for each spritesheet that imports its .png file
+        if create_actionscript:
+            for sheet in sheets:
+                code = ActionScriptExtractor(sheet, final_path)
+                self.write_output(f"spritesheets/{sheet.name}.as", code.actionscript, "spritesheets")
+        return len(sheets)
+
+    def save_spritesheet(self) -> None:
+        """ Save 'spritesheet.json' and the binary sprite index built from it """
+        spritesheet = self.resources.spritesheet
+        if spritesheet is None:
+            logger.error("Could not find 'spritesheet.json'.")
+            return
+        digest = get_digest(spritesheet)
+        if self.write_output("spritesheets/spritesheet.json", spritesheet, "spritesheets", digest):
+            logger.success("Saved 'spritesheets/spritesheet.json' to the output folder.")
+        # the index can be memory-mapped by other tools instead of parsing the JSON file again
+        if self.write_output("spritesheets/spritesheet.index", self.sprite_index.to_bytes(), "spritesheets", digest):
+            logger.success("Saved 'spritesheets/spritesheet.index' to the output folder.")
+
+    @profiler.profile("extract.manifests")
     def extract_manifests(self) -> None:
         """ Extract the JSON and XML asset manifest files """
         logger.info("Extracting the asset manifest files...")
 
         manifest = self.resources.manifest_json
-        with open(join(self.output_path, "assets_manifest.json"), "wb") as file:
-            file.write(manifest)
+        if self.write_output("assets_manifest.json", manifest, "manifests"):
             logger.success("Saved 'assets_manifest.json' to the output folder.")
 
         manifest = self.resources.manifest_xml
-        with open(join(self.output_path, "assets_manifest.xml"), "wb") as file:
-            file.write(manifest)
+        if self.write_output("assets_manifest.xml", manifest, "manifests"):
             logger.success("Saved 'assets_manifest.xml' to the output folder.")
 
+    @profiler.profile("extract.texture2d")
     def extract_texture2d(self) -> None:
         """ Save all parsed Texture2D assets to .png files """
         final_path = join(self.output_path, "texture2d")
         # Ensure the 'Texture2D' folder exists in the output directory
-        if not assert_path_exists(final_path):
+        if not assert_path_exists(join(self.writer.path, "texture2d")):
             logger.error("Could not extract Texture2D images to the output folder.")
             return
         logger.info(f"Extracting all Texture2D images to '{final_path}'...")
+        count = self.save_texture2d_images(self.resources.texture2ds)
+        logger.success(f"Saved {count} Texture2D images to the output folder.")
+
+    def save_texture2d_images(self, textures: list, names: set = None, progress: Progress = None) -> int:
+        """
+        Save all Texture2Ds that have an image and return how many were saved
+        :param progress: Counts the saved images, a new one is used if it is not given.
+        """
         # Iterate over all Texture2D assets and skip those without an image
-        textures = self.resources.texture2ds
+        textures = [texture for texture in textures if texture.name and texture.has_image]
+        progress = progress or Progress("Saved Texture2D images", len(textures))
+        count = 0
+        for _ in export_textures(self.texture_jobs(textures, "texture2d", names), self.jobs, self.writer.errors,
+                                 self.max_pending):
+            count += 1
+            progress.update()
+        return count
+
+    @profiler.profile("extract.audio")
+    def extract_audio(self, raw: bool = False) -> None:
+        """
+        Save all AudioClip assets, FMOD sound banks are decoded to .wav files in worker processes
+        :param raw: Save the sound banks as raw .fsb files without decoding them.
+        """
+        final_path = join(self.output_path, "audio")
+        # Ensure the 'audio' folder exists in the output directory
+        if not assert_path_exists(join(self.writer.path, "audio")):
+            logger.error("Could not extract AudioClips to the output folder.")
+            return
+        logger.info(f"Extracting all AudioClips to '{final_path}'...")
+        count = self.save_audioclips(self.resources.audioclips, raw)
+        logger.success(f"Saved {count} AudioClips to the output folder.")
+
+    def save_audioclips(self, clips: list, raw: bool = False, names: set = None, progress: Progress = None) -> int:
+        """
+        Save all AudioClips that have audio data and return how many were found
+        :param progress: Counts the decoded sound banks, a new one is used if it is not given.
+        """
+        clips = [clip for clip in clips if clip.name and clip.size > 0]
+        progress = progress or Progress("Decoded AudioClip sound banks")
+        jobs = self.audio_jobs(clips, raw, names)
+        for job, saved in export_audio_clips(jobs, self.jobs, self.writer.errors, self.max_pending):
+            progress.update()
+            # the subsounds of a sound bank are only known once it was decoded
+            for file_name, size in saved[1:]:
+                self.outputs.record(f"audio/{file_name}", job.digest, "audio")
+            profiler.count("files_written", len(saved))
+            profiler.count("bytes_written", sum(size for _, size in saved))
+        return len(clips)
+
+    def audio_jobs(self, clips: list, raw: bool, names: set = None):
+        """
+        Save each AudioClip whose audio data changed (incremental mode) or every clip.
+        Ogg, WAV and M4A files and raw sound banks are written straight from the asset file,
+        a decode job is yielded for every FMOD sound bank. Clips with duplicate names are given a unique file name.
+        """
+        names = set() if names is None else names
+        for clip in clips:
+            name = clip.name
+            if name in names:
+                name = f"{clip.name}_{clip.path_id}"
+            names.add(name)
+            data = clip.audio_data
+            extension = get_audio_extension(data)
+            decode = extension == ".fsb" and not raw and self.can_decode_audio()
+            digest = get_digest(data, "decoded" if decode else "raw")
+            profiler.count("audioclips")
+            profiler.count("audio_bytes", len(data))
+            if not decode:
+                self.write_output(f"audio/{name}{extension}", data, "audio", digest)
+            elif self.outputs.record(f"audio/{name}.wav", digest, "audio"):
+                job = clip.export_job(dirname(self.writer.get_path(f"audio/{name}.wav")), name)
+                job.digest = digest
+                yield job
+            else:
+                self.outputs.keep_previous(f"audio/{name}-", digest, "audio")
+            clip.release_data()
+
+    def can_decode_audio(self) -> bool:
+        """ Return True if FMOD sound banks can be decoded, otherwise they are saved as raw .fsb files """
+        if self._decode_audio is None:
+            self._decode_audio = has_fmod()
+            if not self._decode_audio:
+                logger.warning("FMOD is not available (pyfmodex), the AudioClip sound banks are saved as .fsb files")
+        return self._decode_audio
+
+    @profiler.profile("extract.sprites")
+    def extract_sprites(self, strips: bool = False) -> None:
+        """ Cut every sprite and animated sprite frame out of the spritesheet atlases """
+        final_path = join(self.output_path, "sprites")
+        # Ensure the 'sprites' folder exists in the output directory
+        if not assert_path_exists(join(self.writer.path, "sprites")):
+            logger.error("Could not extract sprites to the output folder.")
+            return
+        logger.info(f"Extracting sprites to '{final_path}'...")
+        atlases = {}
+        for texture in self.resources.texture2ds:
+            if texture.name in SPRITE_ATLASES and texture.has_image:
+                atlases[texture.name] = load_atlas(texture.image)
+                texture.release_image()
+        count = self.save_sprites(atlases, strips)
+        logger.success(f"Saved {count} sprites to the output folder.")
+
+    def save_sprites(self, atlases: dict, strips: bool = False) -> int:
+        """
+        Slice the sprites of 'spritesheet.json' out of the decoded atlases and save them, return how many were saved.
+        :param atlases: The decoded atlas arrays by texture name.
+        :param strips: Pack all frames of an animated object into one strip instead of saving every frame.
+        """
+        spritesheet = self.resources.spritesheet
+        if spritesheet is None:
+            logger.error("Could not find 'spritesheet.json' to slice the sprites.")
+            return 0
+        frames = get_frames(self.sprite_index)
+        # every sprite is a view into its atlas, grouped by the file it is saved to
+        views, rects = {}, {}
+        atlas_digests = {name: get_digest(atlas) for name, atlas in atlases.items()}
+        for name in sorted({frame.atlas for frame in frames} - set(atlases)):
+            logger.warning(f"Skipping the sprites of the missing atlas '{name}'")
+        for name, atlas in atlases.items():
+            atlas_frames = [frame for frame in frames if frame.atlas == name]
+            for frame, view in zip(atlas_frames, slice_atlas(atlas, atlas_frames)):
+                if view is None:
+                    continue
+                path = frame.group if strips else frame.path
+                views.setdefault(path, []).append(view)
+                rects.setdefault(path, [atlas_digests[name]]).append(f"{frame.x},{frame.y},{frame.width},{frame.height}")
+        images = []
+        for path, sprite_views in views.items():
+            # the digest of the atlas and the rects, so unchanged sprites are not saved again
+            if self.outputs.record(f"sprites/{path}.png", get_digest(*rects[path]), "sprites"):
+                full_path = self.writer.get_path(f"sprites/{path}.png")
+                images.append((full_path, sprite_views[0] if len(sprite_views) == 1 else pack_strip(sprite_views)))
+        count = save_images(images, self.jobs, self.writer.errors)
+        profiler.count("files_written", count)
+        return count
+
+    def limit_memory(self, max_memory: int) -> None:
+        """
+        Bring the resident memory below a target before the next Unity file is read.
+        Above the target, garbage is collected and the queued output files are written, and while it is still above,
+        only one texture or audio job is decoded at a time so their pixel data and samples are not held at once.
+        :param max_memory: The target resident memory in bytes.
+        """
+        limited = self.max_pending is not None
+        self.max_pending = None
+        if get_memory_usage() <= max_memory:
+            return
+        gc.collect()
+        if get_memory_usage() > max_memory:
+            self.writer.flush()
+        if get_memory_usage() > max_memory:
+            self.max_pending = 1
+            if not limited:
+                logger.warning(f"Memory usage is above the target of {max_memory / 2 ** 20:.0f} MB, "
+                               f"textures and audio are decoded one at a time until it is below")
+
+    @profiler.profile("extract.streaming")
+    def extract_streaming(self, stages: list, max_memory: int = None, sprite_strips: bool = False,
+                          normalize_xml: bool = False, raw_audio: bool = False) -> None:
+        """
+        Run the given extraction stages while the resources are read file by file.
+        Only the assets of one Unity file are held in memory at a time, which keeps memory usage bounded.
+        :param stages: The extraction stages to run.
+        :param max_memory: The target resident memory in bytes, see limit_memory.
+        :param sprite_strips: Pack all frames of an animated object into one strip.
+        :param normalize_xml: Save the XML sheets with canonical whitespace and attribute order.
+        :param raw_audio: Save the AudioClip sound banks as raw .fsb files without decoding them.
+        """
+        # Ensure the stage folders exist in the output directory (the manifests are saved to the output root)
+        for stage in stages:
+            if stage != "manifests":
+                assert_path_exists(join(self.writer.path, stage))
+        logger.info(f"Streaming assets for the {', '.join(stages)} stages...")
+        xml_count, sheet_count, texture_count, audio_count = 0, 0, 0, 0
+        texture_names, audio_names = set(), set()
+        # the totals are unknown while streaming, so the progress only counts up
+        sheet_progress = Progress("Saved spritesheet images")
+        texture_progress = Progress("Saved Texture2D images")
+        audio_progress = Progress("Decoded AudioClip sound banks")
+        entries = []
+        atlases = {}
+        limit_memory = (lambda: self.limit_memory(max_memory)) if max_memory is not None else None
+        for path, assets in self.resources.stream_assets(get_asset_types(stages), limit_memory):
+            if "sprites" in stages:
+                # only the decoded atlases are kept until 'spritesheet.json' was read
+                for texture in assets["Texture2D"]:
+                    if texture.name in SPRITE_ATLASES and texture.has_image:
+                        atlases[texture.name] = load_atlas(texture.image)
+            if "xml" in stages:
+                xml_count += self.save_xml_sheets(assets["TextAsset"], True, normalize_xml)
+            if "gamedata" in stages:
+                entries += parse_sheets(assets["TextAsset"])
+            if "spritesheets" in stages:
+                sheet_count += self.save_spritesheet_images(assets["Texture2D"], True, sheet_progress)
+            if "texture2d" in stages:
+                texture_count += self.save_texture2d_images(assets["Texture2D"], texture_names, texture_progress)
+            if "audio" in stages:
+                audio_count += self.save_audioclips(assets["AudioClip"], raw_audio, audio_names, audio_progress)
+        if "xml" in stages:
+            logger.success(f"Saved {xml_count} XML files to the output folder.")
+        if "spritesheets" in stages:
+            logger.success(f"Saved {sheet_count} spritesheet images to the output folder.")
+        if "texture2d" in stages:
+            logger.success(f"Saved {texture_count} Texture2D images to the output folder.")
+        if "audio" in stages:
+            logger.success(f"Saved {audio_count} AudioClips to the output folder.")
+        # the remaining stages only use the small names and files that were kept while streaming
+        if "packets" in stages:
+            self.extract_packets()
+        if "spritesheets" in stages:
+            self.save_spritesheet()
+        if "manifests" in stages:
+            self.extract_manifests()
+        if "gamedata" in stages:
+            self.save_gamedata(entries)
+        if "sprites" in stages:
+            logger.success(f"Saved {self.save_sprites(atlases, sprite_strips)} sprites to the output folder.")
+
+    def texture_jobs(self, textures: list, stage: str, names: set = None):
+        """
+        Yield a decode-and-save job for each texture whose pixel data changed (incremental mode) or for every texture.
+        Textures with duplicate names are given a unique file name.
+        """
+        names = set() if names is None else names
         for texture in textures:
-            if not texture.has_image:
-                continue
+            name = texture.name
+            if name in names:
+                name = f"{texture.name}_{texture.path_id}"
+            names.add(name)
+            path = f"{stage}/{name}.png"
+            # the digest of the raw pixel data is compared, so unchanged textures are never read or decoded
+            digest = get_digest(texture.image_digest, f"{texture.width}x{texture.height}:{texture.format}")
+            profiler.count("textures")
+            if self.outputs.record(path, digest, stage):
+                profiler.count("image_bytes", len(texture.image_data))
+                yield texture.export_job(self.writer.get_path(path))
+            texture.release_image()  # the worker decodes its own copy of the pixel data
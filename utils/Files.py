@@ -1,3 +1,17 @@
+import mmap
+import os
+import sys
+from os import cpu_count, mkdir
+from os.path import exists
+
+from utils.Logger import Logger, get_console_level, init_worker_logging
+
+logger = Logger()
+
+# the modules the fork server imports once for all workers, none of them may start a thread
+FORKSERVER_PRELOAD = ["UnityPy", "numpy", "PIL.Image", "texture2ddecoder"]
+
+
 def assert_path_exists(path: str) -> bool:
     if not exists(path):
         try:
@@ -6,3 +20,73 @@ def assert_path_exists(path: str) -> bool:
             logger.error(f"Failed creating path '{path}': {e}")
             return False
     return True
+
+
+def get_worker_count(jobs: int = None) -> int:
+    """ Return the number of worker processes to use, defaulting to one per CPU core """
+    if jobs is None or jobs < 1:
+        return cpu_count() or 1
+    return jobs
+
+
+def get_process_pool(workers: int):
+    """
+    Return a process pool whose workers are not forked from this process.
+    A fork only copies the thread that forks, so a lock that the log listener or an output writer thread held at
+    that moment would stay locked forever in the worker. Where it is available, the workers are forked from a fork
+    server that has no threads and already imported the heavy dependencies, otherwise they are spawned.
+    :param workers: The number of worker processes.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker_logging,
+                               initargs=(get_console_level(),))
+
+
+def get_memory_usage() -> int:
+    """
+    Return the resident memory of this process in bytes or 0 if it can not be determined.
+    Pages of memory-mapped files are not counted, the OS can drop them at any time and read them again.
+    """
+    try:
+        with open("/proc/self/statm", "r") as file:
+            _, resident, shared = file.read().split()[:3]
+        return (int(resident) - int(shared)) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    # without /proc only the peak resident memory is available
+    return get_peak_memory()
+
+
+def get_peak_memory() -> int:
+    """ Return the peak resident memory of this process in bytes or 0 if it can not be determined """
+    try:
+        import resource
+    except ImportError:
+        return 0  # Windows
+    # the peak resident memory is in bytes on macOS and in kilobytes elsewhere
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def map_file(path: str) -> memoryview:
+    """
+    Return a read-only view of a memory-mapped file, its pages are only read from disk when they are accessed.
+    Slices of the view are not copied, the file stays mapped until the view and all of its slices are released.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return memoryview(b"")  # empty files can not be mapped
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def write_file(path: str, data) -> int:
+    """ Write bytes or text to a file and return the number of bytes written """
+    with open(path, "wb" if isinstance(data, (bytes, bytearray, memoryview)) else "w") as file:
+        file.write(data)
+    return os.path.getsize(path)
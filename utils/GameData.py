@@ -0,0 +1,221 @@
+import hashlib
+import sqlite3
+import xml.etree.ElementTree as ElementTree
+from os import remove, replace
+from os.path import exists
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from utils.ArrayFile import map_arrays, pack_arrays
+from utils.Logger import Logger
+from utils.SpriteIndex import get_slots
+
+logger = Logger()
+
+# the magic bytes and version at the start of a binary game data file
+GAMEDATA_MAGIC = b"GDIX"
+GAMEDATA_VERSION = 1
+# the elements of the XML sheets that are game data entries, equipment are Objects with the class 'Equipment'
+KINDS = ["Object", "Ground"]
+
+# the arrays of a game data file as (name, dtype, columns)
+ARRAYS = [
+    ("strings", "u1", 1),  # the utf8 ids, classes and XML of every entry
+    ("sheet_names", "u1", 1),  # the utf8 sheet names, each terminated by a null byte
+    ("entry_kind", "u1", 1), ("entry_type", "<i4", 1), ("entry_sheet", "<u2", 1),
+    # the (offset, length) of the id, class and XML of every entry in 'strings'
+    ("entry_id", "<i8", 2), ("entry_class", "<i8", 2), ("entry_xml", "<i8", 2),
+    # a direct-address table per kind: type_slots[type_offset[kind] + type] is the entry row or -1
+    ("type_offset", "<i8", 1), ("type_length", "<i4", 1), ("type_slots", "<i4", 1),
+    # the hashes of all ids in ascending order and the entry row of each hash
+    ("id_hash", "<u8", 1), ("id_rows", "<i4", 1)
+]
+
+SCHEMA = """
+CREATE TABLE entries (
+    kind TEXT NOT NULL,
+    type INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    class TEXT,
+    sheet TEXT NOT NULL,
+    xml TEXT NOT NULL,
+    PRIMARY KEY (kind, type)
+);
+CREATE INDEX entries_type ON entries (type);
+CREATE INDEX entries_id ON entries (id);
+"""
+
+
+class GameEntry(NamedTuple):
+    """ An Object or Ground entry of the XML sheets """
+    kind: str
+    type: int
+    id: str
+    class_name: Optional[str]
+    sheet: str
+    xml: str
+
+
+def get_id_hash(entry_id: str) -> int:
+    """ Return the 64 bit hash of an entry id, it is the same in every process unlike hash() """
+    return int.from_bytes(hashlib.blake2b(entry_id.encode("utf8"), digest_size=8).digest(), "little")
+
+
+def parse_sheet(name: str, data: bytes) -> list[GameEntry]:
+    """ Return all entries of an XML sheet, sheets that are not valid XML have no entries """
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError:
+        return []
+    entries = []
+    for element in root:
+        type_id, entry_id = element.get("type"), element.get("id")
+        if element.tag not in KINDS or type_id is None or entry_id is None:
+            continue
+        try:
+            entry_type = int(type_id, 16)
+        except ValueError:
+            logger.warning(f"Skipping {element.tag} '{entry_id}' in '{name}.xml' with the invalid type '{type_id}'")
+            continue
+        xml = ElementTree.tostring(element, encoding="unicode").strip()
+        entries.append(GameEntry(element.tag, entry_type, entry_id, element.findtext("Class"), name, xml))
+    return entries
+
+
+def parse_sheets(sheets: list) -> list[GameEntry]:
+    """ Return the entries of all XML sheets of a list of TextAssets """
+    entries = []
+    for sheet in sheets:
+        if sheet.is_xml:
+            entries += parse_sheet(sheet.name, sheet.file_data)
+    return entries
+
+
+def merge_entries(entries: list) -> list[GameEntry]:
+    """ Return the entries with a unique kind and type, the first entry of a duplicate type is kept """
+    merged = {}
+    for entry in entries:
+        merged.setdefault((entry.kind, entry.type), entry)
+    if len(merged) < len(entries):
+        logger.warning(f"Ignored {len(entries) - len(merged)} entries with a duplicate type")
+    return list(merged.values())
+
+
+def save_database(path: str, entries: list) -> None:
+    """
+    Write all entries to a new SQLite database indexed by type and id, an existing database is replaced.
+    Only the first entry of a duplicate kind and type is kept (see merge_entries).
+    """
+    temp_path = f"{path}.tmp"
+    if exists(temp_path):
+        remove(temp_path)
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?)", entries)
+        connection.commit()
+    finally:
+        connection.close()
+    replace(temp_path, path)
+
+
+class GameData:
+    """
+    A compact lookup table of every Object and Ground entry of the XML sheets.
+    Entries are found by type through a direct-address table and by id through sorted id hashes,
+    so a memory-mapped file answers lookups without parsing any XML.
+    """
+
+    def __init__(self, arrays: dict, buffer=None):
+        """
+        :param arrays: The arrays of the table by name (see ARRAYS).
+        :param buffer: The memory map the arrays are views of, kept open as long as the table is used.
+        """
+        self.arrays = arrays
+        self._buffer = buffer
+        self.sheet_names = bytes(arrays["sheet_names"]).decode("utf8").split("\0")[:-1]
+
+    @classmethod
+    def from_entries(cls, entries: list) -> "GameData":
+        """ Build the table from a list of GameEntry, only the first entry of a duplicate kind and type is found """
+        sheet_ids = {name: i for i, name in enumerate(sorted({entry.sheet for entry in entries}))}
+        strings, spans = bytearray(), {"entry_id": [], "entry_class": [], "entry_xml": []}
+        for entry in entries:
+            for name, value in (("entry_id", entry.id), ("entry_class", entry.class_name or ""),
+                                ("entry_xml", entry.xml)):
+                raw = value.encode("utf8")
+                spans[name].append((len(strings), len(raw)))
+                strings += raw
+        arrays = {
+            "strings": np.frombuffer(bytes(strings), np.uint8),
+            "sheet_names": np.frombuffer("".join(f"{name}\0" for name in sheet_ids).encode("utf8"), np.uint8),
+            "entry_kind": np.array([KINDS.index(entry.kind) for entry in entries], np.uint8),
+            "entry_type": np.array([entry.type for entry in entries], np.int32),
+            "entry_sheet": np.array([sheet_ids[entry.sheet] for entry in entries], np.uint16)
+        }
+        for name, values in spans.items():
+            arrays[name] = np.array(values, np.int64).reshape(-1, 2)
+        arrays["type_offset"], arrays["type_length"], arrays["type_slots"] = get_slots(
+            arrays["entry_kind"].astype(np.int64), arrays["entry_type"].astype(np.int64), len(KINDS))
+        hashes = np.array([get_id_hash(entry.id) for entry in entries], np.uint64)
+        order = np.argsort(hashes, kind="stable")
+        arrays["id_hash"], arrays["id_rows"] = hashes[order], order.astype(np.int32)
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "GameData":
+        """ Memory-map a binary game data file, the entries are read from the file on access """
+        arrays, buffer = map_arrays(path, GAMEDATA_MAGIC, GAMEDATA_VERSION)
+        return cls(arrays, buffer)
+
+    def to_bytes(self) -> bytes:
+        """ Return the binary file content of the table """
+        return pack_arrays(GAMEDATA_MAGIC, GAMEDATA_VERSION, self.arrays, ARRAYS)
+
+    def save(self, path: str) -> None:
+        """ Write the table to a binary file """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    def close(self) -> None:
+        """ Close the memory map of a loaded table, its arrays can not be used afterwards """
+        self.arrays = {}
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def __len__(self) -> int:
+        return len(self.arrays["entry_type"])
+
+    def get_string(self, name: str, row: int) -> str:
+        """ Return a string column of an entry """
+        offset, length = self.arrays[name][row].tolist()
+        return bytes(self.arrays["strings"][offset:offset + length]).decode("utf8")
+
+    def entry(self, row: int) -> GameEntry:
+        """ Return the entry of a row """
+        return GameEntry(KINDS[int(self.arrays["entry_kind"][row])], int(self.arrays["entry_type"][row]),
+                         self.get_string("entry_id", row), self.get_string("entry_class", row) or None,
+                         self.sheet_names[int(self.arrays["entry_sheet"][row])], self.get_string("entry_xml", row))
+
+    def by_type(self, type_id: int, kind: str = "Object") -> Optional[GameEntry]:
+        """ Return the entry of a kind with a type id or None if there is no such entry """
+        kind_id = KINDS.index(kind)
+        if type_id < 0 or type_id >= self.arrays["type_length"][kind_id]:
+            return None
+        row = int(self.arrays["type_slots"][self.arrays["type_offset"][kind_id] + type_id])
+        return None if row < 0 else self.entry(row)
+
+    def by_id(self, entry_id: str) -> Optional[GameEntry]:
+        """ Return the first entry with an id or None if there is no such entry """
+        hashes = self.arrays["id_hash"]
+        value = np.uint64(get_id_hash(entry_id))
+        # different ids can share a hash, so every row of the hash is compared
+        for position in range(int(np.searchsorted(hashes, value)), len(hashes)):
+            if hashes[position] != value:
+                break
+            row = int(self.arrays["id_rows"][position])
+            if self.get_string("entry_id", row) == entry_id:
+                return self.entry(row)
+        return None
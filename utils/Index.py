@@ -0,0 +1,140 @@
+import json
+from os import stat, replace
+from os.path import exists, join, relpath
+from typing import Optional
+
+from utils.Logger import Logger
+from utils.Scanner import FileSummary, ObjectSummary, get_file_digest
+
+logger = Logger()
+
+# bump this when the layout of the index file changes so old indexes are rebuilt
+INDEX_VERSION = 4
+
+
+class AssetIndex:
+    """ A persistent on-disk index of the object summaries of every scanned Unity asset file """
+
+    def __init__(self, index_path: str, resource_path: str):
+        self.path = index_path
+        self.resource_path = resource_path
+        self.files, self.headers = self.load()
+        self.changed = False
+
+    def load(self) -> tuple:
+        """ Load the stored (file entries, file headers) or return an empty index if there is no valid index file """
+        if not exists(self.path):
+            return {}, {}
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable asset index '{self.path}': {e}")
+            return {}, {}
+        if data.get("version") != INDEX_VERSION:
+            logger.warning(f"Ignoring asset index '{self.path}' written by an older version")
+            return {}, {}
+        return data.get("files", {}), data.get("headers", {})
+
+    def lookup(self, path: str, asset_types: set = None) -> Optional[FileSummary]:
+        """
+        Return the stored summary of an asset file if the file did not change since it was indexed.
+        :param asset_types: The asset types the summary has to include, a file scanned for fewer types is scanned again.
+        """
+        entry = self.files.get(relpath(path, self.resource_path))
+        if entry is None or (asset_types is not None and not set(asset_types) <= set(entry["types"])):
+            return None
+        file_stat = stat(path)
+        if file_stat.st_size != entry["size"]:
+            return None
+        if file_stat.st_mtime != entry["mtime"]:
+            # the file was touched, only rescan it if the content changed as well
+            if get_file_digest(path) != entry["digest"]:
+                return None
+            entry["mtime"] = file_stat.st_mtime
+            self.changed = True
+        objects = [ObjectSummary(path, *obj) for obj in entry["objects"]]
+        return FileSummary(path, objects, entry["size"], entry["mtime"], entry["digest"])
+
+    def update(self, summary: FileSummary, asset_types: set) -> None:
+        """
+        Store the summary of a freshly scanned asset file, a summary that is not complete is never stored.
+        :param asset_types: The asset types the file was scanned for, the stored objects of other types are kept
+                            if the file did not change.
+        """
+        key = relpath(summary.path, self.resource_path)
+        if not summary.complete:
+            # a file that was not fully scanned is scanned again by the next run
+            if self.files.pop(key, None) is not None:
+                self.changed = True
+            return
+        objects, types = [list(obj[1:]) for obj in summary.objects], set(asset_types)
+        entry = self.files.get(key)
+        if entry is not None and entry["digest"] == summary.digest:
+            objects += [obj for obj in entry["objects"] if obj[0] not in types]
+            types |= set(entry["types"])
+        self.files[key] = {
+            "size": summary.size, "mtime": summary.mtime, "digest": summary.digest, "types": sorted(types),
+            "objects": objects
+        }
+        self.changed = True
+
+    def lookup_class_ids(self, path: str) -> tuple:
+        """
+        Return (True, class ids) if the class ids of a file's type table are stored and the file did not change.
+        The pre-scan is cheap, so a file whose size or modification time changed is pre-scanned again.
+        """
+        entry = self.headers.get(relpath(path, self.resource_path))
+        if entry is None:
+            return False, None
+        file_stat = stat(path)
+        if file_stat.st_size != entry["size"] or file_stat.st_mtime != entry["mtime"]:
+            return False, None
+        return True, entry["class_ids"]
+
+    def update_class_ids(self, path: str, class_ids: Optional[list]) -> None:
+        """ Store the class ids of a file's type table, see Scanner.read_class_ids """
+        file_stat = stat(path)
+        self.headers[relpath(path, self.resource_path)] = {
+            "size": file_stat.st_size, "mtime": file_stat.st_mtime, "class_ids": class_ids
+        }
+        self.changed = True
+
+    def summaries(self) -> list:
+        """ Return the stored summaries of all indexed files without checking the files on disk """
+        summaries = []
+        for key, entry in self.files.items():
+            path = join(self.resource_path, key)
+            objects = [ObjectSummary(path, *obj) for obj in entry["objects"]]
+            summaries.append(FileSummary(path, objects, entry["size"], entry["mtime"], entry["digest"]))
+        return summaries
+
+    def scanned_types(self) -> set:
+        """ Return the asset types every indexed file was scanned for, the index holds all objects of these types """
+        types = None
+        for entry in self.files.values():
+            types = set(entry["types"]) if types is None else types & set(entry["types"])
+        return types or set()
+
+    def prune(self, paths: list) -> None:
+        """ Remove every indexed file that is no longer part of the resource directory """
+        keep = {relpath(path, self.resource_path) for path in paths}
+        for entries in (self.files, self.headers):
+            for key in [key for key in entries if key not in keep]:
+                del entries[key]
+                self.changed = True
+
+    def save(self) -> None:
+        """ Write the index to disk if anything changed, replacing the old index file atomically """
+        if not self.changed:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"version": INDEX_VERSION, "files": self.files, "headers": self.headers}, file, separators=(",", ":"))
+        replace(temp_path, self.path)
+        self.changed = False
+
+
+def get_default_index_path(output_path: str) -> str:
+    """ Return the default asset index path, a file next to the output folder """
+    return output_path.rstrip("/\\") + ".index.json"
@@ -0,0 +1,37 @@
+import sys
+from importlib import import_module
+from types import ModuleType
+
+
+class LazyPackage(ModuleType):
+    """ A package whose exported names import their module when they are first used """
+
+    def __getattr__(self, name: str):
+        module = self.__dict__.get("_exports", {}).get(name)
+        if module is None:
+            raise AttributeError(f"module '{self.__name__}' has no attribute '{name}'")
+        value = getattr(import_module(module, self.__name__), name)
+        super().__setattr__(name, value)
+        return value
+
+    def __setattr__(self, name: str, value) -> None:
+        # importing a submodule sets it on its package, but an exported name (e.g. `utils.Resources`) stays the class
+        if isinstance(value, ModuleType) and name in self.__dict__.get("_exports", {}):
+            return
+        super().__setattr__(name, value)
+
+    def __dir__(self) -> list:
+        return sorted(set(self.__dict__) | set(self._exports))
+
+
+def export_lazily(package_name: str, exports: dict) -> None:
+    """
+    Make the exported names of a package import their modules on first use instead of when the package is imported,
+    so importing the package stays fast and heavy dependencies (e.g. UnityPy) are only loaded when they are needed.
+    :param package_name: The __name__ of the package.
+    :param exports: The module of every exported name, relative to the package (e.g. {"Resources": ".Resources"}).
+    """
+    package = sys.modules[package_name]
+    package._exports = exports
+    package.__all__ = list(exports)
+    package.__class__ = LazyPackage
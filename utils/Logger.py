@@ -1,9 +1,16 @@
+import atexit
 import datetime
 import os.path
 import logging
+import time
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
 from sys import stdout
 from colorama import Fore, Back, Style, init
 
+# the time format of every log line (e.g 01-02-22 10:21:05)
+LOG_TIME_FORMAT = "%d-%m-%y %H:%M:%S"
+
 
 def test_colors() -> None:
     """ Prints all the ANSI 256 colors with their code to the console. """
@@ -35,6 +42,8 @@ def add_custom_log_level(lvl_name: str, lvl_num: int, method_name=None) -> None:
 
     def log_for_level(self, message, *args, **kwargs):
         if self.isEnabledFor(lvl_num):
+            # report the file that called this method, not this module
+            kwargs.setdefault("stacklevel", 2)
             self._log(lvl_num, message, args, **kwargs)
 
     def log_to_root(message, *args, **kwargs):
@@ -47,8 +56,8 @@ def add_custom_log_level(lvl_name: str, lvl_num: int, method_name=None) -> None:
 
 
 def get_log_time(now: datetime.datetime) -> str:
-    """ Return a formatted time string (e.g 01/02/22 10:21:05) from a given datetime. """
-    return now.strftime("%d-%m-%y %H:%M:%S")
+    """ Return a formatted time string (e.g 01-02-22 10:21:05) from a given datetime. """
+    return now.strftime(LOG_TIME_FORMAT)
 
 
 def get_input(message: str = "") -> str:
@@ -56,6 +65,8 @@ def get_input(message: str = "") -> str:
     A wrapper function over `input()` that uses our custom logger format.
     :param message: The message to print when asking the user for input (optional).
     """
+    # the queued log lines are printed first, so the prompt is the last line
+    flush_logs()
     time_now = get_log_time(datetime.datetime.now())
     print(f"{Style.BRIGHT}{Back.BLACK}{time_now} [INPUT] {'Enter input' if message == '' else message}:{Style.RESET_ALL} ", end="", sep="")
     return input()
@@ -66,6 +77,10 @@ class CustomLogLevel:
     SUCCESS = 15
 
 
+# the console log level of each verbosity: quiet, normal and verbose (see set_verbosity)
+VERBOSITY_LEVELS = {-1: logging.WARNING, 0: CustomLogLevel.SUCCESS, 1: logging.DEBUG}
+
+
 class ColorFormatter(logging.Formatter):
     """ A custom color formatter for the built-in `logging` package that uses ANSI color codes. """
 
@@ -85,23 +100,48 @@ class ColorFormatter(logging.Formatter):
             logging.CRITICAL: Back.BLACK + Style.BRIGHT + Fore.RED + self.fmt + Style.RESET_ALL,
             CustomLogLevel.SUCCESS: Style.BRIGHT + Fore.GREEN + self.fmt + Style.RESET_ALL,
         }
+        # one formatter per level, created once instead of for every record
+        self.formatters = {level: logging.Formatter("%(asctime)s " + log_format, LOG_TIME_FORMAT)
+                           for level, log_format in self.FORMATS.items()}
+        self.default_formatter = logging.Formatter("%(asctime)s " + self.fmt, LOG_TIME_FORMAT)
 
     def format(self, record: logging.LogRecord) -> str:
         """
-        Custom format function that adds a current readable date/time and log level to a log record and returns it as text.
+        Custom format function that adds the readable date/time of a log record and its level color and returns it as text.
+        The time is taken from the record, which may be formatted later by the log listener thread.
         :param record: The log record to format.
         :returns: The formatted string that is ready to be passed to the logger.
         """
-        log_format = self.FORMATS.get(record.levelno)
-        time = get_log_time(datetime.datetime.now())
-        formatter = logging.Formatter(time + " " + log_format)
-        return formatter.format(record)
+        return self.formatters.get(record.levelno, self.default_formatter).format(record)
+
+
+class LogFileHandler(logging.FileHandler):
+    """ Opens the log file (and creates its directory) when the first record is written instead of at startup """
+
+    def __init__(self, filename: str):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class LogQueueHandler(QueueHandler):
+    """ Queues log records for the listener thread without formatting them in the thread that logs """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """ Return the record unchanged, the queue never leaves the process so it does not have to be picklable """
+        return record
 
 
 class Logger:
     """ The actual logger class that wraps the logging library and is exported/used. """
 
     _instance = None
+    # the file and console handlers, the queue of records waiting for them and the thread that writes them
+    _handlers = []
+    _queue = None
+    _listener = None
 
     def __new__(cls, *args, **kwargs):
         """ Hook new initializations to ensure the class is a singleton. self._instance contains the global class instance. """
@@ -113,26 +153,120 @@ class Logger:
             cls._instance.setLevel(logging.DEBUG)
             #
             now = datetime.datetime.now()
-            formatter = ColorFormatter('[%(filename)s | %(levelname)s] %(message)s')
-            # Ensure that the "logs" directory exists
-            dirname = "./logs"
-            if not os.path.isdir(dirname):
-                os.mkdir(dirname)
-            # Create a console and file logging handler
-            file_handler = logging.FileHandler(dirname + "/log_" + now.strftime("%Y-%m-%d") + ".log")
+            # Create a console and file logging handler, the file gets every message without colors
+            file_handler = LogFileHandler("./logs/log_" + now.strftime("%Y-%m-%d") + ".log")
+            file_handler.setFormatter(logging.Formatter(
+                "%(asctime)s [%(filename)s | %(levelname)s] %(message)s", LOG_TIME_FORMAT))
             stream_handler = logging.StreamHandler()
-            file_handler.setFormatter(formatter)
-            stream_handler.setFormatter(formatter)
-            cls._instance.addHandler(file_handler)
-            cls._instance.addHandler(stream_handler)
+            stream_handler.setFormatter(ColorFormatter('[%(filename)s | %(levelname)s] %(message)s'))
+            stream_handler.setLevel(VERBOSITY_LEVELS[0])
+            cls._handlers = [file_handler, stream_handler]
+            # records are only queued by the threads that log, formatting and writing happens in the listener thread
+            cls._queue = Queue()
+            cls._listener = QueueListener(cls._queue, *cls._handlers, respect_handler_level=True)
+            cls._listener.start()
+            cls._instance.addHandler(LogQueueHandler(cls._queue))
+            atexit.register(stop_logging)
+            # forked processes have no listener thread, they write their records directly (there is no fork on Windows)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=log_directly)
         return cls._instance
 
     @staticmethod
     def newline() -> None:
         """ Simple readability function to log a newline to the console. """
+        flush_logs()
         print("\n")
 
 
+def log_directly() -> None:
+    """ Replace the queue handler of the logger with the console and file handlers, e.g. in a forked process """
+    logger = logging.getLogger("crumbs")
+    for handler in list(logger.handlers):
+        if isinstance(handler, LogQueueHandler):
+            logger.removeHandler(handler)
+            for target in Logger._handlers:
+                logger.addHandler(target)
+    # the listener thread was not copied to this process
+    Logger._listener = None
+
+
+def init_worker_logging(console_level: int) -> None:
+    """
+    Write the records of a worker process directly, like a forked process does, so none are lost when it is stopped.
+    Used as the initializer of process pools, whose workers import the logger again instead of being forked.
+    :param console_level: The console log level of the process that started the worker.
+    """
+    Logger()
+    stop_logging()
+    log_directly()
+    Logger._handlers[1].setLevel(console_level)
+
+
+def get_console_level() -> int:
+    """ Return the log level of the console, e.g. to pass it on to worker processes """
+    Logger()
+    return Logger._handlers[1].level
+
+
+def flush_logs() -> None:
+    """ Wait until every queued log record was written """
+    if Logger._listener is not None:
+        Logger._queue.join()
+
+
+def line_break() -> None:
+    """ Print an empty line to the console after every queued log record """
+    flush_logs()
+    print()
+
+
+def stop_logging() -> None:
+    """ Write the remaining queued log records and stop the listener thread """
+    listener, Logger._listener = Logger._listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def set_verbosity(verbosity: int) -> None:
+    """
+    Set which messages are printed to the console, the log file always gets every message.
+    :param verbosity: -1 for warnings and errors only, 0 for progress and results (default), 1 to add debug messages.
+    """
+    Logger()
+    # the queued records were logged with the old verbosity
+    flush_logs()
+    Logger._handlers[1].setLevel(VERBOSITY_LEVELS[max(-1, min(1, verbosity))])
+
+
+class Progress:
+    """
+    Counts the items of a long-running task and logs the count at most once per interval,
+    instead of logging a line for every item.
+    """
+
+    def __init__(self, task: str, total: int = None, interval: float = 2.0):
+        """
+        :param task: What is counted, e.g. "Saved Texture2D images".
+        :param total: The number of items if it is known.
+        :param interval: The minimum number of seconds between two progress lines.
+        """
+        self.task = task
+        self.total = total
+        self.interval = interval
+        self.count = 0
+        self.last = time.perf_counter()
+
+    def update(self, count: int = 1) -> None:
+        """ Count finished items and log the progress if the interval has passed """
+        self.count += count
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            total = f"/{self.total}" if self.total is not None else ""
+            Logger().info(f"{self.task}: {self.count}{total}", stacklevel=2)
+
+
 def get_logger(name: str = None):
     """
     Return a Logger instance for the optional passed file name. This function should be imported in other files.
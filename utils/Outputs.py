@@ -0,0 +1,111 @@
+import hashlib
+import json
+from os import remove, replace
+from os.path import exists, join
+
+from utils.Logger import Logger
+
+logger = Logger()
+
+# the name of the file inside the output folder that stores the digest of every written output
+MANIFEST_NAME = ".outputs.json"
+
+
+def get_digest(*parts) -> str:
+    """ Return the hex digest of all given bytes or str parts """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf8") if isinstance(part, str) else part)
+    return digest.hexdigest()
+
+
+class OutputManifest:
+    """ Tracks a digest of the source data of every output file to skip rewriting unchanged outputs """
+
+    def __init__(self, output_path: str, incremental: bool = False):
+        """
+        :param output_path: The output folder the manifest is stored in.
+        :param incremental: Skip writing outputs whose source digest did not change since the last run.
+        """
+        self.output_path = output_path
+        self.incremental = incremental
+        self.path = join(output_path, MANIFEST_NAME)
+        self.previous = self.load()
+        self.outputs = {}
+        self.stages = set()
+        self.added, self.changed, self.unchanged = [], [], []
+
+    def load(self) -> dict:
+        """ Return the output digests of the last run or nothing if there is no manifest yet """
+        if not exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable output manifest '{self.path}': {e}")
+            return {}
+
+    def is_current(self, path: str, digest: str) -> bool:
+        """ Return True if an incremental run can skip writing an output because its source did not change """
+        previous = self.previous.get(path)
+        if not self.incremental or previous is None or previous[0] != digest:
+            return False
+        return exists(join(self.output_path, path))
+
+    def record(self, path: str, digest: str, stage: str) -> bool:
+        """
+        Record the source digest of an output and return True if the output needs to be written.
+        :param path: The output path relative to the output folder.
+        :param digest: The digest of the source data the output is created from.
+        :param stage: The extraction stage that creates the output.
+        """
+        self.stages.add(stage)
+        self.outputs[path] = [digest, stage]
+        previous = self.previous.get(path)
+        if previous is None:
+            self.added.append(path)
+        elif previous[0] != digest:
+            self.changed.append(path)
+        else:
+            self.unchanged.append(path)
+        return not self.is_current(path, digest)
+
+    def keep_previous(self, prefix: str, digest: str, stage: str) -> list:
+        """
+        Record the outputs of the last run that start with a prefix and were created from the same source again,
+        for sources whose output names are only known once the output is created (e.g. the subsounds of a clip).
+        """
+        paths = [path for path, (previous, _) in self.previous.items() if path.startswith(prefix) and previous == digest]
+        for path in paths:
+            self.record(path, digest, stage)
+        return paths
+
+    def remove_stale(self) -> list:
+        """
+        Delete all outputs of the stages that ran this time which were not created again.
+        The output folder is the staging copy of the last output (see OutputWriter), so they are deleted in every mode.
+        """
+        removed = []
+        for path, (_, stage) in self.previous.items():
+            if stage not in self.stages or path in self.outputs:
+                continue
+            removed.append(path)
+            if exists(join(self.output_path, path)):
+                remove(join(self.output_path, path))
+        return removed
+
+    def save(self) -> None:
+        """ Remove stale outputs, log a summary of all output changes and write the manifest """
+        removed = self.remove_stale()
+        # keep the outputs of stages that did not run this time
+        outputs = {path: value for path, value in self.previous.items() if value[1] not in self.stages}
+        outputs.update(self.outputs)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(outputs, file, separators=(",", ":"), sort_keys=True)
+        replace(temp_path, self.path)
+        logger.info(f"Outputs: {len(self.added)} added, {len(self.changed)} changed, {len(removed)} removed, "
+                    f"{len(self.unchanged)} unchanged")
+        for path in self.changed:
+            logger.info(f"Changed: {path}")
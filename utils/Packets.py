@@ -0,0 +1,253 @@
+import hashlib
+import json
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from assets.Enums import PacketTypes, AppEngineTypes, OtherTypes
+from utils.ArrayFile import map_arrays, pack_arrays
+from utils.Logger import Logger
+
+logger = Logger()
+
+# the magic bytes and version at the start of a binary packet catalogue
+CATALOGUE_MAGIC = b"PKCT"
+CATALOGUE_VERSION = 1
+# the categories of the catalogue in the order they are stored, registered categories are appended
+CATEGORIES = [*PacketTypes, *AppEngineTypes, *OtherTypes]
+# the average number of names per bucket of the perfect hash table
+BUCKET_SIZE = 4
+# the number of step factors tried for a bucket before the names are considered impossible to place
+MAX_STEP_FACTOR = 64
+# the number of times the table grows to the next prime when its names cannot be placed
+MAX_TABLE_GROWTH = 16
+
+# the arrays of a binary packet catalogue as (name, dtype, columns)
+ARRAYS = [
+    ("strings", "u1", 1),  # the utf8 names and namespaces of every entry
+    ("category_names", "u1", 1),  # the utf8 category names, each terminated by a null byte
+    ("entry_category", "u1", 1), ("entry_id", "<u4", 1), ("entry_path_id", "<i8", 1),
+    # the (offset, length) of the name and namespace of every entry in 'strings'
+    ("entry_name", "<i8", 2), ("entry_namespace", "<i8", 2),
+    # entries with the same name are stored consecutively, name_count holds their number at the first entry
+    ("name_count", "<i4", 1),
+    # a perfect hash table of all names: the displacement of every bucket and the first entry of every slot
+    ("hash_buckets", "<u4", 1), ("hash_slots", "<i4", 1)
+]
+
+
+class PacketEntry(NamedTuple):
+    """ A classified MonoScript in the packet catalogue """
+    id: int  # the same in every build as long as the name and category do not change
+    name: str
+    category: str
+    namespace: str
+    path_id: int
+
+
+def get_category_name(category) -> str:
+    """ Return the name of a category, the value of an Enum member """
+    return str(getattr(category, "value", category))
+
+
+def get_packet_id(category: str, name: str) -> int:
+    """ Return the stable 32 bit id of a catalogue entry, derived from its category and name """
+    return int.from_bytes(hashlib.blake2b(f"{category}.{name}".encode("utf8"), digest_size=4).digest(), "little")
+
+
+def get_name_hash(name: str) -> tuple:
+    """ Return the (bucket, first slot, step) hashes of a name used by the perfect hash table """
+    digest = hashlib.blake2b(name.encode("utf8"), digest_size=12).digest()
+    return (int.from_bytes(digest[:4], "little"), int.from_bytes(digest[4:8], "little"),
+            int.from_bytes(digest[8:], "little"))
+
+
+def get_table_size(count: int, minimum: int = 2) -> int:
+    """ Return the smallest prime of at least the minimum with at least 10% free slots for a number of names """
+    size = max(count + count // 10, minimum)
+    while any(size % divisor == 0 for divisor in range(2, int(size ** 0.5) + 1)):
+        size += 1
+    return size
+
+
+def get_slot(hashes: tuple, displacement: int, size: int) -> int:
+    """ Return the slot of a name in a perfect hash table for the displacement of its bucket """
+    # the displacement packs a step factor and an offset: the factor spreads the names of a bucket differently,
+    # the offset moves all of them together, so every free arrangement of the slots is tried
+    factor, offset = divmod(displacement, size)
+    return (hashes[1] + factor * (hashes[2] % (size - 1) + 1) + offset) % size
+
+
+def place_buckets(hashes: list, buckets: list, size: int) -> Optional[tuple]:
+    """ Return the (displacements, slots) of the buckets in a table of a size or None if a bucket does not fit """
+    displacements, slots = [0] * len(buckets), [-1] * size
+    for bucket in sorted(range(len(buckets)), key=lambda b: len(buckets[b]), reverse=True):
+        members = buckets[bucket]
+        if not members:
+            break
+        for displacement in range(size * MAX_STEP_FACTOR):
+            positions = [get_slot(hashes[i], displacement, size) for i in members]
+            if len(set(positions)) == len(positions) and all(slots[position] < 0 for position in positions):
+                break
+        else:
+            return None
+        displacements[bucket] = displacement
+        for i, position in zip(members, positions):
+            slots[position] = i
+    return displacements, slots
+
+
+def build_perfect_hash(names: list) -> tuple:
+    """
+    Return the (displacements, slots) of a perfect hash table of unique names (hash and displace).
+    Names are hashed into buckets, the largest buckets are placed first with the first displacement
+    that moves all of their names to free slots. A lookup only needs two hashes and no probing.
+    """
+    hashes = [get_name_hash(name) for name in names]
+    buckets = [[] for _ in range(max(len(names) // BUCKET_SIZE, 1))]
+    for i, name_hashes in enumerate(hashes):
+        buckets[name_hashes[0] % len(buckets)].append(i)
+    size = get_table_size(len(names))
+    for _ in range(MAX_TABLE_GROWTH):
+        placed = place_buckets(hashes, buckets, size)
+        if placed is not None:
+            return placed
+        # names of a bucket whose hashes are equal modulo the size never separate, they do in a larger table
+        size = get_table_size(len(names), size + 1)
+    raise ValueError(f"Could not place {len(names)} names in a perfect hash table of {size} slots")
+
+
+def get_entries(classified: dict) -> list[PacketEntry]:
+    """ Return the catalogue entries of the classified MonoScripts by category, ordered by name and category """
+    categories = CATEGORIES + [category for category in classified if category not in CATEGORIES]
+    entries = []
+    for order, category in enumerate(categories):
+        name = get_category_name(category)
+        entries += [(script.name, order, PacketEntry(get_packet_id(name, script.name), script.name, name,
+                                                     script.namespace, script.path_id))
+                    for script in classified.get(category, [])]
+    entries.sort(key=lambda entry: entry[:2])
+    ids = {}
+    for _, _, entry in entries:
+        if ids.setdefault(entry.id, entry) is not entry:
+            logger.warning(f"The packet ids of '{entry.name}' and '{ids[entry.id].name}' are the same")
+    return [entry for _, _, entry in entries]
+
+
+def get_catalogue_json(entries: list) -> str:
+    """ Return the JSON packet catalogue of a list of PacketEntry """
+    catalogue = {"version": CATALOGUE_VERSION, "categories": {}}
+    for entry in sorted(entries, key=lambda entry: entry.name):
+        catalogue["categories"].setdefault(entry.category, []).append(
+            {"id": entry.id, "name": entry.name, "namespace": entry.namespace, "path_id": entry.path_id})
+    return json.dumps(catalogue, indent=2) + "\n"
+
+
+class PacketCatalogue:
+    """
+    A compact lookup table of every classified MonoScript (packets, AppEngine messages, effects and more).
+    Names are found through a perfect hash table, so a memory-mapped file answers a lookup with two hashes.
+    """
+
+    def __init__(self, arrays: dict, buffer=None):
+        """
+        :param arrays: The arrays of the catalogue by name (see ARRAYS).
+        :param buffer: The memory map the arrays are views of, kept open as long as the catalogue is used.
+        """
+        self.arrays = arrays
+        self._buffer = buffer
+        self.categories = bytes(arrays["category_names"]).decode("utf8").split("\0")[:-1]
+        # lookups compare and decode slices of the strings without creating numpy scalars
+        self._strings = memoryview(arrays["strings"])
+
+    @classmethod
+    def from_entries(cls, entries: list) -> "PacketCatalogue":
+        """ Build the catalogue from a list of PacketEntry ordered by name (see get_entries) """
+        categories = list(dict.fromkeys(entry.category for entry in entries))
+        strings, spans = bytearray(), {"entry_name": [], "entry_namespace": []}
+        for entry in entries:
+            for name, value in (("entry_name", entry.name), ("entry_namespace", entry.namespace)):
+                raw = value.encode("utf8")
+                spans[name].append((len(strings), len(raw)))
+                strings += raw
+        names, first_rows, counts = [], [], np.zeros(len(entries), np.int32)
+        for row, entry in enumerate(entries):
+            if not names or names[-1] != entry.name:
+                names.append(entry.name)
+                first_rows.append(row)
+            counts[first_rows[-1]] += 1
+        displacements, slots = build_perfect_hash(names)
+        arrays = {
+            "strings": np.frombuffer(bytes(strings), np.uint8),
+            "category_names": np.frombuffer("".join(f"{name}\0" for name in categories).encode("utf8"), np.uint8),
+            "entry_category": np.array([categories.index(entry.category) for entry in entries], np.uint8),
+            "entry_id": np.array([entry.id for entry in entries], np.uint32),
+            "entry_path_id": np.array([entry.path_id for entry in entries], np.int64),
+            "name_count": counts,
+            "hash_buckets": np.array(displacements, np.uint32),
+            "hash_slots": np.array([-1 if i < 0 else first_rows[i] for i in slots], np.int32)
+        }
+        for name, values in spans.items():
+            arrays[name] = np.array(values, np.int64).reshape(-1, 2)
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "PacketCatalogue":
+        """ Memory-map a binary packet catalogue, the entries are read from the file on access """
+        arrays, buffer = map_arrays(path, CATALOGUE_MAGIC, CATALOGUE_VERSION)
+        return cls(arrays, buffer)
+
+    def to_bytes(self) -> bytes:
+        """ Return the binary file content of the catalogue """
+        return pack_arrays(CATALOGUE_MAGIC, CATALOGUE_VERSION, self.arrays, ARRAYS)
+
+    def save(self, path: str) -> None:
+        """ Write the catalogue to a binary file """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    def close(self) -> None:
+        """ Close the memory map of a loaded catalogue, its arrays can not be used afterwards """
+        self.arrays = {}
+        # the map can only be closed once no view of it is left
+        if self._strings is not None:
+            self._strings.release()
+            self._strings = None
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def __len__(self) -> int:
+        return len(self.arrays["entry_id"])
+
+    def get_string(self, name: str, row: int) -> str:
+        """ Return a string column of an entry """
+        offset, length = self.arrays[name][row].tolist()
+        return str(self._strings[offset:offset + length], "utf8")
+
+    def entry(self, row: int) -> PacketEntry:
+        """ Return the entry of a row """
+        return PacketEntry(self.arrays["entry_id"].item(row), self.get_string("entry_name", row),
+                           self.categories[self.arrays["entry_category"].item(row)],
+                           self.get_string("entry_namespace", row), self.arrays["entry_path_id"].item(row))
+
+    def find(self, name: str, category: str = None) -> list[PacketEntry]:
+        """ Return all entries with a name, optionally only those of a category (e.g. 'IncomingPacket') """
+        displacements, slots = self.arrays["hash_buckets"], self.arrays["hash_slots"]
+        if len(slots) == 0:
+            return []
+        hashes = get_name_hash(name)
+        row = slots.item(get_slot(hashes, displacements.item(hashes[0] % len(displacements)), len(slots)))
+        # names that are not in the catalogue land on the slot of another name
+        if row < 0:
+            return []
+        offset, length = self.arrays["entry_name"][row].tolist()
+        if self._strings[offset:offset + length] != name.encode("utf8"):
+            return []
+        entries = [self.entry(i) for i in range(row, row + self.arrays["name_count"].item(row))]
+        return [entry for entry in entries if category is None or entry.category == category]
+
+    def get(self, name: str, category: str) -> Optional[PacketEntry]:
+        """ Return the entry of a name in a category or None if there is no such entry """
+        entries = self.find(name, category)
+        return entries[0] if entries else None
@@ -0,0 +1,158 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from utils.Files import get_memory_usage, get_peak_memory
+from utils.Logger import Logger
+
+logger = Logger()
+
+# the ways a single phase can be captured in detail
+CAPTURE_MODES = ["cprofile", "tracemalloc"]
+
+
+def get_cpu_times() -> tuple:
+    """ Return the CPU time of this process and of its finished child processes in seconds """
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+
+class PhaseStats:
+    """ The accumulated measurements of every run of a named phase """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        # the CPU time of worker processes, only counted once a process pool was shut down
+        self.worker_cpu_seconds = 0.0
+        self.rss_start = 0
+        self.rss_end = 0
+        self.peak_rss = 0
+        self.counters = {}
+
+    def to_dict(self) -> dict:
+        """ Return the JSON description of the phase """
+        return {
+            "calls": self.calls, "wall_seconds": round(self.wall_seconds, 6), "cpu_seconds": round(self.cpu_seconds, 6),
+            "worker_cpu_seconds": round(self.worker_cpu_seconds, 6), "rss_start": self.rss_start,
+            "rss_end": self.rss_end, "peak_rss": self.peak_rss, **self.counters
+        }
+
+
+class Profiler:
+    """ Records the wall and CPU time, memory and counters (objects, bytes read and written) of named phases """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """ Ensure the class is a singleton so every module records to the same phases """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.phases = {}
+            cls._instance.active = []
+            cls._instance.capture_phase = None
+            cls._instance.capture_mode = None
+            cls._instance.captured = None
+        return cls._instance
+
+    def set_capture(self, phase: str, mode: str = "cprofile") -> None:
+        """
+        Capture the first run of a phase in detail.
+        :param phase: The name of the phase, e.g. 'extract.texture2d'.
+        :param mode: 'cprofile' for a function profile or 'tracemalloc' for the allocations of the phase.
+        """
+        self.capture_phase, self.capture_mode = phase, mode
+
+    @contextmanager
+    def phase(self, name: str):
+        """ Measure a block of code as a phase, phases with the same name are accumulated """
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+        capture = self.start_capture() if name == self.capture_phase and self.captured is None else None
+        self.active.append(stats)
+        rss_start = get_memory_usage()
+        cpu_start, worker_cpu_start = get_cpu_times()
+        wall_start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.wall_seconds += time.perf_counter() - wall_start
+            cpu_end, worker_cpu_end = get_cpu_times()
+            stats.cpu_seconds += cpu_end - cpu_start
+            stats.worker_cpu_seconds += worker_cpu_end - worker_cpu_start
+            if stats.calls == 0:
+                stats.rss_start = rss_start
+            stats.calls += 1
+            stats.rss_end = get_memory_usage()
+            stats.peak_rss = max(stats.peak_rss, get_peak_memory())
+            self.active.pop()
+            if capture is not None:
+                self.stop_capture(capture)
+
+    def profile(self, name: str):
+        """ Return a decorator that measures every call of a function as a phase """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """ Add to a counter of every running phase, e.g. 'objects', 'bytes_read' or 'bytes_written' """
+        for stats in self.active:
+            stats.counters[counter] = stats.counters.get(counter, 0) + amount
+
+    def start_capture(self):
+        """ Start the detailed capture of a phase and return its state """
+        if self.capture_mode == "tracemalloc":
+            import tracemalloc
+            tracemalloc.start(25)
+            return tracemalloc
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop_capture(self, capture) -> None:
+        """ Stop the detailed capture of a phase and keep its result """
+        if self.capture_mode == "tracemalloc":
+            self.captured = capture.take_snapshot()
+            capture.stop()
+        else:
+            capture.disable()
+            self.captured = capture
+
+    def report(self) -> dict:
+        """ Return the machine-readable report of all phases in the order they first ran """
+        return {"phases": {name: stats.to_dict() for name, stats in self.phases.items()}}
+
+    def save(self, path: str) -> None:
+        """ Write the report as JSON and the detailed capture of a phase next to it """
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+        logger.info(f"Saved the profile report to '{path}'")
+        for name, stats in self.phases.items():
+            counters = ", ".join(f"{key} {value}" for key, value in stats.counters.items())
+            logger.info(f"{name}: {stats.wall_seconds:.3f}s wall, {stats.cpu_seconds:.3f}s CPU, "
+                        f"peak {stats.peak_rss / 2 ** 20:.0f} MB{', ' + counters if counters else ''}")
+        if self.captured is None:
+            if self.capture_phase is not None:
+                logger.warning(f"The phase '{self.capture_phase}' did not run and was not captured")
+            return
+        base_path = os.path.splitext(path)[0]
+        if self.capture_mode == "tracemalloc":
+            capture_path = f"{base_path}.{self.capture_phase}.tracemalloc.txt"
+            with open(capture_path, "w") as file:
+                for stat in self.captured.statistics("lineno")[:50]:
+                    file.write(f"{stat}\n")
+        else:
+            capture_path = f"{base_path}.{self.capture_phase}.prof"
+            self.captured.dump_stats(capture_path)
+        logger.info(f"Saved the {self.capture_mode} capture of '{self.capture_phase}' to '{capture_path}'")
@@ -1,189 +1,283 @@
-import UnityPy
-import pathlib
 from os import walk
-from os.path import join, exists
-from getpass import getuser
-from platform import system
-from sys import exit as exit_program
+from os.path import join, getsize
 
 from assets import AudioClip, BuildSettings, GameObject, TextAsset, Texture2D, SpriteAtlas, MonoScript, MonoBehaviour
+from assets.Enums import PacketTypes, OtherTypes
+from assets.Record import report_parse_failures
 
-from utils.Logger import Logger, get_input
+from utils.Logger import Logger
+from utils.Discovery import get_resource_path
+from utils.Index import AssetIndex
+from utils.Profiler import Profiler
+from utils.Scanner import ObjectSummary, has_class_ids, load_unity_file, read_class_ids, scan_files
 
 logger = Logger()
+profiler = Profiler()
 
-# the default path for the Exalt Unity resources on all default Windows installs
-PATH_WINDOWS = join("Documents", "RealmOfTheMadGod", "Production", "RotMG Exalt_Data")
-# the default path for the Exalt Unity resources on all default macOS installs
-PATH_MACOS = join("RealmOfTheMadGod", "Production", "RotMGExalt.app", "Contents", "Resources", "Data")
-
-
-def get_resource_path() -> str:
-    """ Attempt to automatically find the Exalt resource path based on OS and the current user """
-    operating_sys = system()
-    path = ""
-    if operating_sys == "Windows":
-        logger.info("Detected Windows operating system.")
-        path = pathlib.Path(join(pathlib.Path.home(), PATH_WINDOWS))
-    elif operating_sys == "Darwin":
-        logger.info("Detected MacOS operating system.")
-        path = join(pathlib.Path.home(), PATH_MACOS)
-    else:
-        logger.critical(f"Unsupported operating system '{operating_sys}'... only Windows and MacOS are supported")
-        print()  # line break
-        exit_program(1)
-
-    if not exists(path):
-        # ask the user to input the Exalt path manually as a fallback
-        path = pathlib.Path(get_path_input())
-        logger.success("Found valid Exalt resource path\n")
-    else:
-        logger.success(f"Found Exalt resource path: {path}")
-    return path
-
-
-def get_path_input() -> str:
-    """ Attempt to get a game resource path from console input or exit """
-    print()  # line break
-    logger.error("Could not find the Exalt resource path automatically... is Exalt installed?")
-
-    operating_sys = system()
-    if operating_sys == "Windows":
-        logger.error(f"The path is usually located here: C:\\Users\\{getuser()}\\{PATH_WINDOWS}\n")
-    elif operating_sys == "Darwin":
-        logger.error(f"The path is usually located here: /Users/{getuser()}/{PATH_MACOS}\n")
-
-    # loop asking for a path input until the user exits
-    path = ""
-    while path == "":
-        input_path = get_input("Enter your resource path manually or press the Enter key to exit")
-        print()  # line break
-        if input_path == "":
-            logger.success("Exiting...")
-            exit_program(0)
-        if exists(input_path):
-            if not exists(join(input_path, "resources.assets")):
-                logger.error(f"Invalid path - no 'resources.assets' file in directory: {input_path}")
-                print()  # line break
-            else:
-                path = input_path
-                break  # break if we get a valid directory
-        else:
-            logger.error(f"Invalid path - could not find directory: {input_path}")
-            print()  # line break
-    return path
+# all Unity asset types that are tracked by the Resources class
+ASSET_TYPES = (
+    "AudioClip", "BuildSettings", "GameObject", "MonoBehaviour",
+    "MonoScript", "SpriteAtlas", "TextAsset", "Texture2D"
+)
+
+# asset types that are read while parsing when no specific types are requested
+DEFAULT_ASSET_TYPES = {
+    "BuildSettings", "GameObject", "MonoBehaviour", "MonoScript", "SpriteAtlas", "TextAsset", "Texture2D"
+}
 
 
 class Resources:
     """ This class will automatically parse all Unity assets from the game directory files into classes """
 
-    def __init__(self, resource_path=None):
+    def __init__(self, resource_path=None, asset_types=None, jobs: int = None, index_path: str = None,
+                 scan_types=None):
         if resource_path is None:
             # try to find the Exalt resource path depending on the OS
             self.path = get_resource_path()
         else:
             self.path = resource_path
-        # walk through all files in the path and parse any Unity asset files
-        self.resource_files = self.parse_all_files()
+        # only these asset types are read while parsing, all others are read on first access
+        self.asset_types = DEFAULT_ASSET_TYPES if asset_types is None else set(asset_types)
+        # only files whose type table contains one of these asset types are scanned, no other file is ever read
+        self.scan_types = set(ASSET_TYPES) if scan_types is None else set(scan_types) | self.asset_types
+        # the number of worker processes used to scan the resource files
+        self.jobs = jobs
+        # unchanged files are served from the on-disk asset index instead of being scanned again
+        self.index = AssetIndex(index_path, self.path) if index_path is not None else None
+        # loaded Unity files by path, a file is only loaded once one of its objects is read
+        self.resource_files = {}
+        self._objects = {}
+        # the asset wrappers read their UnityPy objects again through this one bound method instead of keeping them
+        self._read_asset = self.read_asset
+        # walk through all files in the path and summarize the objects of any Unity asset files
+        self.file_summaries = self.parse_all_files()
         # initialize lists for all types of parsed assets
-        self.all_resources = {
-            "AudioClip": [], "BuildSettings": [], "GameObject": [], "MonoBehaviour": [],
-            "MonoScript": [], "SpriteAtlas": [], "TextAsset": [], "Texture2D": []
+        self.all_resources = {asset_type: [] for asset_type in ASSET_TYPES}
+        # object summaries of every asset type that was not requested, read on first access
+        self._deferred = {asset_type: [] for asset_type in ASSET_TYPES}
+        self._parsers = {
+            "AudioClip": self.parse_audioclip, "BuildSettings": self.parse_buildsettings,
+            "GameObject": self.parse_gameobject, "MonoBehaviour": self.parse_monobehaviour,
+            "MonoScript": self.parse_monoscript, "SpriteAtlas": self.parse_spriteatlas,
+            "TextAsset": self.parse_textasset, "Texture2D": self.parse_texture2d
         }
         # initialize lists of packet name types
         self._packets = {"incoming": [], "outgoing": [], "data": []}
         # initialize lists of other names
         self._effects, self._particles, self._map_objects = [], [], []
+        # the list each classified MonoScript category is collected in
+        self._monoscript_lists = {
+            PacketTypes.OUTGOING: self._packets["outgoing"], PacketTypes.INCOMING: self._packets["incoming"],
+            PacketTypes.DATA: self._packets["data"], OtherTypes.EFFECT: self._effects,
+            OtherTypes.PARTICLE: self._particles, OtherTypes.MAP_OBJECT: self._map_objects
+        }
+        # every classified MonoScript by category, the packet catalogue is built from these
+        self._classified = {}
         self._spritesheet = None
         self._manifest_json, self._manifest_xml = None, None
         # parse all assets
         self.parse_all_resources()
 
+    @profiler.profile("scan")
     def parse_all_files(self) -> list:
-        """ Returns a list of all parsed resource files from the game directory """
+        """ Returns the object summaries of all resource files from the game directory, scanned in parallel """
         all_files = []
         for root, _, files in walk(self.path):
             for file_name in files:
-                all_files.append(UnityPy.load(join(root, file_name)))
-        return all_files
+                all_files.append(join(root, file_name))
+        candidates = self.prescan_files(all_files)
+        # look up all unchanged files in the asset index and only scan the others
+        summaries = {}
+        if self.index is not None:
+            for path in candidates:
+                summary = self.index.lookup(path, self.scan_types)
+                if summary is not None:
+                    summaries[path] = summary
+        scan_paths = [path for path in candidates if path not in summaries]
+        # only the asset types of the selected stages are summarized, e.g. no Texture2D is read for the packets
+        # the whole files are only hashed for the asset index
+        for summary in scan_files(scan_paths, self.scan_types, self.jobs, self.index is not None):
+            summaries[summary.path] = summary
+            profiler.count("bytes_read", summary.size)
+            profiler.count("objects", len(summary.objects))
+            if self.index is not None:
+                self.index.update(summary, self.scan_types)
+        if self.index is not None:
+            self.index.prune(all_files)
+            self.index.save()
+        profiler.count("files_scanned", len(scan_paths))
+        logger.info(f"Scanned {len(scan_paths)} files ({len(candidates) - len(scan_paths)} unchanged files loaded from the asset index)")
+        return [summaries[path] for path in candidates]
+
+    @profiler.profile("prescan")
+    def prescan_files(self, paths: list) -> list:
+        """
+        Return the files that may contain any of the scanned asset types.
+        Only the header and type table of each file are read (see read_class_ids), their class ids are cached in
+        the asset index. Files such as .resS streams, plugins and files without any needed type are skipped.
+        """
+        candidates = []
+        for path in paths:
+            found, class_ids = self.index.lookup_class_ids(path) if self.index is not None else (False, None)
+            if not found:
+                class_ids = read_class_ids(path)
+                if self.index is not None:
+                    self.index.update_class_ids(path, class_ids)
+            if has_class_ids(class_ids, self.scan_types):
+                candidates.append(path)
+        profiler.count("files", len(paths))
+        profiler.count("files_skipped", len(paths) - len(candidates))
+        logger.info(f"Pre-scanned {len(paths)} files, {len(candidates)} may contain {', '.join(sorted(self.scan_types))} assets")
+        return candidates
 
     def parse_all_resources(self) -> None:
-        """ Iterate over each resource file and return certain types of objects """
-        res_count = 0
-        for res in self.resource_files:
-            for obj in res.objects:
-                if obj.type.name == "AudioClip":
-                    # self.parse_audioclip(obj)
-                    pass
-                elif obj.type.name == "BuildSettings":
-                    self.parse_buildsettings(obj)
-                elif obj.type.name == "GameObject":
-                    self.parse_gameobject(obj)
-                elif obj.type.name == "TextAsset":
-                    self.parse_textasset(obj)
-                elif obj.type.name == "SpriteAtlas":
-                    self.parse_spriteatlas(obj)
-                elif obj.type.name == "MonoScript":
-                    self.parse_monoscript(obj)
-                elif obj.type.name == "Texture2D":
-                    self.parse_texture2d(obj)
-                elif obj.type.name == "MonoBehaviour":
-                    self.parse_monobehaviour(obj)
-                else:
-                    continue
-                res_count += 1
+        """ Iterate over each resource file summary and read the requested types of objects """
+        requested = {asset_type: [] for asset_type in ASSET_TYPES}
+        for summary in self.file_summaries:
+            for entry in summary.objects:
+                # keep the compact summary of every other type and read the object on first access
+                (requested if entry.type in self.asset_types else self._deferred)[entry.type].append(entry)
+        for asset_type, entries in requested.items():
+            if entries:
+                with profiler.phase(f"parse.{asset_type}"):
+                    for entry in entries:
+                        self.parse_entry(entry)
+                    profiler.count("objects", len(entries))
+        res_count = sum(len(entries) for entries in requested.values())
+        deferred_count = sum(len(entries) for entries in self._deferred.values())
+        report_parse_failures()
         # sort all parsed objects A-Z
+        self.sort_names()
+        logger.success(f"Parsed {res_count} total assets! ({deferred_count} more will be read on demand)")
+
+    def parse_entry(self, entry: ObjectSummary) -> None:
+        """ Parse the asset of an object summary, using the indexed payloads instead of Unity files if possible """
+        if entry.extra is not None and entry.type == "MonoScript":
+            self.add_monoscript(MonoScript.from_summary(entry, self._read_asset))
+        elif entry.extra is not None and entry.type == "Texture2D":
+            self.all_resources["Texture2D"].append(Texture2D.from_summary(entry, self._read_asset))
+        else:
+            self._parsers[entry.type](self.read_object(entry), entry)
+
+    def load_file(self, path: str):
+        """ Return the loaded Unity file at a path, memory-mapping it on first use (see load_unity_file) """
+        env = self.resource_files.get(path)
+        if env is None:
+            env = load_unity_file(path)
+            profiler.count("files_loaded")
+            profiler.count("bytes_read", getsize(path))
+            self.resource_files[path] = env
+            self._objects[path] = {(obj.path_id, obj.byte_start): obj for obj in env.objects}
+        return env
+
+    def read_object(self, entry: ObjectSummary):
+        """ Return the UnityPy object reader for an object summary """
+        self.load_file(entry.file)
+        return self._objects[entry.file][(entry.path_id, entry.byte_start)]
+
+    def read_asset(self, entry: ObjectSummary):
+        """ Return the fully read UnityPy object of an object summary """
+        return self.read_object(entry).read()
+
+    def release_file(self, path: str) -> None:
+        """ Drop a loaded Unity file so its memory can be freed, the file is unmapped once no asset uses its data """
+        self.resource_files.pop(path, None)
+        self._objects.pop(path, None)
+
+    def stream_assets(self, asset_types: set, limit_memory=None):
+        """
+        Read the deferred objects of the given asset types file by file and yield (path, assets by type).
+        Each Unity file is released once its assets were consumed, so only one file is held in memory at a time.
+        :param asset_types: The asset types to stream, these are no longer read on first access afterwards.
+        :param limit_memory: A callable run after each file was released, before the next file is loaded.
+        """
+        streamed = {asset_type: self._deferred[asset_type] for asset_type in asset_types}
+        for asset_type in asset_types:
+            self._deferred[asset_type] = []
+        entries_by_file = {}
+        for entries in streamed.values():
+            for entry in entries:
+                entries_by_file.setdefault(entry.file, []).append(entry)
+        tracked_resources = self.all_resources
+        for path, entries in entries_by_file.items():
+            # collect the parsed assets of this file only instead of tracking them for the whole run
+            self.all_resources = {asset_type: [] for asset_type in ASSET_TYPES}
+            for entry in entries:
+                self.parse_entry(entry)
+            profiler.count("objects", len(entries))
+            batch = self.all_resources
+            self.all_resources = tracked_resources
+            yield path, batch
+            # the classified MonoScripts are kept for their names, they must not keep the file alive
+            for script in batch["MonoScript"]:
+                script.release_data()
+            del batch
+            self.release_file(path)
+            if limit_memory is not None:
+                limit_memory()
+        report_parse_failures()
+        self.sort_names()
+
+    def read_deferred(self, asset_type: str) -> list:
+        """ Read all deferred objects of an asset type and return every parsed asset of that type """
+        deferred = self._deferred[asset_type]
+        if deferred:
+            self._deferred[asset_type] = []
+            with profiler.phase(f"read.{asset_type}"):
+                for entry in deferred:
+                    self.parse_entry(entry)
+                profiler.count("objects", len(deferred))
+            report_parse_failures()
+            if asset_type == "MonoScript":
+                self.sort_names()
+        return self.all_resources[asset_type]
+
+    def sort_names(self) -> None:
+        """ Sort all parsed MonoScript names A-Z """
         # self._packets["outgoing"].sort(), self._packets["incoming"].sort(), self._packets["data"].sort()
         self._effects.sort(), self._particles.sort(), self._map_objects.sort()
-        logger.success(f"Parsed {res_count} total assets!")
 
-    def parse_audioclip(self, obj) -> None:
+    def parse_audioclip(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a AudioClip asset object and append to the tracked assets """
-        asset = AudioClip(obj.read())
+        asset = AudioClip(obj.read(), entry, self._read_asset)
         self.all_resources["AudioClip"].append(asset)
 
-    def parse_buildsettings(self, obj) -> None:
+    def parse_buildsettings(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a BuildSettings asset object and append to the tracked assets """
-        asset = BuildSettings(obj.read())
+        asset = BuildSettings(obj.read(), entry, self._read_asset)
         self.all_resources["BuildSettings"].append(asset)
 
-    def parse_gameobject(self, obj) -> None:
+    def parse_gameobject(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a GameObject asset object and append to the tracked assets """
-        asset = GameObject(obj.read())
+        asset = GameObject(obj.read(), entry, self._read_asset)
         self.all_resources["GameObject"].append(asset)
 
-    def parse_monobehaviour(self, obj) -> None:
+    def parse_monobehaviour(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a MonoBehaviour asset object and append to the tracked assets """
-        asset = MonoBehaviour(obj.read())
+        asset = MonoBehaviour(obj.read(), entry, self._read_asset)
         self.all_resources["MonoBehaviour"].append(asset)
 
-    def parse_monoscript(self, obj) -> None:
+    def parse_monoscript(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a MonoScript asset object and append to the tracked assets """
-        asset = MonoScript(obj.read())
-        # _packets
-        if asset.packet_outgoing:
-            self._packets["outgoing"].append(asset)
-        elif asset.packet_incoming:
-            self._packets["incoming"].append(asset)
-        elif asset.packet_data:
-            self._packets["data"].append(asset)
-        # misc types
-        elif asset.effect:
-            self._effects.append(asset.name)
-        elif asset.particle:
-            self._particles.append(asset.name)
-        elif asset.map_object:
-            self._map_objects.append(asset.name)
+        self.add_monoscript(MonoScript(obj.read(), entry, self._read_asset))
+
+    def add_monoscript(self, asset: MonoScript) -> None:
+        """ Sort a parsed MonoScript into the packet and name lists and append to the tracked assets """
+        names = self._monoscript_lists.get(asset.object_type)
+        if names is not None:
+            names.append(asset if isinstance(asset.object_type, PacketTypes) else asset.name)
+        if asset.object_type is not None:
+            self._classified.setdefault(asset.object_type, []).append(asset)
         self.all_resources["MonoScript"].append(asset)
 
-    def parse_spriteatlas(self, obj) -> None:
+    def parse_spriteatlas(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a SpriteAtlas asset object and append to the tracked assets """
-        asset = SpriteAtlas(obj.read())
+        asset = SpriteAtlas(obj.read(), entry, self._read_asset)
         self.all_resources["SpriteAtlas"].append(asset)
 
-    def parse_textasset(self, obj) -> None:
+    def parse_textasset(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a TextAsset asset object and append to the tracked assets """
-        asset = TextAsset(obj.read())
+        asset = TextAsset(obj.read(), entry, self._read_asset)
         if asset.spritesheet:
             self._spritesheet = asset.file_data
         if asset.manifest_json:
@@ -192,77 +286,95 @@ class Resources:
             self._manifest_xml = asset.file_data
         self.all_resources["TextAsset"].append(asset)
 
-    def parse_texture2d(self, obj) -> None:
+    def parse_texture2d(self, obj, entry: ObjectSummary = None) -> None:
         """ Read a Texture2D asset object and append to the tracked assets """
-        asset = Texture2D(obj.read())
+        asset = Texture2D(obj.read(), entry, self._read_asset)
         self.all_resources["Texture2D"].append(asset)
 
     @property
     def spritesheet(self) -> bytes:
         """ Return the 'spritesheet.json' file data"""
+        self.read_deferred("TextAsset")
         return self._spritesheet
 
     @property
     def manifest_json(self) -> bytes:
         """ Return the JSON asset manifest file data """
+        self.read_deferred("TextAsset")
         return self._manifest_json
 
     @property
     def manifest_xml(self) -> bytes:
         """ Return the XML asset manifest file data """
+        self.read_deferred("TextAsset")
         return self._manifest_xml
 
+    @property
+    def packets(self) -> dict:
+        """ Return the incoming, outgoing and data object packet MonoScripts """
+        self.read_deferred("MonoScript")
+        return self._packets
+
+    @property
+    def classified(self) -> dict:
+        """ Return every classified MonoScript grouped by its category (see assets.Namespaces) """
+        self.read_deferred("MonoScript")
+        return self._classified
+
     @property
     def effects(self) -> list:
         """ Return a list of all effect names """
+        self.read_deferred("MonoScript")
         return self._effects
 
     @property
     def particles(self) -> list:
         """ Return a list of all particle names """
+        self.read_deferred("MonoScript")
         return self._particles
 
     @property
     def map_objects(self) -> list:
         """ Return a list of all map object names """
+        self.read_deferred("MonoScript")
         return self._map_objects
 
     @property
     def audioclips(self) -> list[AudioClip]:
         """ Returns all parsed AudioClip assets """
-        return self.all_resources["AudioClip"]
+        return self.read_deferred("AudioClip")
 
     @property
     def buildsettings(self) -> list[BuildSettings]:
         """ Returns all parsed BuildSettings assets """
-        return self.all_resources["BuildSettings"]
+        return self.read_deferred("BuildSettings")
 
     @property
     def gameobjects(self) -> list[GameObject]:
         """ Returns all parsed GameObject assets """
-        return self.all_resources["GameObject"]
+        return self.read_deferred("GameObject")
 
     @property
     def textassets(self) -> list[TextAsset]:
         """ Returns all parsed TextAsset assets """
-        return self.all_resources["TextAsset"]
+        return self.read_deferred("TextAsset")
 
     @property
     def texture2ds(self) -> list[Texture2D]:
         """ Returns all parsed Texture2D assets """
-        return self.all_resources["Texture2D"]
+        return self.read_deferred("Texture2D")
 
     @property
     def spriteatlases(self) -> list[SpriteAtlas]:
         """ Returns all parsed SpriteAtlas assets """
-        return self.all_resources["SpriteAtlas"]
+        return self.read_deferred("SpriteAtlas")
 
     @property
     def monoscripts(self) -> list[MonoScript]:
         """ Returns all parsed MonoScript assets """
-        return self.all_resources["MonoScript"]
+        return self.read_deferred("MonoScript")
 
     @property
     def monobehaviours(self) -> list[MonoBehaviour]:
         """ Returns all parsed MonoBehaviour assets """
-        return self.all_resources["MonoBehaviour"]
+        return self.read_deferred("MonoBehaviour")
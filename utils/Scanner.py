@@ -0,0 +1,266 @@
+import hashlib
+import ntpath
+import struct
+from os import stat
+from os.path import dirname, exists, isfile, join, splitext
+from itertools import repeat
+from typing import NamedTuple, Optional, TYPE_CHECKING
+
+from utils.Files import get_process_pool, get_worker_count, map_file
+from utils.Logger import Logger
+
+if TYPE_CHECKING:
+    import UnityPy
+
+logger = Logger()
+
+# asset types whose serialized data starts with the object name
+NAMED_TYPES = {"AudioClip", "MonoScript", "SpriteAtlas", "TextAsset", "Texture2D"}
+# the Unity class id of every tracked asset type
+CLASS_IDS = {
+    "GameObject": 1, "Texture2D": 28, "TextAsset": 49, "AudioClip": 83, "MonoBehaviour": 114, "MonoScript": 115,
+    "BuildSettings": 141, "SpriteAtlas": 687078895
+}
+# the signatures of asset bundles, their type tables are compressed and can not be read without loading them
+BUNDLE_SIGNATURES = (b"UnityFS", b"UnityWeb", b"UnityRaw", b"UnityArchive")
+# the serialized file format versions whose type table can be pre-scanned
+MIN_HEADER_VERSION, MAX_HEADER_VERSION = 9, 50
+
+
+class ObjectSummary(NamedTuple):
+    """ A compact description of a single Unity object inside an asset file """
+    file: str
+    type: str
+    path_id: int
+    name: Optional[str]
+    byte_start: int
+    byte_size: int
+    extra: Optional[dict] = None
+    digest: str = ""
+
+
+class FileSummary(NamedTuple):
+    """ All object summaries of the requested asset types found in a single asset file """
+    path: str
+    objects: list
+    size: int = 0
+    mtime: float = 0.0
+    digest: str = ""
+    # False if the file or one of its objects could not be read, the asset index does not store such a summary
+    complete: bool = True
+
+
+def get_digest(data: bytes) -> str:
+    """ Return the hex digest of an object's raw bytes """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def get_file_digest(path: str) -> str:
+    """ Return the hex digest of a file's content """
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def peek_name(obj) -> Optional[str]:
+    """ Read only the name of a named Unity object without parsing the rest of it """
+    if obj.type.name not in NAMED_TYPES:
+        return None
+    obj.reset()
+    return obj.reader.read_aligned_string()
+
+
+def read_extra(obj) -> Optional[dict]:
+    """ Read the small payloads of an object that can be used without loading the asset file again """
+    asset_type = obj.type.name
+    if asset_type == "MonoScript":
+        asset = obj.read()
+        return {"class_name": asset.m_ClassName, "namespace": asset.m_Namespace}
+    if asset_type == "Texture2D":
+        asset = obj.read()
+        # streamed pixel data is not part of the raw object bytes, so it is hashed separately
+        return {"width": asset.m_Width, "height": asset.m_Height, "format": asset.m_TextureFormat.value,
+                "size": asset.m_CompleteImageSize, "image_count": asset.m_ImageCount,
+                "image_digest": get_digest(asset.image_data)}
+    return None
+
+
+class HeaderReader:
+    """ Reads the start of a file in growing chunks, so only the bytes up to the type table are read """
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self.file = file
+        self.data = file.read(chunk_size)
+        self.position = 0
+        self.endian = "<"
+
+    def read(self, size: int) -> bytes:
+        if size < 0:
+            raise ValueError("Invalid size in the serialized file header")
+        end = self.position + size
+        while end > len(self.data):
+            chunk = self.file.read(max(len(self.data), end - len(self.data)))
+            if not chunk:
+                raise EOFError("Unexpected end of the serialized file header")
+            self.data += chunk
+        data = self.data[self.position:end]
+        self.position = end
+        return data
+
+    def unpack(self, fmt: str):
+        values = struct.unpack(self.endian + fmt, self.read(struct.calcsize(self.endian + fmt)))
+        return values[0] if len(values) == 1 else values
+
+    def read_string(self) -> bytes:
+        while self.data.find(b"\0", self.position) < 0:
+            chunk = self.file.read(len(self.data))
+            if not chunk:
+                raise EOFError("Unexpected end of the serialized file header")
+            self.data += chunk
+        end = self.data.index(b"\0", self.position)
+        value = self.data[self.position:end]
+        self.position = end + 1
+        return value
+
+
+def read_class_ids(path: str) -> Optional[list]:
+    """
+    Return the sorted class ids in the type table of a Unity serialized file without loading the file.
+    Only the header and type table at the start of the file are read.
+    Files that are not serialized files have no class ids, None is returned for files that have to be loaded
+    to find their types (asset bundles and very old formats).
+    """
+    try:
+        with open(path, "rb") as file:
+            reader = HeaderReader(file)
+            if reader.data.startswith(BUNDLE_SIGNATURES):
+                return None
+            reader.endian = ">"
+            metadata_size, file_size, version, data_offset = reader.unpack("IIII")
+            if version < MIN_HEADER_VERSION:
+                # the metadata of these versions is stored at the end of the file
+                return None if 0 < version and file_size == stat(path).st_size else []
+            if version > MAX_HEADER_VERSION:
+                return []
+            endian = reader.unpack("?3x")
+            if version >= 22:
+                metadata_size, file_size, data_offset = reader.unpack("Iqq8x")
+            if file_size != stat(path).st_size or not 0 < metadata_size <= file_size or data_offset > file_size:
+                return []
+            reader.endian = ">" if endian else "<"
+            reader.read_string()  # the Unity version
+            reader.unpack("i")  # the target platform
+            if version < 12 and version != 10:
+                # the type trees of these versions are stored in the old recursive layout, the file has to be loaded
+                return None
+            # older versions always store the type trees
+            type_tree = reader.unpack("?") if version >= 13 else True
+            class_ids = set()
+            for _ in range(reader.unpack("i")):
+                class_id = reader.unpack("i")
+                if version >= 16:
+                    reader.read(1)  # is stripped
+                if version >= 17:
+                    reader.read(2)  # the script type index
+                if version >= 13:
+                    if (version < 16 and class_id < 0) or (version >= 16 and class_id == 114):
+                        reader.read(16)  # the script id
+                    reader.read(16)  # the old type hash
+                if type_tree:
+                    node_count, string_size = reader.unpack("ii")
+                    reader.read(node_count * (32 if version >= 19 else 24) + string_size)
+                    if version >= 21:
+                        reader.read(4 * reader.unpack("i"))  # the type dependencies
+                # scripted types of old formats have negative class ids
+                class_ids.add(CLASS_IDS["MonoBehaviour"] if class_id < 0 else class_id)
+            return sorted(class_ids)
+    except (OSError, EOFError, ValueError, struct.error, MemoryError):
+        return []
+
+
+def has_class_ids(class_ids: Optional[list], asset_types: set) -> bool:
+    """ Return True if a file with the given class ids (see read_class_ids) may contain any of the asset types """
+    return class_ids is None or any(CLASS_IDS[asset_type] in class_ids for asset_type in asset_types)
+
+
+def get_stream_paths(path: str) -> list:
+    """ Return the existing .resS and .resource files next to a serialized file, they hold its streamed data """
+    return [stream_path for stream_path in (f"{path}.resS", f"{splitext(path)[0]}.resource") if exists(stream_path)]
+
+
+def get_stream_source(asset, stream_path: str, offset: int, size: int) -> Optional[tuple]:
+    """
+    Return the (path, offset, size) of an object's streamed data on disk or None if it is not in a file on disk,
+    like the streams inside asset bundles. Worker processes map the file instead of being sent a copy of the data.
+    """
+    if not stream_path:
+        return None
+    path = join(asset.assets_file.environment.path, ntpath.basename(stream_path))
+    return (path, offset, size) if isfile(path) else None
+
+
+def load_unity_file(path: str) -> "UnityPy.Environment":
+    """
+    Load a Unity file and its streamed data files through memory maps instead of reading them into memory.
+    Object data, TextAsset scripts and streamed pixel and audio data are read as memoryview slices of the maps,
+    they are only copied where a decoder needs its own buffer.
+    """
+    # UnityPy is only imported by the stages that read Unity files, it takes most of the startup time
+    import UnityPy
+    env = UnityPy.Environment()
+    # dependencies that are not mapped here are loaded relative to the directory of the file
+    env.path = dirname(path)
+    for stream_path in get_stream_paths(path):
+        env.load_file(map_file(stream_path), name=stream_path, is_dependency=True)
+    env.load_file(map_file(path), name=path)
+    return env
+
+
+def scan_file(path: str, asset_types: set, digest: bool = True) -> FileSummary:
+    """
+    Load a single Unity asset file and summarize every object of the requested asset types
+    :param digest: Hash the whole file, its digest is only used by the asset index.
+    """
+    objects, failed = [], 0
+    try:
+        env = load_unity_file(path)
+        unity_objects = env.objects
+    except Exception as e:
+        logger.warning(f"Failed scanning asset file '{path}': {e}")
+        unity_objects = None
+    for obj in unity_objects or []:
+        asset_type = obj.type.name
+        if asset_type not in asset_types:
+            continue
+        # an object that can not be read (e.g. its .resS file is missing) is skipped, the others are still summarized
+        try:
+            objects.append(ObjectSummary(path, asset_type, obj.path_id, peek_name(obj), obj.byte_start,
+                                         obj.byte_size, read_extra(obj), get_digest(obj.get_raw_data())))
+        except Exception as e:
+            logger.debug(f"Failed scanning {asset_type} {obj.path_id} of asset file '{path}': {e}")
+            failed += 1
+    if failed:
+        logger.warning(f"Failed scanning {failed} objects of asset file '{path}', see the log file for the errors")
+    file_stat = stat(path)
+    file_digest = get_file_digest(path) if digest else ""
+    return FileSummary(path, objects, file_stat.st_size, file_stat.st_mtime, file_digest,
+                       unity_objects is not None and not failed)
+
+
+def scan_files(paths: list, asset_types: set, workers: int = None, digest: bool = True) -> list[FileSummary]:
+    """
+    Scan all asset files in worker processes and return their summaries in the order of the given paths.
+    Only the compact summaries are sent back, the loaded files are released by the workers.
+    :param paths: The paths of all files to scan.
+    :param asset_types: The asset types that are summarized.
+    :param workers: The number of worker processes (default: one per CPU core).
+    :param digest: Hash every whole file for the asset index.
+    """
+    workers = min(get_worker_count(workers), max(len(paths), 1))
+    if workers == 1:
+        return [scan_file(path, asset_types, digest) for path in paths]
+    with get_process_pool(workers) as pool:
+        chunk_size = max(len(paths) // (workers * 4), 1)
+        return list(pool.map(scan_file, paths, repeat(asset_types), repeat(digest), chunksize=chunk_size))
@@ -0,0 +1,176 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from utils.ArrayFile import map_arrays, pack_arrays
+from utils.Spritesheets import SpritesheetParser
+
+# the magic bytes and version at the start of a binary sprite index file
+INDEX_MAGIC = b"SPIX"
+INDEX_VERSION = 1
+
+# the arrays of an index as (name, dtype, columns)
+ARRAYS = [
+    ("sheet_names", "u1", 1),  # the utf8 sheet names, each terminated by a null byte
+    ("sprite_sheet", "<u2", 1), ("sprite_index", "<i4", 1), ("sprite_atlas", "u1", 1),
+    ("sprite_rect", "<i4", 4), ("sprite_mask", "<i4", 4),
+    # a direct-address table per sheet: sprite_slots[sprite_offset[sheet] + index] is the sprite row or -1
+    ("sprite_offset", "<i8", 1), ("sprite_length", "<i4", 1), ("sprite_slots", "<i4", 1),
+    ("frame_sheet", "<u2", 1), ("frame_index", "<i4", 1), ("frame_direction", "<i4", 1),
+    ("frame_action", "<i4", 1), ("frame_set", "<i4", 1), ("frame_atlas", "u1", 1),
+    ("frame_rect", "<i4", 4), ("frame_mask", "<i4", 4),
+    # the frames of an object are stored consecutively, frame_slots holds the first row of every object or -1
+    ("frame_offset", "<i8", 1), ("frame_length", "<i4", 1), ("frame_slots", "<i4", 1), ("frame_count", "<i4", 1)
+]
+
+
+class Sprite(NamedTuple):
+    """ A sprite of a sheet in 'spritesheet.json' """
+    sheet: str
+    index: int
+    atlas_id: int
+    rect: tuple  # x, y, width, height
+    mask: tuple  # the rect in the mask atlas, empty if the sprite has no mask
+
+
+class AnimationFrame(NamedTuple):
+    """ A single frame of an animated object in 'spritesheet.json' """
+    sheet: str
+    index: int
+    direction: int
+    action: int
+    set: int
+    atlas_id: int
+    rect: tuple
+    mask: tuple
+
+
+def get_slots(sheets: np.ndarray, indices: np.ndarray, sheet_count: int) -> tuple:
+    """ Return the (offsets, lengths, slots) direct-address tables mapping sheet and index to the first row """
+    lengths = np.zeros(sheet_count, np.int32)
+    rows = np.flatnonzero(indices >= 0)
+    np.maximum.at(lengths, sheets[rows], indices[rows] + 1)
+    offsets = np.zeros(sheet_count, np.int64)
+    offsets[1:] = np.cumsum(lengths)[:-1]
+    slots = np.full(int(lengths.sum()), -1, np.int32)
+    # assign backwards so the first row of every sheet and index is the one that is kept
+    rows = rows[::-1]
+    slots[offsets[sheets[rows]] + indices[rows]] = rows
+    return offsets, lengths, slots
+
+
+class SpriteIndex:
+    """
+    A compact index of every sprite and animation frame of 'spritesheet.json'.
+    All sprites are stored as columns of arrays, which can be saved to and memory-mapped from a binary file.
+    """
+
+    def __init__(self, arrays: dict, buffer=None):
+        """
+        :param arrays: The arrays of the index by name (see ARRAYS).
+        :param buffer: The memory map the arrays are views of, kept open as long as the index is used.
+        """
+        self.arrays = arrays
+        self._buffer = buffer
+        self.sheet_names = bytes(arrays["sheet_names"]).decode("utf8").split("\0")[:-1]
+        self.sheet_ids = {name: i for i, name in enumerate(self.sheet_names)}
+
+    @classmethod
+    def from_parser(cls, parser: SpritesheetParser) -> "SpriteIndex":
+        """ Build the index from a parsed 'spritesheet.json' """
+        sheet_ids = {name: i for i, name in enumerate(parser.get_sheet_names())}
+        sprites = [(sheet_ids[sheet.name], position if element.index is None else element.index,
+                    sheet.atlas_id if element.atlas_id is None else element.atlas_id, element.rect, element.mask)
+                   for sheet in parser.get_spritesheets() for position, element in enumerate(sheet.elements)]
+        frames = [(sheet_ids[frame.sheet_name], frame.index, frame.direction, frame.action, frame.set,
+                   frame.element.atlas_id or 0, frame.element.rect, frame.element.mask)
+                  for frames in parser.animated_spritesheets.values() for frame in frames]
+        # the frames of an object are stored next to each other, ordered by their set, direction and action
+        frames.sort(key=lambda frame: (frame[0], frame[1], frame[4], frame[2], frame[3]))
+        arrays = {"sheet_names": np.frombuffer("".join(f"{name}\0" for name in sheet_ids).encode("utf8"), np.uint8)}
+        columns = [("sprite_sheet", 0), ("sprite_index", 1), ("sprite_atlas", 2), ("sprite_rect", 3),
+                   ("sprite_mask", 4)]
+        columns += [("frame_sheet", 0), ("frame_index", 1), ("frame_direction", 2), ("frame_action", 3),
+                    ("frame_set", 4), ("frame_atlas", 5), ("frame_rect", 6), ("frame_mask", 7)]
+        dtypes = {name: (dtype, width) for name, dtype, width in ARRAYS}
+        for name, column in columns:
+            rows = sprites if name.startswith("sprite") else frames
+            dtype, width = dtypes[name]
+            if width > 1:
+                # rects may be fractional in the JSON file and are rounded to whole pixels
+                values = np.array([row[column] for row in rows], np.float64).reshape(-1, width)
+                arrays[name] = np.rint(values).astype(dtype)
+            else:
+                arrays[name] = np.array([row[column] for row in rows], dtype)
+        arrays["sprite_offset"], arrays["sprite_length"], arrays["sprite_slots"] = get_slots(
+            arrays["sprite_sheet"].astype(np.int64), arrays["sprite_index"].astype(np.int64), len(sheet_ids))
+        arrays["frame_offset"], arrays["frame_length"], arrays["frame_slots"] = get_slots(
+            arrays["frame_sheet"].astype(np.int64), arrays["frame_index"].astype(np.int64), len(sheet_ids))
+        # the number of frames of every object, stored at the same position as its first row
+        counts = np.zeros(len(frames), np.int32)
+        if frames:
+            keys = arrays["frame_sheet"].astype(np.int64) << 32 | arrays["frame_index"].astype(np.int64)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            counts[starts] = np.diff(np.r_[starts, len(frames)])
+        arrays["frame_count"] = counts
+        return cls(arrays)
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "SpriteIndex":
+        """ Build the index from the content of 'spritesheet.json' """
+        return cls.from_parser(SpritesheetParser(data))
+
+    @classmethod
+    def load(cls, path: str) -> "SpriteIndex":
+        """ Memory-map a binary sprite index file, the arrays are read from the file on access """
+        arrays, buffer = map_arrays(path, INDEX_MAGIC, INDEX_VERSION)
+        return cls(arrays, buffer)
+
+    def to_bytes(self) -> bytes:
+        """ Return the binary file content of the index """
+        return pack_arrays(INDEX_MAGIC, INDEX_VERSION, self.arrays, ARRAYS)
+
+    def save(self, path: str) -> None:
+        """ Write the index to a binary file """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    def close(self) -> None:
+        """ Close the memory map of a loaded index, its arrays can not be used afterwards """
+        self.arrays = {}
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def __len__(self) -> int:
+        return len(self.arrays["sprite_sheet"])
+
+    def find_row(self, prefix: str, sheet: str, index: int) -> int:
+        """ Return the first sprite or frame row of a sheet name and index or -1 """
+        sheet_id = self.sheet_ids.get(sheet)
+        if sheet_id is None or index < 0 or index >= self.arrays[f"{prefix}_length"][sheet_id]:
+            return -1
+        return int(self.arrays[f"{prefix}_slots"][self.arrays[f"{prefix}_offset"][sheet_id] + index])
+
+    def sprite(self, sheet: str, index: int) -> Optional[Sprite]:
+        """ Return the sprite of a sheet at an index or None if there is no such sprite """
+        row = self.find_row("sprite", sheet, index)
+        if row < 0:
+            return None
+        return Sprite(sheet, index, int(self.arrays["sprite_atlas"][row]),
+                      tuple(self.arrays["sprite_rect"][row].tolist()), tuple(self.arrays["sprite_mask"][row].tolist()))
+
+    def frames(self, sheet: str, index: int, direction: int = None, action: int = None) -> list[AnimationFrame]:
+        """ Return all animation frames of an animated object, optionally only those of a direction and action """
+        row = self.find_row("frame", sheet, index)
+        if row < 0:
+            return []
+        frames = []
+        for i in range(row, row + int(self.arrays["frame_count"][row])):
+            frame_direction, frame_action = int(self.arrays["frame_direction"][i]), int(self.arrays["frame_action"][i])
+            if (direction is None or frame_direction == direction) and (action is None or frame_action == action):
+                frames.append(AnimationFrame(sheet, index, frame_direction, frame_action,
+                                             int(self.arrays["frame_set"][i]), int(self.arrays["frame_atlas"][i]),
+                                             tuple(self.arrays["frame_rect"][i].tolist()),
+                                             tuple(self.arrays["frame_mask"][i].tolist())))
+        return frames
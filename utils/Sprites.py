@@ -0,0 +1,137 @@
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from utils.Files import get_worker_count
+from utils.Logger import Logger
+from utils.SpriteIndex import SpriteIndex
+
+logger = Logger()
+
+# the spritesheet texture every atlasId of 'spritesheet.json' refers to
+ATLAS_NAMES = {1: "groundTiles", 2: "characters", 4: "mapObjects"}
+# the textures holding the masks ('maskPosition') of the sprites of an atlas
+MASK_ATLAS_NAMES = {2: "characters_masks"}
+# every texture sprites are cut out of
+SPRITE_ATLASES = set(ATLAS_NAMES.values()) | set(MASK_ATLAS_NAMES.values())
+
+
+class SpriteFrame(NamedTuple):
+    """ The rectangle of a single sprite in an atlas and where it is saved """
+    path: str  # the output path relative to the sprites folder, without the file extension
+    group: str  # the path of the strip the sprite is packed into with the other frames of its object
+    atlas: str
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def get_element_frames(atlas_id: int, rect: tuple, mask: tuple, path: str, group: str) -> list:
+    """ Return the frame of a sprite and of its mask if it has one """
+    frames = []
+    atlas = ATLAS_NAMES.get(atlas_id)
+    if atlas is not None:
+        frames.append(SpriteFrame(path, group, atlas, *rect))
+    mask_atlas = MASK_ATLAS_NAMES.get(atlas_id)
+    if mask_atlas is not None and mask[2] > 0 and mask[3] > 0:
+        frames.append(SpriteFrame(f"{path}_mask", f"{group}_mask", mask_atlas, *mask))
+    return frames
+
+
+def get_frames(index: SpriteIndex) -> list:
+    """ Return the frames of every sprite and animated sprite of a sprite index """
+    frames = []
+    arrays, names = index.arrays, index.sheet_names
+    for sheet, sprite, atlas_id, rect, mask in zip(arrays["sprite_sheet"].tolist(), arrays["sprite_index"].tolist(),
+                                                   arrays["sprite_atlas"].tolist(), arrays["sprite_rect"].tolist(),
+                                                   arrays["sprite_mask"].tolist()):
+        path = f"{names[sheet]}/{sprite}"
+        frames += get_element_frames(atlas_id, rect, mask, path, path)
+    # the frames of an object are stored in the order of their set, direction and action
+    for sheet, sprite, direction, action, frame_set, atlas_id, rect, mask in zip(
+            arrays["frame_sheet"].tolist(), arrays["frame_index"].tolist(), arrays["frame_direction"].tolist(),
+            arrays["frame_action"].tolist(), arrays["frame_set"].tolist(), arrays["frame_atlas"].tolist(),
+            arrays["frame_rect"].tolist(), arrays["frame_mask"].tolist()):
+        group = f"animated/{names[sheet]}/{sprite}"
+        frames += get_element_frames(atlas_id, rect, mask, f"{group}_{frame_set}_{direction}_{action}", group)
+    return frames
+
+
+def load_atlas(image) -> np.ndarray:
+    """ Return a decoded atlas PIL image as an RGBA array (height, width, 4) """
+    return np.asarray(image if image.mode == "RGBA" else image.convert("RGBA"))
+
+
+def slice_atlas(atlas: np.ndarray, frames: list) -> list:
+    """
+    Return a view into the atlas array for every frame, without copying any pixels.
+    Frames that are empty or outside of the atlas are returned as None.
+    """
+    if not frames:
+        return []
+    rects = np.array([frame[3:] for frame in frames], dtype=np.int64)
+    lefts, bottoms, widths, heights = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    # sprite rects are in Unity texture space with the origin at the bottom left, the decoded atlas is top-down
+    tops = atlas.shape[0] - bottoms - heights
+    valid = (lefts >= 0) & (bottoms >= 0) & (tops >= 0) & (widths > 0) & (heights > 0)
+    valid &= lefts + widths <= atlas.shape[1]
+    return [atlas[top:top + height, left:left + width] if ok else None
+            for top, left, width, height, ok in zip(tops.tolist(), lefts.tolist(), widths.tolist(),
+                                                    heights.tolist(), valid.tolist())]
+
+
+def pack_strip(views: list) -> np.ndarray:
+    """ Return the views packed left to right into one strip, aligned at the top """
+    strip = np.zeros((max(view.shape[0] for view in views), sum(view.shape[1] for view in views), 4), np.uint8)
+    left = 0
+    for view in views:
+        strip[:view.shape[0], left:left + view.shape[1]] = view
+        left += view.shape[1]
+    return strip
+
+
+def get_png_chunk(tag: bytes, data: bytes) -> bytes:
+    """ Return a PNG chunk with its length and checksum """
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_png(array: np.ndarray) -> bytes:
+    """
+    Return an RGBA array encoded as a PNG file.
+    Sprites are tiny, so PIL's per-image overhead costs more than the compression and is avoided.
+    """
+    height, width = array.shape[:2]
+    # every row starts with the filter type 0 (none)
+    rows = np.zeros((height, width * 4 + 1), np.uint8)
+    rows[:, 1:] = array.reshape(height, width * 4)
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)  # 8 bit RGBA, not interlaced
+    data = get_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+    return b"\x89PNG\r\n\x1a\n" + get_png_chunk(b"IHDR", header) + data + get_png_chunk(b"IEND", b"")
+
+
+def save_image(path: str, array: np.ndarray) -> bool:
+    """ Save an RGBA array as a .png file and return True on success """
+    try:
+        with open(path, "wb") as file:
+            file.write(encode_png(array))
+        return True
+    except Exception as e:
+        logger.error(f"Failed saving sprite '{path}': {e}")
+        return False
+
+
+def save_images(images: list, workers: int = None, failed: list = None) -> int:
+    """
+    Save a list of (path, RGBA array) tuples as .png files in a thread pool and return how many were saved.
+    zlib releases the GIL while compressing, so threads avoid copying the pixels to worker processes.
+    :param failed: A list the paths of the images that could not be saved are added to.
+    """
+    with ThreadPoolExecutor(max_workers=get_worker_count(workers)) as pool:
+        saved = list(pool.map(lambda image: save_image(*image), images))
+    if failed is not None:
+        failed.extend(path for (path, _), success in zip(images, saved) if not success)
+    return sum(saved)
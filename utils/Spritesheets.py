@@ -1,8 +1,79 @@
 import json
+import time
+from typing import NamedTuple, Optional
 
+from utils.Files import get_memory_usage
 from utils.Logger import Logger
+from utils.Profiler import Profiler
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = Logger()
+profiler = Profiler()
+
+# the installed JSON libraries 'spritesheet.json' can be parsed with, the fastest one first
+JSON_BACKENDS = ["json"] if orjson is None else ["orjson", "json"]
+# the JSON library 'spritesheet.json' is parsed with, orjson is used if it is installed
+JSON_BACKEND = JSON_BACKENDS[0]
+EMPTY_RECT = (0, 0, 0, 0)
+
+
+class SpriteElement(NamedTuple):
+    """ The compact record of a sprite element, only the fields needed to find the sprite in its atlas are kept """
+    index: Optional[int]
+    atlas_id: Optional[int]
+    rect: tuple  # x, y, width, height
+    mask: tuple  # the rect in the mask atlas, empty if the sprite has no mask
+
+
+def get_rect(position) -> tuple:
+    """
+    Return the (x, y, width, height) of a 'position' or 'maskPosition' entry.
+    The values are kept as parsed, they are rounded to whole pixels when the sprite index is built.
+    """
+    if position is None:
+        return EMPTY_RECT
+    if type(position) is tuple:
+        return position
+    return position.get("x", 0), position.get("y", 0), position.get("w", 0), position.get("h", 0)
+
+
+def get_element(element: dict) -> SpriteElement:
+    """ Return the compact record of a sprite element """
+    return SpriteElement(element.get("index"), element.get("atlasId"), get_rect(element.get("position")),
+                         get_rect(element.get("maskPosition")))
+
+
+def compact_object(obj: dict):
+    """
+    Replace rects and sprite elements with compact records while the JSON document is parsed.
+    Objects are decoded inner first, so the rects of an element are already tuples when the element is decoded.
+    """
+    if "position" in obj:
+        return get_element(obj)
+    if "w" in obj and "h" in obj:
+        return get_rect(obj)
+    return obj
+
+
+def load_spritesheet(sheet_data: bytes, backend: str = JSON_BACKEND) -> dict:
+    """
+    Parse 'spritesheet.json' and return it with every sprite element as a SpriteElement
+    :param backend: The JSON library to parse with, one of JSON_BACKENDS.
+    """
+    if backend == "json":
+        # the elements are compacted during parsing, so their dicts never exist all at once
+        # json can not parse a memoryview of a mapped file, orjson parses it without a copy
+        return json.loads(bytes(sheet_data), object_hook=compact_object)
+    sheet = orjson.loads(sheet_data)
+    for sprite in sheet["sprites"]:
+        sprite["elements"] = [get_element(element) for element in sprite["elements"]]
+    for sprite in sheet["animatedSprites"]:
+        sprite["spriteData"] = get_element(sprite["spriteData"])
+    return sheet
 
 
 class Spritesheet:
@@ -14,18 +85,38 @@ class Spritesheet:
         self.elements = elements
 
 
+class AnimatedSprite:
+    """ A single frame of an animated object in the 'spritesheet.json' file """
+
+    def __init__(self, sheet_name: str, index: int, direction: int, action: int, frame_set: int,
+                 element: SpriteElement):
+        self.sheet_name = sheet_name
+        self.index = index
+        self.direction = direction
+        self.action = action
+        self.set = frame_set
+        self.element = element
+
+
 class SpritesheetParser:
     """ A class that will parse the 'spritesheet.json' file designed for a Unity SpriteAtlas """
 
     def __init__(self, sheet_data: bytes):
-        self.data = str(sheet_data)
+        start_time, start_memory = time.perf_counter(), get_memory_usage()
         # load the json data into a python object
-        self.sheet = json.loads(sheet_data)
+        with profiler.phase("parse.spritesheet"):
+            self.sheet = load_spritesheet(sheet_data)
+            profiler.count("bytes_read", len(sheet_data))
         self.sprites = self.sheet["sprites"]
         self.animated_sprites = self.sheet["animatedSprites"]
 
         self.spritesheets = {}
+        # the frames of every animated object grouped by sheet name
+        self.animated_spritesheets = {}
 
+        memory = max(get_memory_usage() - start_memory, 0) / 2 ** 20
+        logger.info(f"Parsed 'spritesheet.json' ({len(sheet_data) / 2 ** 20:.1f} MB) with {JSON_BACKEND} in "
+                    f"{time.perf_counter() - start_time:.2f}s using {memory:.1f} MB")
         logger.info(f"Loaded {len(self.sprites)} sprites.")
         logger.info(f"Loaded {len(self.animated_sprites)} animated sprites.")
         # finally parse the whole spritesheet
@@ -41,10 +132,18 @@ class SpritesheetParser:
             if self.spritesheets.get(sheet_name) is None:
                 sheet = Spritesheet(sheet_name, atlas_id, elements)
                 self.spritesheets[sheet_name] = sheet
+            else:
+                self.spritesheets[sheet_name].elements.extend(elements)
+
+        for sprite in self.animated_sprites:
+            frame = AnimatedSprite(sprite["spriteSheetName"], sprite["index"], sprite.get("direction", 0),
+                                   sprite.get("action", 0), sprite.get("set", 0), sprite["spriteData"])
+            self.animated_spritesheets.setdefault(frame.sheet_name, []).append(frame)
 
     def get_spritesheets(self) -> list[Spritesheet]:
         """ Return all parsed Spritesheet objects """
+        return list(self.spritesheets.values())
 
     def get_sheet_names(self) -> list[str]:
         """ Return a list of all parsed spritesheets from the SpriteAtlas """
-        pass
+        return sorted(set(self.spritesheets) | set(self.animated_spritesheets))
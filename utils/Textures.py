@@ -0,0 +1,115 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+from os.path import exists, getsize
+
+from utils.Files import get_process_pool, get_worker_count, map_file
+from utils.Logger import Logger
+from utils.Profiler import Profiler
+
+logger = Logger()
+profiler = Profiler()
+
+
+class TextureJob:
+    """ The raw pixel data and format metadata needed to decode and save a texture in a worker process """
+
+    def __init__(self, name: str, path: str, image_data: bytes, width: int, height: int, texture_format,
+                 version: tuple, platform, platform_blob: bytes = None, source: tuple = None):
+        """
+        :param image_data: The pixel data as bytes or a memoryview of a memory-mapped file.
+        :param source: The (path, offset, size) of streamed pixel data in its .resS file, if it is streamed.
+        """
+        self.name = name
+        self.path = path
+        self.image_data = image_data
+        self.width = width
+        self.height = height
+        self.texture_format = texture_format
+        self.version = version
+        self.platform = platform
+        self.platform_blob = platform_blob
+        self.source = source
+
+    def __getstate__(self) -> dict:
+        """ Send streamed pixel data to a worker process as its location, the worker maps the .resS file itself """
+        state = self.__dict__.copy()
+        if self.source is not None:
+            state["image_data"] = None
+        # views of memory-mapped files can not be pickled, other data is sent as a copy
+        for key, value in state.items():
+            if isinstance(value, memoryview):
+                state[key] = bytes(value)
+        return state
+
+    def get_image_data(self):
+        """ Return the pixel data, streamed data that was not sent along is read from the mapped .resS file """
+        if self.image_data is None:
+            path, offset, size = self.source
+            return map_file(path)[offset:offset + size]
+        return self.image_data
+
+
+def export_texture(job: TextureJob) -> str:
+    """ Decode the raw pixel data of a texture job and save it as a .png file """
+    from UnityPy.export.Texture2DConverter import parse_image_data
+    image = parse_image_data(job.get_image_data(), job.width, job.height, job.texture_format, job.version,
+                             job.platform, job.platform_blob)
+    image.save(job.path, "PNG")
+    return job.name
+
+
+def export_textures(jobs, workers: int = None, failed: list = None, max_pending: int = None):
+    """
+    Decode and save texture jobs in a process pool and yield the name of each saved texture.
+    Only a few jobs per worker are submitted at once so the raw pixel data is not all held in memory.
+    :param jobs: An iterable of TextureJob objects.
+    :param workers: The number of worker processes (default: one per CPU core).
+    :param failed: A list the paths of the textures that could not be saved are added to.
+    :param max_pending: The number of jobs submitted at once (default: 2 per worker).
+    """
+    workers = get_worker_count(workers)
+    if workers == 1:
+        # decode in this process when no parallelism is requested
+        for job in jobs:
+            try:
+                export_texture(job)
+            except Exception as e:
+                logger.error(f"Failed saving texture '{job.name}': {e}")
+                if failed is not None:
+                    failed.append(job.path)
+                continue
+            yield count_written(job.name, job.path)
+        return
+
+    with get_process_pool(workers) as pool:
+        pending = {}
+        for job in jobs:
+            # only keep the name and path, the pixel data was already sent to the worker
+            pending[pool.submit(export_texture, job)] = (job.name, job.path)
+            if len(pending) >= (max_pending or workers * 2):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from collect_results(done, pending, failed)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from collect_results(done, pending, failed)
+
+
+def collect_results(done: set, pending: dict, failed: list = None):
+    """ Yield the names of all finished texture jobs, remove them from the pending jobs and add failed paths """
+    for future in done:
+        name, path = pending.pop(future)
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Failed saving texture '{name}': {e}")
+            if failed is not None:
+                failed.append(path)
+            continue
+        yield count_written(name, path)
+
+
+def count_written(name: str, path: str) -> str:
+    """ Count a saved texture file in the running profiler phases and return its name """
+    profiler.count("files_written")
+    if exists(path):
+        profiler.count("bytes_written", getsize(path))
+    return name
@@ -0,0 +1,175 @@
+import os
+import shutil
+from os.path import abspath, commonpath, dirname, exists, join, realpath
+from queue import Queue
+from threading import Thread
+
+from utils.Files import get_worker_count, write_file
+from utils.Logger import Logger
+from utils.Profiler import Profiler
+
+logger = Logger()
+profiler = Profiler()
+
+# the suffix of the folder next to the output folder that a run is written to
+STAGING_SUFFIX = ".staging"
+# the suffix of the folder the previous output is moved to while the staged output takes its place
+BACKUP_SUFFIX = ".old"
+
+
+def link_tree(source: str, target: str) -> int:
+    """ Mirror a folder with hard links to all of its files (copies where linking fails), return the file count """
+    count = 0
+    for root, _, files in os.walk(source):
+        folder = join(target, os.path.relpath(root, source))
+        os.makedirs(folder, exist_ok=True)
+        for file_name in files:
+            try:
+                os.link(join(root, file_name), join(folder, file_name))
+            except OSError:
+                shutil.copy2(join(root, file_name), join(folder, file_name))
+            count += 1
+    return count
+
+
+def is_inside(path: str, folder: str) -> bool:
+    """ Return True if a path is a folder or inside of it """
+    path, folder = realpath(path), realpath(folder)
+    try:
+        return commonpath([path, folder]) == folder
+    except ValueError:  # paths on different drives
+        return False
+
+
+def check_output_path(output_path: str) -> str:
+    """
+    Return the absolute path of an output folder that can be replaced by its staging folder or raise a ValueError.
+    The staging and backup folders are created next to it, so they must not end up inside of it (e.g. for '/'),
+    and the current directory must not be inside of it, since the folder is moved away when it is replaced.
+    """
+    path = abspath(output_path)
+    for folder in (path + STAGING_SUFFIX, path + BACKUP_SUFFIX):
+        if is_inside(folder, path):
+            raise ValueError(f"The output folder '{path}' would contain its own staging folder '{folder}'")
+    if is_inside(os.getcwd(), path):
+        raise ValueError(f"The output folder '{path}' contains the current directory, run the extractor "
+                         f"from outside of it")
+    return path
+
+
+class OutputWriter:
+    """
+    Writes the output files of a run in background threads into a staging folder next to the output folder.
+    The staging folder starts as hard links of the current outputs, so unchanged outputs are kept without copying,
+    and replaces the output folder once every file was written. A run that fails or crashes never leaves a
+    partial output behind, its staging folder is removed by the next run. The swap is two renames, so the
+    output folder is missing for the moment in between.
+    """
+
+    def __init__(self, output_path: str, workers: int = None, max_pending: int = None):
+        """
+        :param output_path: The output folder that is replaced by the staging folder on commit (see check_output_path).
+        :param workers: The number of writer threads (default: one per CPU core), at least 4 since they wait on I/O.
+        :param max_pending: The number of queued files before write() blocks (default: 4 per thread).
+        """
+        self.output_path = check_output_path(output_path)
+        self.path = self.output_path + STAGING_SUFFIX
+        self.workers = max(get_worker_count(workers), 4)
+        # bounded, so stages that produce files faster than the disk takes them wait instead of holding them all
+        self.queue = Queue(max_pending or self.workers * 4)
+        self.threads = []
+        self.errors = []
+
+    def start(self) -> None:
+        """ Create the staging folder from the current outputs and start the writer threads """
+        if exists(self.path):
+            logger.warning(f"Removing the staging folder of an unfinished run: '{self.path}'")
+            shutil.rmtree(self.path)
+        if exists(self.output_path):
+            link_tree(self.output_path, self.path)
+        os.makedirs(self.path, exist_ok=True)
+        self.threads = [Thread(target=self.run, name=f"OutputWriter-{i}", daemon=True) for i in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def run(self) -> None:
+        """ Write queued files until the writer is closed """
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                write_file(*item)
+            except Exception as e:
+                logger.error(f"Failed writing '{item[0]}': {e}")
+                self.errors.append(item[0])
+            finally:
+                self.queue.task_done()
+
+    def get_path(self, path: str) -> str:
+        """
+        Return the staging path of an output for code that writes the file itself (e.g. worker processes).
+        An existing file is unlinked first, writing to it would change the current output through the hard link.
+        """
+        full_path = join(self.path, path)
+        os.makedirs(dirname(full_path), exist_ok=True)
+        if exists(full_path):
+            os.remove(full_path)
+        return full_path
+
+    def write(self, path: str, data) -> None:
+        """
+        Queue an output file to be written in the background, blocks while the queue is full.
+        :param path: The output path relative to the output folder.
+        :param data: The bytes, memoryview or str (written as utf8) to write, it must not change afterwards.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf8")
+        self.queue.put((self.get_path(path), data))
+        profiler.count("files_written")
+        profiler.count("bytes_written", memoryview(data).nbytes)
+
+    def flush(self) -> None:
+        """ Wait until every queued file was written, so the memory of their data is freed """
+        self.queue.join()
+
+    def close(self) -> None:
+        """ Wait until every queued file was written and stop the writer threads """
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def commit(self) -> bool:
+        """
+        Wait for all queued files and replace the output folder with the staging folder.
+        If any file could not be written, including the files saved by worker processes that were added to the
+        errors, the current output is kept and the staging folder is discarded.
+        :returns: True if the output folder was replaced.
+        """
+        self.close()
+        if self.errors:
+            logger.error(f"Keeping the previous output, {len(self.errors)} files could not be written")
+            self.discard()
+            return False
+        backup_path = self.output_path + BACKUP_SUFFIX
+        if exists(backup_path):
+            shutil.rmtree(backup_path)
+        try:
+            # both renames stay on one filesystem, the output folder is only missing in between
+            if exists(self.output_path):
+                os.rename(self.output_path, backup_path)
+            os.rename(self.path, self.output_path)
+        except OSError as e:
+            logger.error(f"Could not replace the output folder, the new output is kept in '{self.path}': {e}")
+            if not exists(self.output_path) and exists(backup_path):
+                os.rename(backup_path, self.output_path)
+            return False
+        shutil.rmtree(backup_path, ignore_errors=True)
+        return True
+
+    def discard(self) -> None:
+        """ Stop the writer threads and remove the staging folder, the output folder is not changed """
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,51 @@
+import xml.etree.ElementTree as ElementTree
+
+from utils.Files import get_process_pool, get_worker_count
+from utils.Logger import Logger
+
+logger = Logger()
+
+
+def normalize_xml(data: bytes) -> bytes:
+    """
+    Return an XML sheet with canonical whitespace and attribute order, so diffs between game versions are stable.
+    The sheet is canonicalized (C14N 2.0, attributes sorted, whitespace between elements removed) and indented with tabs.
+    """
+    canonical = ElementTree.canonicalize(bytes(data).decode("utf8"), with_comments=True, strip_text=True)
+    parser = ElementTree.XMLParser(target=ElementTree.TreeBuilder(insert_comments=True))
+    root = ElementTree.fromstring(canonical, parser)
+    ElementTree.indent(root, "\t")
+    return ElementTree.tostring(root, encoding="unicode").encode("utf8") + b"\n"
+
+
+def try_normalize_xml(item: tuple) -> tuple:
+    """ Normalize a (name, data) XML sheet and return (name, normalized data or None if it is not valid XML) """
+    name, data = item
+    try:
+        return name, normalize_xml(data)
+    except (ElementTree.ParseError, UnicodeDecodeError, ValueError):
+        return name, None
+
+
+def normalize_sheets(sheets: list, workers: int = None) -> dict:
+    """
+    Normalize a list of (name, data) XML sheets in a process pool and return the normalized data by name.
+    Sheets that are not valid XML keep their original data.
+    :param workers: The number of worker processes (default: one per CPU core).
+    """
+    workers = get_worker_count(workers)
+    if workers == 1 or len(sheets) < 2:
+        results = map(try_normalize_xml, sheets)
+    else:
+        # views of memory-mapped asset files can not be pickled, the workers get a copy of every sheet
+        items = [(name, bytes(data)) for name, data in sheets]
+        with get_process_pool(workers) as pool:
+            results = list(pool.map(try_normalize_xml, items, chunksize=max(len(sheets) // (workers * 4), 1)))
+    normalized = {}
+    originals = dict(sheets)
+    for name, data in results:
+        if data is None:
+            logger.warning(f"Could not normalize '{name}.xml', it is saved unchanged")
+            data = originals[name]
+        normalized[name] = data
+    return normalized
@@ -1,6 +1,20 @@
-from .ActionScript import ActionScriptExtractor
-from .Extractor import UnityExtractor
-from .Files import assert_path_exists
-from .Resources import Resources
-from .Logger import Logger, get_input
-from .Spritesheets import SpritesheetParser
+from utils.Lazy import export_lazily
+
+# the module of every exported name, a module is only imported when one of its names is first used
+export_lazily(__name__, {
+    "ActionScriptExtractor": ".ActionScript",
+    "UnityExtractor": ".Extractor", "get_asset_types": ".Extractor",
+    "assert_path_exists": ".Files",
+    "GameData": ".GameData", "GameEntry": ".GameData",
+    "AssetIndex": ".Index", "get_default_index_path": ".Index",
+    "get_resource_path": ".Discovery", "resolve_resource_path": ".Discovery", "set_interactive": ".Discovery",
+    "Resources": ".Resources",
+    "AssetDiff": ".Diff", "diff_sources": ".Diff",
+    "PacketCatalogue": ".Packets", "PacketEntry": ".Packets",
+    "Logger": ".Logger", "Progress": ".Logger", "get_input": ".Logger", "line_break": ".Logger",
+    "set_verbosity": ".Logger",
+    "CAPTURE_MODES": ".Profiler", "Profiler": ".Profiler",
+    "SpriteIndex": ".SpriteIndex",
+    "SpritesheetParser": ".Spritesheets",
+    "OutputWriter": ".Writer", "check_output_path": ".Writer"
+})